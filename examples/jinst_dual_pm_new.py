@@ -2,7 +2,8 @@ from puritymonitor import (
     Bi207,
     CylinderConcentricTwoPartAnode as Cylinder,
     PurityMonitorInitDecay as PM,
-    EnergySpectra
+    EnergySpectra,
+    SimulationCache
 )
 
 from matplotlib import pyplot as plt
@@ -52,10 +53,14 @@ if __name__ == "__main__":
     shortScale = 1.0
     longScale = 1.0
 
+    # Simulated spectra are cached on disk, so that plot-only iterations do not re-simulate them
+    # (set `PURITYMONITOR_NO_CACHE=1` to bypass the cache)
+    cache = SimulationCache()
+
     print("0/2")
-    shortPM.simulateEnergySpectra(**params, energyStdDev = 0.067, energyScale = shortScale, minEnergy = 0.312/shortScale, maxEnergy = 1.4/shortScale)
+    shortPM.simulateEnergySpectra(**params, energyStdDev = 0.067, energyScale = shortScale, minEnergy = 0.312/shortScale, maxEnergy = 1.4/shortScale, seed = 1, cache = cache)
     print("1/2")
-    longPM.simulateEnergySpectra(**params, energyStdDev = 0.067, energyScale = longScale, minEnergy = 0.312/longScale, maxEnergy = 1.4/longScale)
+    longPM.simulateEnergySpectra(**params, energyStdDev = 0.067, energyScale = longScale, minEnergy = 0.312/longScale, maxEnergy = 1.4/longScale, seed = 2, cache = cache)
     print("2/2")
 
     ####################################
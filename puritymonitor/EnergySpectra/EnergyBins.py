@@ -21,6 +21,7 @@ class EnergyBins:
         self.upper = upper
         self.nBins = nBins
         self.binWidth = binWidth
+        self.uniform = self.isUniform()
 
     def __str__(
         self
@@ -88,6 +89,43 @@ class EnergyBins:
         self.binWidth *= scale
         return self
     
+    def isUniform(
+        self
+    ) -> bool:
+        """
+        Indicate whether the energy bins are contiguous and all have the same width `binWidth`.
+        """
+        lower, upper = np.asarray(self.lower), np.asarray(self.upper)
+        return bool(
+                np.allclose(upper - lower, self.binWidth, atol = 0.0, rtol = 1e-9)
+            and np.allclose(lower[1:], upper[:-1], atol = 0.0, rtol = 1e-9)
+        )
+
+    def binIndex(
+        self,
+        energy
+    ):
+        """
+        Index of the energy bin containing each given energy (`lower <= energy < upper`), or -1 for
+        energies outside of all bins. Also works element-wise with arrays of energies.
+
+        For uniform energy bins, the index is computed directly from the lowest energy and the bin
+        width, so that the cost per energy does not depend on the number of bins.
+        """
+
+        energy = np.asarray(energy, dtype = float)
+        lower, upper = np.asarray(self.lower), np.asarray(self.upper)
+
+        if self.uniform:
+            with np.errstate(invalid = "ignore"):
+                index = np.floor((energy - lower[0]) / self.binWidth)
+            index = np.where((index >= 0) & (index < self.nBins), index, -1).astype(int)
+        else:
+            index = np.searchsorted(lower, energy, side = "right") - 1
+            index = np.where((index >= 0) & (energy < upper[np.maximum(index, 0)]), index, -1)
+
+        return index
+    
     @classmethod
     def fromRange(
         cls,
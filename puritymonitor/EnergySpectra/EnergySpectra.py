@@ -1,11 +1,17 @@
-from sys import stderr
 from . import EnergyBins
+from .SpectralModel import SpectralModel
+from .Likelihood import fitCurve, peakWindow
 import numpy as np
-from scipy.optimize import curve_fit
+import json
+import logging
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from typing import Self # For type hint only (Python >= 3.11)
 from collections.abc import Iterable
 from ..types import float_MeV # For type hint only
 
+logger = logging.getLogger(__name__)
+
 ####################################################################################################
 
 def gaussian(
@@ -39,6 +45,139 @@ def doubleGaussian(
 
 ####################################################################################################
 
+def gaussianJacobian(
+        x,
+        amplitude: float,
+        mean: float,
+        stdDev: float
+    ):
+    """
+    Compute the analytic Jacobian of `gaussian` with respect to its amplitude, mean, and standard
+    deviation, as a `(len(x), 3)` array.
+    """
+    x = np.asarray(x, dtype = float)
+    exponential = np.exp(-(x - mean)**2 / (2.0 * stdDev**2))
+    value = amplitude * exponential
+    return np.column_stack((
+        exponential,
+        value * (x - mean) / stdDev**2,
+        value * (x - mean)**2 / stdDev**3
+    ))
+
+####################################################################################################
+
+def doubleGaussianJacobian(
+        x,
+        amplitude1: float,
+        mean1: float,
+        stdDev1: float,
+        amplitude2: float,
+        mean2: float,
+        stdDev2: float
+    ):
+    """
+    Compute the analytic Jacobian of `doubleGaussian` with respect to its amplitudes, means, and
+    standard deviations, as a `(len(x), 6)` array.
+    """
+    return np.hstack((
+        gaussianJacobian(x, amplitude1, mean1, stdDev1),
+        gaussianJacobian(x, amplitude2, mean2, stdDev2)
+    ))
+
+####################################################################################################
+
+def peakFitData(
+    energy: np.ndarray,
+    spectrum: np.ndarray,
+    guess: Iterable[float],
+    nPeaks: int,
+    method: str = "leastSquares",
+    nStdDevs: float = 2.0
+) -> tuple[np.ndarray, np.ndarray, tuple]:
+    """
+    Energies, counts and parameter bounds of the fit of `nPeaks` Gaussians to `spectrum`, from the
+    initial parameters `guess`. Least-squares fits use the whole spectrum, without bounds. Poisson
+    fits of these bare peak models (without background) are restricted to the bins within
+    `nStdDevs` standard deviations of the guessed peaks, with non-negative amplitudes and strictly
+    positive standard deviations. Raise a `RuntimeError` if too few bins are left.
+    """
+    if method != "poisson":
+        return energy, spectrum, (-np.inf, np.inf)
+
+    guess = np.asarray(guess, dtype = float)
+    window = peakWindow(energy, guess[1::3], guess[2::3], nStdDevs = nStdDevs)
+    if np.count_nonzero(window) <= 3 * nPeaks:
+        raise RuntimeError(f"Too few energy bins ({np.count_nonzero(window)}) around the guessed peaks for a Poisson fit.")
+    lower = np.tile([0.0, -np.inf, 1e-9], nPeaks)
+    return energy[window], spectrum[window], (lower, np.inf)
+
+####################################################################################################
+
+def fitBlock(
+    energy: np.ndarray,
+    spectra: np.ndarray,
+    initialGuesses: np.ndarray,
+    nPeaks: int,
+    warmStart: bool = True,
+    method: str = "leastSquares",
+    nStdDevs: float = 2.0
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Fit each spectrum of a `(nSpectra, nBins)` block in turn with `nPeaks` Gaussians, using analytic
+    Jacobians. With `warmStart`, each fit starts from the result of the previous successful fit
+    instead of its own initial guess. `method` is either `"leastSquares"` or `"poisson"` (see
+    `fitCurve`; Poisson fits are restricted to `nStdDevs` standard deviations around the peaks of
+    the initial guess, see `peakFitData`). Return the fitted parameters, their covariance matrices,
+    and whether each fit succeeded. This is the entry point of the worker processes of
+    `EnergySpectra.fitBatch`.
+    """
+
+    model, jacobian = (gaussian, gaussianJacobian) if nPeaks == 1 else (doubleGaussian, doubleGaussianJacobian)
+    nParameters = 3 * nPeaks
+    parameters = np.full((len(spectra), nParameters), np.nan)
+    covariances = np.full((len(spectra), nParameters, nParameters), np.nan)
+    success = np.zeros(len(spectra), dtype = bool)
+    previous = None
+
+    for index, (spectrum, initialGuess) in enumerate(zip(spectra, initialGuesses)):
+        p0 = previous if (warmStart and previous is not None) else initialGuess
+        try:
+            xdata, ydata, bounds = peakFitData(energy, spectrum, initialGuess, nPeaks, method, nStdDevs)
+            parameters[index], covariances[index] = fitCurve(
+                f = model,
+                xdata = xdata,
+                ydata = ydata,
+                p0 = p0,
+                jac = jacobian,
+                method = method,
+                bounds = bounds
+            )
+            success[index] = True
+            previous = parameters[index]
+        except RuntimeError:
+            parameters[index] = initialGuess
+
+    return parameters, covariances, success
+
+####################################################################################################
+
+def fillEmptyFields(
+    text: str
+) -> str:
+    """
+    Replace the empty fields of `csv` lines (between two commas, or before the first or after the
+    last comma of a line) by "0". Blank lines are left untouched.
+    """
+    text = text.replace(",,", ",0,").replace(",,", ",0,") # Twice for consecutive empty fields
+    text = text.replace("\n,", "\n0,").replace(",\n", ",0\n")
+    if text.startswith(","):
+        text = "0" + text
+    if text.endswith(","):
+        text += "0"
+    return text
+
+####################################################################################################
+
 class EnergySpectra:
     """
     """
@@ -80,10 +219,11 @@ class EnergySpectra:
         filename: str
     ) -> Self:
         """
-        Save the energy spectra to a `csv` file or any other text-based file.
+        Save the energy spectra to a `csv` file or any other text-based file. The labels may also
+        include the label of the energy column as their first item (as returned by `load`).
         """
 
-        if len(self.spectra) != len(self.labels):
+        if len(self.labels) not in (len(self.spectra), len(self.spectra) + 1):
             raise ValueError("You must provide an equal number of energy spectra and energy spectra labels.")
         
         with open(filename, "w") as outputFile:
@@ -99,68 +239,157 @@ class EnergySpectra:
     @staticmethod
     def load(
         filename: str,
-        ignore: Iterable[int] = []
+        ignore: Iterable[int] = [],
+        chunkSize: int = 1000000
     ) -> Self:
         """
-        Load energy spectra from a `csv` file or any other text-based file.
-        """
+        Load energy spectra from a `csv` file or any other text-based file. The first column that is
+        not ignored holds the lower bounds of the energy bins, and each following column holds a
+        spectrum. Columns whose index is in `ignore` are skipped, and empty fields are read as 0.0.
 
-        lowerEnergy = []
+        The file body is parsed in bulk by `np.loadtxt`, `chunkSize` lines at a time, and the
+        spectra are returned as a `(nSpectra, nBins)` array.
+        """
 
         with open(filename, "r") as inputFile:
             # Header (labels for the energy column and each spectrum)
-            labels = [
-                label
-                for index, label in enumerate(next(inputFile).strip().split(","))
-                if index not in ignore
-            ]
-            
+            header = next(inputFile).strip().split(",")
+            columns = [index for index in range(len(header)) if index not in ignore]
+            labels = [header[index] for index in columns]
+
             # Body (energies and events per energy bin for each spectrum)
-            energy = []
-            spectra = [
-                []
-                for index, _ in enumerate(labels[1:])
-                if index not in ignore
-            ]
-            for line in inputFile:
-                # Read the current bin
-                currentEnergy, *currentSpectra = [
-                    0.0 if value == "" or value == "\n" else float(value)
-                    for index, value in enumerate(line.strip().split(","))
-                    if index not in ignore
-                ]
-
-                # Update self.energy and self.spectra accordingly
-                lowerEnergy.append(currentEnergy)
-                for savedSpectrum, readSpectrum in zip(spectra, currentSpectra):
-                    savedSpectrum.append(readSpectrum)
+            chunks = []
+            while lines := list(islice(inputFile, chunkSize)):
+                chunks.append(np.loadtxt(
+                    fillEmptyFields("".join(lines)).splitlines(),
+                    delimiter = ",",
+                    usecols = columns,
+                    dtype = float,
+                    ndmin = 2
+                ))
+
+        body = np.concatenate(chunks) if chunks else np.empty((0, len(columns)), dtype = float)
 
         return EnergySpectra(
-            energyBins = EnergyBins.fromLower(lowerEnergy),
-            spectra = spectra,
+            energyBins = EnergyBins.fromLower(body[:, 0]),
+            spectra = np.ascontiguousarray(body[:, 1:].T),
             labels = labels
         )
 
-    @classmethod
-    def fit(
-        cls,
+    @staticmethod
+    def binaryFilenames(
+        filename: str
+    ) -> tuple[str, str]:
+        """
+        Filenames of the `npy` data file and of the `json` header file of the binary format, from a
+        filename with or without the `.npy` extension.
+        """
+        base = filename[:-len(".npy")] if filename.endswith(".npy") else filename
+        return base + ".npy", base + ".json"
+
+    def saveBinary(
+        self,
+        filename: str
+    ) -> Self:
+        """
+        Save the energy spectra to a binary container: a `npy` file holding a `(2 + nSpectra, nBins)`
+        float64 array (lower bounds of the energy bins, upper bounds of the energy bins, then one
+        row per spectrum), and a small `json` header holding the labels and the energy bin width.
+        Example:
+
+        ```
+        energySpectra.saveBinary("run.npy") # Writes "run.npy" and "run.json"
+        ```
+        """
+
+        dataFilename, headerFilename = self.binaryFilenames(filename)
+
+        np.save(dataFilename, np.vstack([
+            np.asarray(self.energyBins.lower, dtype = float),
+            np.asarray(self.energyBins.upper, dtype = float),
+            np.asarray(self.spectra, dtype = float).reshape(len(self.spectra), self.energyBins.nBins)
+        ]))
+
+        with open(headerFilename, "w") as headerFile:
+            json.dump({
+                "format": "puritymonitor.EnergySpectra",
+                "version": 1,
+                "labels": list(self.labels),
+                "nBins": int(self.energyBins.nBins),
+                "binWidth": float(self.energyBins.binWidth),
+                "nSpectra": len(self.spectra)
+            }, headerFile, indent = 2)
+
+        return self
+
+    @staticmethod
+    def loadBinary(
+        filename: str,
+        mmap: bool = True
+    ) -> Self:
+        """
+        Load energy spectra from a binary container written by `saveBinary`. With `mmap = True`
+        (default), the data file is memory-mapped read-only (`np.load(mmap_mode = "r")`), so that
+        the spectra are only read from disk when accessed. The energy bin edges are always copied
+        to memory, so that the energy bins can be rescaled (`EnergyBins.scale`).
+        """
+
+        dataFilename, headerFilename = EnergySpectra.binaryFilenames(filename)
+
+        with open(headerFilename, "r") as headerFile:
+            header = json.load(headerFile)
+
+        data = np.load(dataFilename, mmap_mode = "r" if mmap else None)
+
+        return EnergySpectra(
+            energyBins = EnergyBins(
+                lower = np.array(data[0]),
+                upper = np.array(data[1]),
+                nBins = header["nBins"],
+                binWidth = header["binWidth"]
+            ),
+            spectra = data[2:],
+            labels = header["labels"]
+        )
+
+    @staticmethod
+    def csvToBinary(
+        csvFilename: str,
+        binaryFilename: str
+    ) -> Self:
+        """
+        Convert a `csv` file (see `load`) to the binary format (see `saveBinary`).
+        """
+        return EnergySpectra.load(csvFilename).saveBinary(binaryFilename)
+
+    @staticmethod
+    def binaryToCsv(
+        binaryFilename: str,
+        csvFilename: str
+    ) -> Self:
+        """
+        Convert a binary container (see `saveBinary`) to the `csv` format (see `save`).
+        """
+        return EnergySpectra.loadBinary(binaryFilename, mmap = False).save(csvFilename)
+
+    @staticmethod
+    def initialGuess(
         energyBins: EnergyBins,
         spectrum,
         energyStdDev: float_MeV,
         nPeaks: int = 1,
         initialGuess1: tuple[float, float, float] = (None, None, None),
         initialGuess2: tuple[float, float, float] = (None, None, None)
-    ):
+    ) -> tuple[float, ...]:
         """
-        Usage:
-
-        ```
-        EnergySpectra.fit(energyBins, spectrum, initialGuess)
-        ```
+        Complete the given initial guesses of the Gaussian fit parameters (`None` values) from the
+        spectrum itself: the highest bin for the first peak, and a smaller peak at half its energy
+        for the second one. Return the initial parameters of both peaks (the first `3 * nPeaks` ones
+        are fitted).
         """
 
         if nPeaks != 1 and nPeaks != 2:
-            raise ValueError(f"Fitting with `nPeaks = {nPeaks}` is not supported. `nPeaks` should be either 1 or 2.")
+            raise ValueError(f"Fitting with `nPeaks = {nPeaks}` is not supported. `nPeaks` should be either 1 or 2 (see `fitModel` for other models).")
 
         amplitude1, mean1, stdDev1 = initialGuess1
         amplitude2, mean2, stdDev2 = initialGuess2
@@ -175,35 +404,66 @@ class EnergySpectra:
         mean2 = mean2 if mean2 is not None else mean1 / 2
         stdDev2 = stdDev2 if stdDev2 is not None else stdDev1
 
-        if nPeaks == 1:
-            print(f"Guess: amplitude = {amplitude1}, mean = {mean1}, standard deviation = {stdDev1}")
-        if nPeaks == 2:
-            print(f"Guess:")
-            print(f"  amplitude = {amplitude1}, mean = {mean1}, standard deviation = {stdDev1}")
-            print(f"  amplitude = {amplitude2}, mean = {mean2}, standard deviation = {stdDev2}")
+        return (amplitude1, mean1, stdDev1, amplitude2, mean2, stdDev2)
+
+    @classmethod
+    def fit(
+        cls,
+        energyBins: EnergyBins,
+        spectrum,
+        energyStdDev: float_MeV,
+        nPeaks: int = 1,
+        initialGuess1: tuple[float, float, float] = (None, None, None),
+        initialGuess2: tuple[float, float, float] = (None, None, None),
+        method: str = "leastSquares",
+        nStdDevs: float = 2.0
+    ):
+        """
+        Usage:
 
+        ```
+        EnergySpectra.fit(energyBins, spectrum, initialGuess)
+        ```
+
+        The fit is either an unweighted least-squares fit (`method = "leastSquares"`), or a binned
+        Poisson maximum-likelihood fit (`method = "poisson"`), which is unbiased for spectra with
+        few counts per bin (short acquisitions). As the bare Gaussian peaks do not model the
+        background (Compton continuum, other lines), Poisson fits are restricted to the bins within
+        `nStdDevs` standard deviations of the guessed peaks (see `peakFitData`). Initial guesses and
+        fitted parameters are logged (`logging.INFO`).
+        """
+
+        guess = cls.initialGuess(energyBins, spectrum, energyStdDev, nPeaks, initialGuess1, initialGuess2)
+        amplitude1, mean1, stdDev1, amplitude2, mean2, stdDev2 = guess
+
+        logger.info(f"Guess: {cls.formatParameters(guess[:3 * nPeaks])}")
+
+        model, jacobian = (gaussian, gaussianJacobian) if nPeaks == 1 else (doubleGaussian, doubleGaussianJacobian)
         try:
-            if nPeaks == 1:
-                (amplitude1, mean1, stdDev1), _ = curve_fit(
-                    f = gaussian,
-                    xdata = (energyBins.lower + energyBins.upper) / 2,
-                    ydata = spectrum,
-                    p0 = (amplitude1, mean1, stdDev1)
-                )
-            elif nPeaks == 2:
-                (amplitude1, mean1, stdDev1, amplitude2, mean2, stdDev2), _ = curve_fit(
-                    f = doubleGaussian,
-                    xdata = (energyBins.lower + energyBins.upper) / 2,
-                    ydata = spectrum,
-                    p0 = (amplitude1, mean1, stdDev1, amplitude2, mean2, stdDev2)
-                )
+            xdata, ydata, bounds = peakFitData(
+                (np.asarray(energyBins.lower) + np.asarray(energyBins.upper)) / 2,
+                np.asarray(spectrum, dtype = float),
+                guess[:3 * nPeaks],
+                nPeaks,
+                method,
+                nStdDevs
+            )
+            fitted, _ = fitCurve(
+                f = model,
+                xdata = xdata,
+                ydata = ydata,
+                p0 = guess[:3 * nPeaks],
+                jac = jacobian,
+                method = method,
+                bounds = bounds
+            )
+            amplitude1, mean1, stdDev1 = fitted[:3]
+            if nPeaks == 2:
+                amplitude2, mean2, stdDev2 = fitted[3:]
         except RuntimeError:
-            print("Error: Gaussian fit of the IC peak(s) failed.", file = stderr)
+            logger.error("Gaussian fit of the IC peak(s) failed.")
 
-        print(f"Fit:")
-        print(f"  amplitude = {amplitude1}, mean = {mean1}, standard deviation = {stdDev1}")
-        if nPeaks == 2:
-            print(f"  amplitude = {amplitude2}, mean = {mean2}, standard deviation = {stdDev2}")
+        logger.info(f"Fit: {cls.formatParameters((amplitude1, mean1, stdDev1, amplitude2, mean2, stdDev2)[:3 * nPeaks])}")
 
         energies = np.linspace(energyBins.lower[0], energyBins.upper[-1], 1000)
 
@@ -212,4 +472,130 @@ class EnergySpectra:
         elif nPeaks == 2:
             fitted = doubleGaussian(energies, amplitude1, mean1, stdDev1, amplitude2, mean2, stdDev2)
         
-        return (amplitude1, mean1, stdDev1), (amplitude2, mean2, stdDev2), energies, fitted
\ No newline at end of file
+        return (amplitude1, mean1, stdDev1), (amplitude2, mean2, stdDev2), energies, fitted
+
+    @classmethod
+    def fitModel(
+        cls,
+        energyBins: EnergyBins,
+        spectrum,
+        model: SpectralModel,
+        initialGuess: dict[str, float] | Iterable[float] | None = None,
+        method: str = "leastSquares",
+        nStdDevs: float = 2.0
+    ) -> tuple[dict[str, float], np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Fit a spectrum with any `SpectralModel` (any number of peaks, constrained parameters,
+        background), by least squares or Poisson maximum likelihood (see `fit` and
+        `SpectralModel.fit`). Usage:
+
+        ```
+        model = SpectralModel(nPeaks = 3, sharedStdDev = True, background = "exponential")
+        parameters, covariance, energies, fitted = EnergySpectra.fitModel(energyBins, spectrum, model)
+        ```
+
+        Return the fitted free parameters by name (the initial guess if the fit failed), their
+        covariance matrix, and the fitted model evaluated on 1000 energies.
+        """
+
+        guess = model.initialGuess(energyBins, spectrum, initialGuess)
+        parameters = dict(zip(model.parameterNames, map(float, guess)))
+        covariance = np.full((model.nParameters, model.nParameters), np.nan)
+
+        logger.info(f"Guess: {cls.formatParameters(np.ravel(model.peaks(guess)))}")
+
+        try:
+            parameters, covariance = model.fit(energyBins, spectrum, guess, method = method, nStdDevs = nStdDevs)
+        except RuntimeError:
+            logger.error("Fit of the spectral model failed.")
+
+        logger.info(f"Fit: {parameters}")
+
+        energies = np.linspace(energyBins.lower[0], energyBins.upper[-1], 1000)
+        fitted = model.evaluate(energies, [parameters[name] for name in model.parameterNames])
+
+        return parameters, covariance, energies, fitted
+
+    @staticmethod
+    def formatParameters(
+        parameters: Iterable[float]
+    ) -> str:
+        """
+        Readable representation of Gaussian fit parameters (amplitude, mean, standard deviation of
+        each peak).
+        """
+        parameters = list(parameters)
+        return "; ".join(
+            f"amplitude = {amplitude}, mean = {mean}, standard deviation = {stdDev}"
+            for amplitude, mean, stdDev in zip(parameters[0::3], parameters[1::3], parameters[2::3])
+        )
+
+    @classmethod
+    def fitBatch(
+        cls,
+        energyBins: EnergyBins,
+        spectra,
+        energyStdDev: float_MeV,
+        nPeaks: int = 1,
+        initialGuess1: tuple[float, float, float] = (None, None, None),
+        initialGuess2: tuple[float, float, float] = (None, None, None),
+        warmStart: bool = True,
+        nWorkers: int | None = None,
+        method: str = "leastSquares",
+        nStdDevs: float = 2.0
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Fit each spectrum of a `(nSpectra, nBins)` array with `nPeaks` Gaussians, using analytic
+        Jacobians. Spectra are split into `nWorkers` contiguous blocks fitted by a pool of worker
+        processes (or in the current process if `nWorkers` is `None`). Within a block, with
+        `warmStart`, each fit starts from the result of the previous one. `method` is either
+        `"leastSquares"` or `"poisson"` (restricted to `nStdDevs` standard deviations around the
+        guessed peaks, see `fit`). Progress is logged (`logging.INFO`) as blocks finish.
+
+        Return a structured array of the fitted parameters (fields `amplitude1`, `mean1`,
+        `stdDev1`, and `amplitude2`, `mean2`, `stdDev2` if `nPeaks == 2`, and `success`), and a
+        `(nSpectra, 3 * nPeaks, 3 * nPeaks)` array of their covariance matrices. Example:
+
+        ```
+        parameters, covariances = EnergySpectra.fitBatch(data.energyBins, data.spectra, 0.05, nWorkers = 8)
+        means = parameters["mean1"]
+        ```
+        """
+
+        spectra = np.asarray(spectra, dtype = float)
+        energy = (np.asarray(energyBins.lower) + np.asarray(energyBins.upper)) / 2
+        initialGuesses = np.array([
+            cls.initialGuess(energyBins, spectrum, energyStdDev, nPeaks, initialGuess1, initialGuess2)[:3 * nPeaks]
+            for spectrum in spectra
+        ], dtype = float).reshape(len(spectra), 3 * nPeaks)
+
+        nBlocks = 1 if nWorkers is None else max(1, min(nWorkers, len(spectra)))
+        blocks = np.array_split(np.arange(len(spectra)), nBlocks)
+        results = [None] * nBlocks
+
+        if nWorkers is None:
+            results[0] = fitBlock(energy, spectra, initialGuesses, nPeaks, warmStart, method, nStdDevs)
+        else:
+            with ProcessPoolExecutor(max_workers = nWorkers) as executor:
+                futures = {
+                    executor.submit(fitBlock, energy, spectra[block], initialGuesses[block], nPeaks, warmStart, method, nStdDevs): index
+                    for index, block in enumerate(blocks)
+                }
+                nDone = 0
+                for future in as_completed(futures):
+                    results[futures[future]] = future.result()
+                    nDone += len(blocks[futures[future]])
+                    logger.info(f"{nDone}/{len(spectra)} spectra fitted")
+
+        names = ["amplitude1", "mean1", "stdDev1", "amplitude2", "mean2", "stdDev2"][:3 * nPeaks]
+        parameters = np.zeros(len(spectra), dtype = [(name, float) for name in names] + [("success", bool)])
+        fitted = np.concatenate([result[0] for result in results])
+        for column, name in enumerate(names):
+            parameters[name] = fitted[:, column]
+        parameters["success"] = np.concatenate([result[2] for result in results])
+        covariances = np.concatenate([result[1] for result in results])
+
+        if nWorkers is None:
+            logger.info(f"{len(spectra)}/{len(spectra)} spectra fitted")
+
+        return parameters, covariances
@@ -0,0 +1,155 @@
+import numpy as np
+from scipy.optimize import curve_fit
+from collections.abc import Callable, Iterable # For type hint only
+
+####################################################################################################
+
+def poissonNegativeLogLikelihood(
+    expected: np.ndarray,
+    counts: np.ndarray
+) -> float:
+    """
+    Binned Poisson negative log-likelihood of `counts` given the `expected` counts, up to a constant
+    (`sum(expected - counts * log(expected))`). Expected counts are floored to a tiny positive value.
+    """
+    expected = np.maximum(expected, 1e-300)
+    return float(np.sum(expected - counts * np.log(expected)))
+
+####################################################################################################
+
+def poissonFit(
+    f: Callable,
+    xdata: np.ndarray,
+    ydata: np.ndarray,
+    p0: Iterable[float],
+    jac: Callable,
+    bounds: tuple = (-np.inf, np.inf),
+    maxIterations: int = 1000,
+    tolerance: float = 1e-10,
+    runaway: float = 1e4
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Binned Poisson maximum-likelihood fit of the model `f(xdata, *parameters)` to the counts
+    `ydata`, with the same interface as `scipy.optimize.curve_fit`. Unlike least squares, this is
+    unbiased for spectra with few counts per bin.
+
+    The gradient of the negative log-likelihood, `J.T @ (1 - ydata / f)`, and the Fisher
+    information, `J.T @ (J / f[:, np.newaxis])`, are computed in closed form from the analytic
+    Jacobian `jac`, and minimized by Levenberg-Marquardt damped Fisher scoring. The covariance of the
+    fitted parameters is the inverse of the Fisher information.
+
+    Raise a `RuntimeError` if the fit does not converge within `maxIterations` iterations, if the
+    parameters or the negative log-likelihood become non-finite, if a parameter runs away (moves
+    by more than `runaway` times its initial magnitude plus the range of `xdata`), or if the fit
+    stalls (no step decreases the negative log-likelihood) away from a minimum.
+    """
+
+    xdata = np.asarray(xdata, dtype = float)
+    ydata = np.asarray(ydata, dtype = float)
+    lower = np.broadcast_to(np.asarray(bounds[0], dtype = float), np.shape(p0))
+    upper = np.broadcast_to(np.asarray(bounds[1], dtype = float), np.shape(p0))
+    parameters = np.clip(np.asarray(p0, dtype = float), lower, upper)
+    initial = parameters.copy()
+    limit = runaway * (np.abs(initial) + np.ptp(xdata))
+
+    expected = f(xdata, *parameters)
+    objective = poissonNegativeLogLikelihood(expected, ydata)
+    if not np.isfinite(objective):
+        raise RuntimeError("Poisson maximum-likelihood fit: non-finite negative log-likelihood at the initial parameters.")
+    damping = 1e-3
+
+    for _ in range(maxIterations):
+        jacobian = jac(xdata, *parameters)
+        weights = 1.0 / np.maximum(expected, 1e-300)
+        gradient = jacobian.T @ (1.0 - ydata * weights)
+        information = jacobian.T @ (jacobian * weights[:, np.newaxis])
+
+        # Increase the damping until a step decreases the negative log-likelihood
+        while True:
+            damped = information + damping * np.diag(np.diag(information))
+            try:
+                step = np.linalg.solve(damped, -gradient)
+            except np.linalg.LinAlgError:
+                step = np.zeros_like(parameters)
+            candidate = np.clip(parameters + step, lower, upper)
+            candidateExpected = f(xdata, *candidate)
+            valid = np.all((candidateExpected > 0.0) | (ydata == 0.0))
+            candidateObjective = poissonNegativeLogLikelihood(candidateExpected, ydata) if valid else np.inf
+            if candidateObjective <= objective or damping > 1e12:
+                break
+            damping *= 10.0
+
+        if candidateObjective > objective:
+            # No further decrease: converged to numerical precision if the expected decrease of a
+            # Fisher scoring step (the Newton decrement, ignoring parameters held by their bounds)
+            # is negligible, stalled otherwise
+            free = ~(((parameters <= lower) & (gradient > 0.0)) | ((parameters >= upper) & (gradient < 0.0)))
+            try:
+                decrement = gradient[free] @ np.linalg.solve(information[np.ix_(free, free)], gradient[free])
+            except np.linalg.LinAlgError:
+                decrement = np.inf
+            if not decrement <= np.sqrt(tolerance) * max(abs(objective), 1.0):
+                raise RuntimeError("Poisson maximum-likelihood fit stalled away from a minimum.")
+            break
+
+        if not np.all(np.isfinite(candidate)) or not np.isfinite(candidateObjective):
+            raise RuntimeError("Poisson maximum-likelihood fit: non-finite parameters or negative log-likelihood.")
+        if np.any(np.abs(candidate - initial) > limit):
+            raise RuntimeError(f"Poisson maximum-likelihood fit: runaway parameters {candidate.tolist()}.")
+
+        decrease = objective - candidateObjective
+        parameters, expected, objective = candidate, candidateExpected, candidateObjective
+        damping = max(damping / 10.0, 1e-9)
+        if decrease <= tolerance * max(abs(objective), 1.0):
+            break
+    else:
+        raise RuntimeError(f"Poisson maximum-likelihood fit did not converge within {maxIterations} iterations.")
+
+    jacobian = jac(xdata, *parameters)
+    information = jacobian.T @ (jacobian / np.maximum(expected, 1e-300)[:, np.newaxis])
+    try:
+        covariance = np.linalg.inv(information)
+    except np.linalg.LinAlgError:
+        covariance = np.full_like(information, np.inf)
+
+    return parameters, covariance
+
+####################################################################################################
+
+def peakWindow(
+    x: np.ndarray,
+    means: Iterable[float],
+    stdDevs: Iterable[float],
+    nStdDevs: float = 2.0
+) -> np.ndarray:
+    """
+    Mask of the points of `x` within `nStdDevs` standard deviations of any of the given peaks, to
+    which fits of bare peak models (without background) are restricted.
+    """
+    x = np.asarray(x, dtype = float)[:, np.newaxis]
+    means = np.asarray(means, dtype = float)
+    stdDevs = np.abs(np.asarray(stdDevs, dtype = float))
+    return np.any(np.abs(x - means) <= nStdDevs * stdDevs, axis = 1)
+
+####################################################################################################
+
+def fitCurve(
+    f: Callable,
+    xdata: np.ndarray,
+    ydata: np.ndarray,
+    p0: Iterable[float],
+    jac: Callable,
+    method: str = "leastSquares",
+    bounds: tuple = (-np.inf, np.inf)
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Fit the model `f(xdata, *parameters)` to `ydata` by (unweighted) least squares
+    (`method = "leastSquares"`, with `scipy.optimize.curve_fit`) or by binned Poisson maximum
+    likelihood (`method = "poisson"`, see `poissonFit`). Return the fitted parameters and their
+    covariance matrix. Raise a `RuntimeError` if the fit fails.
+    """
+    if method == "leastSquares":
+        return curve_fit(f = f, xdata = xdata, ydata = ydata, p0 = p0, jac = jac, bounds = bounds)
+    if method == "poisson":
+        return poissonFit(f = f, xdata = xdata, ydata = ydata, p0 = p0, jac = jac, bounds = bounds)
+    raise ValueError(f"Unknown fit method `method = {method!r}`. `method` should be either \"leastSquares\" or \"poisson\".")
@@ -0,0 +1,129 @@
+import numpy as np
+from scipy.special import ndtr
+from scipy.fft import next_fast_len
+from scipy.sparse import csr_array
+from collections.abc import Iterable, Callable # For type hint only
+from ..types import float_MeV # For type hint only
+
+####################################################################################################
+
+def resolutionStdDev(
+    energy: np.ndarray,
+    stdDev: float_MeV | Callable[[np.ndarray], np.ndarray] | Iterable[float_MeV]
+) -> np.ndarray:
+    """
+    Standard deviations of the Gaussian energy resolution at each given true energy: `stdDev` is
+    either a constant, a function σ(E) of the true energy (e.g. `lambda energy: 0.03 *
+    np.sqrt(energy)`), or an array with one standard deviation per true energy.
+    """
+    energy = np.asarray(energy, dtype = float)
+    if callable(stdDev):
+        stdDev = stdDev(energy)
+    return np.broadcast_to(np.asarray(stdDev, dtype = float), energy.shape)
+
+####################################################################################################
+
+def gaussianCdf(
+    edges: np.ndarray,
+    energy: np.ndarray,
+    stdDev: np.ndarray
+) -> np.ndarray:
+    """
+    Probabilities for events of true energies `energy` to be measured below `edges` (broadcast
+    against each other), given Gaussian energy resolutions of standard deviations `stdDev`. A
+    vanishing standard deviation means a perfect energy resolution.
+    """
+    with np.errstate(divide = "ignore", invalid = "ignore"):
+        cdf = ndtr((edges - energy) / stdDev)
+    return np.where(stdDev > 0, cdf, edges >= energy)
+
+####################################################################################################
+
+def gaussianResponseMatrix(
+    energy: Iterable[float_MeV],
+    lower: Iterable[float_MeV],
+    upper: Iterable[float_MeV],
+    stdDev: float_MeV | Callable[[np.ndarray], np.ndarray] | Iterable[float_MeV]
+) -> np.ndarray:
+    """
+    Matrix of the probabilities for an event of true energy `energy[k]` to be measured in the
+    energy bin `[lower[j], upper[j]]`, given a Gaussian energy resolution of standard deviation
+    `stdDev` (constant, or energy-dependent, see `resolutionStdDev`). A histogram `counts` of true
+    energies is smeared onto these bins by the matrix-vector product
+    `gaussianResponseMatrix(energy, lower, upper, stdDev) @ counts`.
+    """
+    stdDev = resolutionStdDev(energy, stdDev)[np.newaxis, :]
+    energy = np.asarray(energy, dtype = float)[np.newaxis, :]
+    lower = np.asarray(lower, dtype = float)
+    upper = np.asarray(upper, dtype = float)
+
+    # Contiguous bins: evaluate the cumulative distribution function once per bin edge
+    if np.array_equal(lower[1:], upper[:-1]):
+        cdf = gaussianCdf(np.append(lower, upper[-1])[:, np.newaxis], energy, stdDev)
+        return np.diff(cdf, axis = 0)
+
+    return gaussianCdf(upper[:, np.newaxis], energy, stdDev) - gaussianCdf(lower[:, np.newaxis], energy, stdDev)
+
+####################################################################################################
+
+def sparseGaussianResponseMatrix(
+    energy: Iterable[float_MeV],
+    lower: Iterable[float_MeV],
+    upper: Iterable[float_MeV],
+    stdDev: float_MeV | Callable[[np.ndarray], np.ndarray] | Iterable[float_MeV],
+    nStdDevs: float = 6.0
+) -> csr_array:
+    """
+    Sparse (banded) counterpart of `gaussianResponseMatrix` for contiguous energy bins: only the
+    energy bins within `nStdDevs` standard deviations of each true energy are evaluated and stored,
+    so that both the construction and the matrix-vector products scale with the width of the band
+    rather than with the number of bins.
+    """
+    energy = np.asarray(energy, dtype = float)
+    stdDev = resolutionStdDev(energy, stdDev)
+    edges = np.append(np.asarray(lower, dtype = float), np.asarray(upper, dtype = float)[-1])
+    nBins = len(edges) - 1
+
+    # Range of energy bins [first, last) within `nStdDevs` standard deviations of each true energy
+    first = np.clip(np.searchsorted(edges, energy - nStdDevs * stdDev, side = "right") - 1, 0, nBins)
+    last = np.clip(np.searchsorted(edges, energy + nStdDevs * stdDev, side = "left"), first, nBins)
+    last = np.maximum(last, np.minimum(first + 1, nBins))
+
+    # Flat (bin, true energy) band
+    count = last - first
+    column = np.repeat(np.arange(len(energy)), count)
+    row = np.arange(np.sum(count)) - np.repeat(np.cumsum(count) - count, count) + np.repeat(first, count)
+
+    probability = (
+          gaussianCdf(edges[row + 1], energy[column], stdDev[column])
+        - gaussianCdf(edges[row], energy[column], stdDev[column])
+    )
+    return csr_array((probability, (row, column)), shape = (nBins, len(energy)))
+
+####################################################################################################
+
+def fftGaussianSmear(
+    counts: np.ndarray,
+    binWidth: float_MeV,
+    stdDev: float_MeV,
+    nStdDevs: float = 6.0
+) -> np.ndarray:
+    """
+    Smear histograms `counts` of true energies (last axis: uniform energy bins of width `binWidth`)
+    with a constant Gaussian energy resolution of standard deviation `stdDev`, by FFT convolution
+    with the Gaussian kernel integrated over each bin and truncated at `nStdDevs` standard
+    deviations. The output has the same energy bins (events smeared outside of them are lost).
+    """
+    counts = np.asarray(counts, dtype = float)
+    halfWidth = int(np.ceil(nStdDevs * stdDev / binWidth))
+    if halfWidth == 0:
+        return counts.copy()
+
+    edges = (np.arange(-halfWidth, halfWidth + 2) - 0.5) * binWidth
+    kernel = np.diff(ndtr(edges / stdDev))
+
+    # Linear (not circular) convolution, cropped to the input energy bins
+    nBins = counts.shape[-1]
+    nFft = next_fast_len(nBins + 2 * halfWidth, real = True)
+    smeared = np.fft.irfft(np.fft.rfft(counts, nFft, axis = -1) * np.fft.rfft(kernel, nFft), nFft, axis = -1)
+    return smeared[..., halfWidth:halfWidth + nBins]
@@ -0,0 +1,341 @@
+from . import EnergyBins
+import numpy as np
+from .Likelihood import fitCurve, peakWindow
+from collections.abc import Iterable # For type hint only
+from ..types import float_MeV # For type hint only
+
+####################################################################################################
+
+class SpectralModel:
+    """
+    Spectral model made of `nPeaks` Gaussian peaks and an optional background, with constrained
+    parameters:
+
+    - `sharedStdDev`: all peaks share the same standard deviation;
+    - `meanRatios[k]`: the mean of peak `k` is free if `None`, or fixed to `ratio` times the mean of
+      peak `reference` if `(reference, ratio)` (e.g. K/L internal conversion line energy ratios), a
+      single `ratio` being relative to the first peak (`reference = 0`);
+    - `amplitudeRatios[k]`: the same for the amplitude of peak `k` (e.g. K/L intensity ratios);
+    - `background`: `None`, `"polynomial"` (of degree `backgroundDegree`), or `"exponential"`
+      (`background0 * exp(-background1 * x)`).
+
+    The constraints are compiled once into a parameter layout: the names of the free parameters,
+    and linear maps from the free parameters to the amplitudes, means and standard deviations of
+    all peaks. Evaluation and analytic Jacobians are then vectorized over bins and peaks. Example
+    with the K and L lines of two Bi-207 internal conversion peaks on a linear background:
+
+    ```
+    model = SpectralModel(
+        nPeaks = 4,
+        sharedStdDev = True,
+        meanRatios = [None, (0, 0.5538 / 0.4817), None, (2, 1.0477 / 0.9757)],
+        background = "polynomial",
+        backgroundDegree = 1
+    )
+    parameters, covariance = model.fit(energyBins, spectrum, initialGuess = {"mean1": 0.48, "mean3": 0.98})
+    ```
+    """
+
+    def __init__(
+        self,
+        nPeaks: int = 1,
+        sharedStdDev: bool = False,
+        meanRatios: Iterable[float | tuple[int, float] | None] | None = None,
+        amplitudeRatios: Iterable[float | tuple[int, float] | None] | None = None,
+        background: str | None = None,
+        backgroundDegree: int = 1
+    ):
+        if nPeaks < 1:
+            raise ValueError(f"`nPeaks = {nPeaks}` should be at least 1.")
+        if background not in (None, "polynomial", "exponential"):
+            raise ValueError(f"Unknown background `background = {background!r}`. `background` should be `None`, \"polynomial\" or \"exponential\".")
+
+        self.nPeaks = nPeaks
+        self.sharedStdDev = sharedStdDev
+        self.meanRatios = [self.toRatio(ratio) for ratio in meanRatios] if meanRatios is not None else [None] * nPeaks
+        self.amplitudeRatios = [self.toRatio(ratio) for ratio in amplitudeRatios] if amplitudeRatios is not None else [None] * nPeaks
+        self.background = background
+        self.backgroundDegree = backgroundDegree
+
+        if len(self.meanRatios) != nPeaks or len(self.amplitudeRatios) != nPeaks:
+            raise ValueError("`meanRatios` and `amplitudeRatios` should have one item per peak.")
+        for ratios in (self.meanRatios, self.amplitudeRatios):
+            for ratio in ratios:
+                if ratio is not None and ratios[ratio[0]] is not None:
+                    raise ValueError(f"The reference peak of the ratio `{ratio}` should have free parameters (`None` ratio).")
+
+        self.compile()
+
+    @staticmethod
+    def toRatio(
+        ratio: float | tuple[int, float] | None
+    ) -> tuple[int, float] | None:
+        """
+        Normalize a ratio constraint to `(reference, ratio)`, or `None` for a free parameter.
+        """
+        if ratio is None:
+            return None
+        if isinstance(ratio, tuple):
+            return (int(ratio[0]), float(ratio[1]))
+        return (0, float(ratio))
+
+    def __repr__(
+        self
+    ) -> str:
+        return "\n".join([
+            f"{self.__class__.__name__}(",
+            f"  nPeaks = {repr(self.nPeaks)},",
+            f"  sharedStdDev = {repr(self.sharedStdDev)},",
+            f"  meanRatios = {repr(self.meanRatios)},",
+            f"  amplitudeRatios = {repr(self.amplitudeRatios)},",
+            f"  background = {repr(self.background)},",
+            f"  backgroundDegree = {repr(self.backgroundDegree)}",
+            ")"
+        ])
+
+    def compile(
+        self
+    ) -> None:
+        """
+        Compile the constraints into the parameter layout: `parameterNames` (free parameters), and
+        the `(nPeaks, nParameters)` matrices mapping the free parameters to the amplitudes, means
+        and standard deviations of the peaks.
+        """
+
+        names = []
+
+        def addParameter(name):
+            names.append(name)
+            return len(names) - 1
+
+        amplitudeMap, meanMap, stdDevMap = [], [], []
+        sharedStdDevIndex = None
+
+        # Free parameters first, so that constrained peaks may refer to any other peak
+        for peak in range(self.nPeaks):
+            if self.amplitudeRatios[peak] is None:
+                amplitudeMap.append({addParameter(f"amplitude{peak + 1}"): 1.0})
+            else:
+                amplitudeMap.append(None)
+
+            if self.meanRatios[peak] is None:
+                meanMap.append({addParameter(f"mean{peak + 1}"): 1.0})
+            else:
+                meanMap.append(None)
+
+            if self.sharedStdDev:
+                if sharedStdDevIndex is None:
+                    sharedStdDevIndex = addParameter("stdDev")
+                stdDevMap.append({sharedStdDevIndex: 1.0})
+            else:
+                stdDevMap.append({addParameter(f"stdDev{peak + 1}"): 1.0})
+
+        for linearMaps, ratios, kind in ((amplitudeMap, self.amplitudeRatios, "amplitude"), (meanMap, self.meanRatios, "mean")):
+            for peak, ratio in enumerate(ratios):
+                if ratio is not None:
+                    reference, value = ratio
+                    linearMaps[peak] = {names.index(f"{kind}{reference + 1}"): value}
+
+        if self.background == "polynomial":
+            self.backgroundIndices = [addParameter(f"background{power}") for power in range(self.backgroundDegree + 1)]
+        elif self.background == "exponential":
+            self.backgroundIndices = [addParameter("background0"), addParameter("background1")]
+        else:
+            self.backgroundIndices = []
+
+        self.parameterNames = names
+        self.nParameters = len(names)
+
+        def toMatrix(linearMaps):
+            matrix = np.zeros((self.nPeaks, self.nParameters), dtype = float)
+            for peak, linearMap in enumerate(linearMaps):
+                for index, coefficient in linearMap.items():
+                    matrix[peak, index] = coefficient
+            return matrix
+
+        self.amplitudeMatrix = toMatrix(amplitudeMap)
+        self.meanMatrix = toMatrix(meanMap)
+        self.stdDevMatrix = toMatrix(stdDevMap)
+
+    def expand(
+        self,
+        parameters: Iterable[float]
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Amplitudes, means and standard deviations of all peaks, and background parameters, from the
+        free parameters.
+        """
+        parameters = np.asarray(parameters, dtype = float)
+        return (
+            self.amplitudeMatrix @ parameters,
+            self.meanMatrix @ parameters,
+            self.stdDevMatrix @ parameters,
+            parameters[self.backgroundIndices]
+        )
+
+    def evaluate(
+        self,
+        x,
+        parameters: Iterable[float]
+    ) -> np.ndarray:
+        """
+        Evaluate the model at energies `x` for the given free parameters.
+        """
+        x = np.asarray(x, dtype = float)
+        amplitudes, means, stdDevs, backgroundParameters = self.expand(parameters)
+        gaussians = np.exp(-(x[:, np.newaxis] - means)**2 / (2.0 * stdDevs**2))
+        return gaussians @ amplitudes + self.evaluateBackground(x, backgroundParameters)
+
+    def evaluateBackground(
+        self,
+        x: np.ndarray,
+        backgroundParameters: np.ndarray
+    ) -> np.ndarray:
+        """
+        Evaluate the background at energies `x`.
+        """
+        if self.background == "polynomial":
+            return np.polynomial.polynomial.polyval(x, backgroundParameters)
+        if self.background == "exponential":
+            return backgroundParameters[0] * np.exp(-backgroundParameters[1] * x)
+        return np.zeros_like(x)
+
+    def jacobian(
+        self,
+        x,
+        parameters: Iterable[float]
+    ) -> np.ndarray:
+        """
+        Analytic Jacobian of the model at energies `x` with respect to the free parameters, as a
+        `(len(x), nParameters)` array.
+        """
+
+        x = np.asarray(x, dtype = float)
+        amplitudes, means, stdDevs, backgroundParameters = self.expand(parameters)
+
+        deviations = x[:, np.newaxis] - means
+        gaussians = np.exp(-deviations**2 / (2.0 * stdDevs**2))
+        weighted = gaussians * amplitudes
+
+        # Chain rule through the linear maps of the compiled parameter layout
+        jacobian = (
+              gaussians @ self.amplitudeMatrix
+            + (weighted * deviations / stdDevs**2) @ self.meanMatrix
+            + (weighted * deviations**2 / stdDevs**3) @ self.stdDevMatrix
+        )
+
+        if self.background == "polynomial":
+            jacobian[:, self.backgroundIndices] = x[:, np.newaxis]**np.arange(self.backgroundDegree + 1)
+        elif self.background == "exponential":
+            exponential = np.exp(-backgroundParameters[1] * x)
+            jacobian[:, self.backgroundIndices[0]] = exponential
+            jacobian[:, self.backgroundIndices[1]] = -backgroundParameters[0] * x * exponential
+
+        return jacobian
+
+    def initialGuess(
+        self,
+        energyBins: EnergyBins,
+        spectrum,
+        initialGuess: dict[str, float] | Iterable[float] | None = None
+    ) -> np.ndarray:
+        """
+        Initial free parameters. `initialGuess` is either a complete sequence of free parameters,
+        or a (possibly partial) dictionary of named free parameters, the other ones being guessed
+        from the spectrum: peaks are spread over the energy range with the highest bin for the first
+        one, widths of three bins, and a flat background at the lowest bin content.
+        """
+
+        if initialGuess is not None and not isinstance(initialGuess, dict):
+            return np.asarray(initialGuess, dtype = float)
+
+        spectrum = np.asarray(spectrum, dtype = float)
+        energy = (np.asarray(energyBins.lower) + np.asarray(energyBins.upper)) / 2
+        argmax = np.argmax(spectrum)
+        spread = np.linspace(energy[0], energy[-1], self.nPeaks + 2)[1:-1]
+
+        guess = {}
+        for peak in range(self.nPeaks):
+            mean = energy[argmax] if peak == 0 else spread[peak]
+            guess[f"amplitude{peak + 1}"] = spectrum[argmax] if peak == 0 else spectrum[np.argmin(np.abs(energy - mean))]
+            guess[f"mean{peak + 1}"] = mean
+            guess[f"stdDev{peak + 1}"] = 3.0 * energyBins.binWidth
+        guess["stdDev"] = 3.0 * energyBins.binWidth
+        guess["background0"] = np.min(spectrum) if self.background == "polynomial" else max(np.min(spectrum), 1e-9)
+        guess |= {f"background{power}": 0.0 for power in range(1, self.backgroundDegree + 1)}
+        guess |= initialGuess or {}
+
+        return np.array([guess[name] for name in self.parameterNames], dtype = float)
+
+    def defaultBounds(
+        self
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Bounds of the free parameters: non-negative amplitudes, strictly positive standard
+        deviations, unbounded means and background parameters.
+        """
+        lower = np.array([
+            0.0 if name.startswith("amplitude") else 1e-9 if name.startswith("stdDev") else -np.inf
+            for name in self.parameterNames
+        ])
+        return lower, np.full(self.nParameters, np.inf)
+
+    def fit(
+        self,
+        energyBins: EnergyBins,
+        spectrum,
+        initialGuess: dict[str, float] | Iterable[float] | None = None,
+        bounds: tuple | None = None,
+        method: str = "leastSquares",
+        nStdDevs: float = 2.0
+    ) -> tuple[dict[str, float], np.ndarray]:
+        """
+        Least-squares (`method = "leastSquares"`) or binned Poisson maximum-likelihood
+        (`method = "poisson"`) fit of the model to a spectrum, with the analytic Jacobian. Return the
+        fitted free parameters by name, and their covariance matrix (in `parameterNames` order).
+
+        Without `bounds`, Poisson fits have non-negative amplitudes and strictly positive standard
+        deviations (see `defaultBounds`), and Poisson fits of models without background are
+        restricted to the bins within `nStdDevs` standard deviations of the guessed peaks.
+        """
+
+        energy = (np.asarray(energyBins.lower) + np.asarray(energyBins.upper)) / 2
+        spectrum = np.asarray(spectrum, dtype = float)
+        p0 = self.initialGuess(energyBins, spectrum, initialGuess)
+
+        if method == "poisson":
+            if bounds is None:
+                bounds = self.defaultBounds()
+            if self.background is None:
+                _, means, stdDevs, _ = self.expand(p0)
+                window = peakWindow(energy, means, stdDevs, nStdDevs = nStdDevs)
+                if np.count_nonzero(window) <= self.nParameters:
+                    raise RuntimeError(f"Too few energy bins ({np.count_nonzero(window)}) around the guessed peaks for a Poisson fit.")
+                energy, spectrum = energy[window], spectrum[window]
+        elif bounds is None:
+            bounds = (-np.inf, np.inf)
+
+        fitted, covariance = fitCurve(
+            f = lambda x, *parameters: self.evaluate(x, parameters),
+            xdata = energy,
+            ydata = spectrum,
+            p0 = p0,
+            jac = lambda x, *parameters: self.jacobian(x, parameters),
+            method = method,
+            bounds = bounds
+        )
+
+        return dict(zip(self.parameterNames, map(float, fitted))), covariance
+
+    def peaks(
+        self,
+        parameters: dict[str, float] | Iterable[float]
+    ) -> list[tuple[float, float_MeV, float_MeV]]:
+        """
+        Amplitude, mean and standard deviation of each peak, from the free parameters (as a
+        sequence or by name).
+        """
+        if isinstance(parameters, dict):
+            parameters = [parameters[name] for name in self.parameterNames]
+        amplitudes, means, stdDevs, _ = self.expand(parameters)
+        return list(zip(amplitudes.tolist(), means.tolist(), stdDevs.tolist()))
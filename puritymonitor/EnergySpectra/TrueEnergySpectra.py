@@ -0,0 +1,141 @@
+import numpy as np
+from .EnergyBins import EnergyBins
+from .Resolution import gaussianResponseMatrix, sparseGaussianResponseMatrix, fftGaussianSmear
+from collections.abc import Callable # For type hint only
+from typing import Self # For type hint only
+from ..types import float_MeV # For type hint only
+
+####################################################################################################
+
+class TrueEnergySpectra:
+    """
+    Simulated anode spectra of true (i.e. unsmeared) electron energies, with fine uniform energy
+    bins, to which any energy resolution is applied afterwards at the histogram level (see
+    `smear`), without re-simulating:
+
+    ```
+    trueSpectra = purityMonitor.simulateTrueEnergySpectra(nEvents = 100_000_000, attDistance = 500.0)
+    for energyStdDev in np.linspace(0.02, 0.08, 61):
+        energyBins, anodeSpectra = trueSpectra.smear(energyStdDev = energyStdDev)
+    energyBins, anodeSpectra = trueSpectra.smear(energyStdDev = lambda energy: 0.04 * np.sqrt(energy))
+    ```
+
+    Smeared spectra are expected numbers of events (floats), statistically equivalent to the
+    spectra simulated with the same energy resolution event by event, up to the fine binning of
+    the true energies (each event is smeared from the center of its fine bin).
+    """
+
+    def __init__(
+        self,
+        energyBins: EnergyBins,
+        anodeSpectra: np.ndarray,
+        nEvents: int = 0
+    ):
+        if not energyBins.uniform:
+            raise ValueError("The fine energy bins of true energy spectra should be uniform.")
+        self.energyBins = energyBins
+        self.anodeSpectra = np.asarray(anodeSpectra, dtype = float) # (anode, fine energy bin)
+        self.nEvents = nEvents
+        self.energy = (np.asarray(energyBins.lower) + np.asarray(energyBins.upper)) / 2
+        self.kernelKey, self.kernel = None, None # Last response matrix, reused for the same inputs
+
+    def __repr__(
+        self
+    ) -> str:
+        return f"{self.__class__.__name__}({self.energyBins}, {len(self.anodeSpectra)} anodes, {self.nEvents} events)"
+
+    def smear(
+        self,
+        energyStdDev: float_MeV | Callable[[np.ndarray], np.ndarray] = 0.0,
+        nBins: int = 100,
+        minEnergy: float = 0.0,
+        maxEnergy: float = 2.0,
+        energyScale: float = 1.0,
+        method: str = "auto",
+        nStdDevs: float = 6.0
+    ) -> tuple[EnergyBins, tuple[np.ndarray]]:
+        """
+        Apply a Gaussian energy resolution of standard deviation `energyStdDev` (constant, or a
+        function σ(E) of the true energy, in MeV) to the true energy spectra, rebinned onto `nBins`
+        energy bins from `minEnergy` to `maxEnergy`, and return the same `(energyBins,
+        anodeSpectra)` output as `PurityMonitor.simulateEnergySpectra`.
+
+        With `method = "fft"`, a constant resolution is applied by FFT convolution on the fine
+        energy bins, which are then summed into the output energy bins (which should be aligned
+        with the fine ones). With `method = "sparse"` (or `"dense"`), the spectra are multiplied by
+        a banded sparse (or dense) response matrix, for any σ(E) and output energy bins; the last
+        response matrix is kept for the next calls with the same inputs. `"auto"` picks `"fft"`
+        whenever possible, `"sparse"` otherwise.
+        """
+
+        energyBins = EnergyBins.fromRange(minEnergy = minEnergy, maxEnergy = maxEnergy, nBins = nBins)
+        fineWidth = self.energyBins.binWidth
+        ratio = energyBins.binWidth / fineWidth
+        offset = (minEnergy - self.energyBins.lower[0]) / fineWidth
+        aligned = (
+                abs(ratio - round(ratio)) < 1e-6 and round(ratio) >= 1
+            and abs(offset - round(offset)) < 1e-6 and round(offset) >= 0
+            and round(offset) + nBins * round(ratio) <= self.energyBins.nBins
+        )
+
+        if method == "auto":
+            method = "fft" if aligned and not callable(energyStdDev) else "sparse"
+        if method not in ("fft", "sparse", "dense"):
+            raise ValueError(f"Unknown smearing method `method = {method!r}`. `method` should be \"auto\", \"fft\", \"sparse\" or \"dense\".")
+
+        if method == "fft":
+            if callable(energyStdDev) or not aligned:
+                raise ValueError("FFT smearing requires a constant `energyStdDev`, and output energy bins aligned with the fine energy bins.")
+            smeared = fftGaussianSmear(self.anodeSpectra, fineWidth, energyStdDev, nStdDevs = nStdDevs)
+            start, ratio = round(offset), round(ratio)
+            anodeSpectra = smeared[:, start:start + nBins * ratio].reshape(len(smeared), nBins, ratio).sum(axis = -1)
+        else:
+            key = (method, energyStdDev, nBins, minEnergy, maxEnergy, nStdDevs)
+            if key != self.kernelKey:
+                if method == "sparse":
+                    self.kernel = sparseGaussianResponseMatrix(self.energy, energyBins.lower, energyBins.upper, energyStdDev, nStdDevs = nStdDevs)
+                else:
+                    self.kernel = gaussianResponseMatrix(self.energy, energyBins.lower, energyBins.upper, energyStdDev)
+                self.kernelKey = key
+            anodeSpectra = (self.kernel @ self.anodeSpectra.T).T
+
+        if energyScale != 1.0:
+            energyBins.scale(scale = energyScale)
+        return energyBins, tuple(anodeSpectra)
+
+    def save(
+        self,
+        filename: str
+    ) -> Self:
+        """
+        Save the true energy spectra to a `npz` file.
+        """
+        np.savez(
+            filename,
+            lower = self.energyBins.lower,
+            upper = self.energyBins.upper,
+            anodeSpectra = self.anodeSpectra,
+            nEvents = self.nEvents
+        )
+        return self
+
+    @classmethod
+    def load(
+        cls,
+        filename: str
+    ) -> Self:
+        """
+        Load true energy spectra from a `npz` file written by `save`.
+        """
+        with np.load(filename) as data:
+            lower, upper = data["lower"], data["upper"]
+            return cls(
+                energyBins = EnergyBins(
+                    lower = lower,
+                    upper = upper,
+                    nBins = len(lower),
+                    binWidth = float(np.median(upper - lower))
+                ),
+                anodeSpectra = data["anodeSpectra"],
+                nEvents = int(data["nEvents"])
+            )
@@ -1,2 +1,5 @@
 from .EnergyBins import EnergyBins
-from .EnergySpectra import EnergySpectra
\ No newline at end of file
+from .EnergySpectra import EnergySpectra
+from .SpectralModel import SpectralModel
+from .Resolution import gaussianResponseMatrix, sparseGaussianResponseMatrix, fftGaussianSmear
+from .TrueEnergySpectra import TrueEnergySpectra
@@ -0,0 +1,125 @@
+from ..types import float_mm, float_MeV # For type hint only
+from .Geometry import CylindricalGeometry, ring
+from .MultipleAnodes import MultipleAnodes
+from collections.abc import Iterable, Callable # For type hint only
+import numpy as np
+
+####################################################################################################
+
+class CylinderConcentricRingAnodes(CylindricalGeometry, MultipleAnodes):
+    """
+    Cylindrical TPC geometry with `nAnodes` concentric anodes: a central disk anode of radius
+    `radii[0]`, surrounded by ring anodes between `radii[k - 1]` and `radii[k]`. Example with a
+    central disk and three rings:
+
+    ```
+    geometry = CylinderConcentricRingAnodes(radii = [10.0, 20.0, 30.0, 40.0], driftLength = 100.0)
+    ```
+
+    Events are assigned to anodes with a single `np.searchsorted` of r² against the squared radii,
+    so that the cost per event barely depends on the number of anodes.
+    """
+
+    def __init__(
+        self,
+        radii: Iterable[float_mm],
+        driftLength: float_mm
+    ):
+        radii = [float(radius) for radius in radii]
+        if len(radii) == 0 or np.any(np.diff(radii) <= 0) or radii[0] <= 0:
+            raise ValueError(f"`radii = {radii}` should be a non-empty list of strictly increasing positive radii.")
+        super().__init__(nAnodes = len(radii))
+        self.description = f"cylindrical geometry with {len(radii)} concentric anodes"
+        self.radii = radii
+        self.driftLength = driftLength
+
+        # Squared radii: boundaries between anodes for `np.searchsorted`
+        self.radii2 = np.square(self.radii)
+
+    def __repr__(
+        self
+    ):
+        return "\n".join([
+            f"{self.__class__.__name__}(",
+            f"  radii = {repr(self.radii)}, # mm",
+            f"  driftLength = {repr(self.driftLength)}  # mm",
+            ")"
+        ])
+
+    def __eq__(
+        self,
+        other
+    ):
+        """
+        Equality test between two `CylinderConcentricRingAnodes` instances, i.e. whether they
+        describe the same geometry.
+        """
+
+        # Comparison between a `CylinderConcentricRingAnodes` instance and any other object is not
+        # implemented.
+        if not isinstance(other, self.__class__):
+            raise NotImplementedError
+        return self.radii == other.radii and self.driftLength == other.driftLength
+
+    @property
+    def activeRadius(
+        self
+    ) -> float_mm:
+        return self.radii[-1]
+
+    def drawAnodes(
+        self,
+        ax,
+        colors: Iterable[str] | None = None
+    ):
+        """
+        Draw the anodes, from the central disk anode to the outermost ring anode, with the given
+        `colors` (cycled; the default color cycle by default).
+        """
+        colors = list(colors) if colors is not None else [f"C{anode}" for anode in range(self.nAnodes)]
+        for anode, (innerRadius, outerRadius) in enumerate(zip([0.0] + self.radii[:-1], self.radii)):
+            ax.plot_surface(
+                *ring(innerRadius = innerRadius, outerRadius = outerRadius, planeZ = self.driftLength),
+                alpha = 0.5,
+                color = colors[anode % len(colors)],
+                shade = False
+            )
+
+    def resetAnodeSpectra(
+        self,
+        nBins: int = 100,
+        minEnergy: float_MeV = 0.0,
+        maxEnergy: float_MeV = 2.0
+    ):
+        super().resetAnodeSpectra(nBins = nBins, minEnergy = minEnergy, maxEnergy = maxEnergy)
+        self.radii2 = np.square(self.radii)
+
+    def anodeIndices(
+        self,
+        x: np.ndarray,
+        y: np.ndarray,
+        z: np.ndarray
+    ) -> np.ndarray:
+        """
+        Index of the anode (from 0 for the central disk anode to `nAnodes - 1` for the outermost
+        ring anode) collecting the electrons emitted at each given 3D point (x, y, z), or -1 for
+        points outside of the active volume. A point at radius `radii[k]` belongs to anode `k`.
+        """
+        r2 = np.asarray(x)**2 + np.asarray(y)**2
+        z = np.asarray(z)
+        anode = np.searchsorted(self.radii2, r2, side = "left")
+        inVolume = (0 <= z) & (z <= self.driftLength) & (anode < self.nAnodes)
+        return np.where(inVolume, anode, -1)
+
+    def plotAnodeSpectra(
+        self,
+        ax,
+        energyStdDev: float_MeV,
+        anodeLabel: Callable[[int], str] = lambda anode: "Central anode" if anode == 0 else f"Ring anode {anode}",
+        **kwargs
+    ):
+        """
+        Plot the spectrum of each anode, from the central disk anode to the outermost ring anode,
+        and the fit of its IC peaks (see `MultipleAnodes.plotAnodeSpectra`).
+        """
+        return super().plotAnodeSpectra(ax, energyStdDev = energyStdDev, anodeLabel = anodeLabel, **kwargs)
@@ -1,12 +1,12 @@
 from ..types import float_mm, float_MeV # For type hint only
 from ..EnergySpectra import EnergyBins, EnergySpectra
-from .Geometry import Geometry, cylinder, ring
+from .Geometry import CylindricalGeometry, ring
 from .InnerOuterAnodes import InnerOuterAnodes
 import numpy as np
 
 ####################################################################################################
 
-class CylinderConcentricTwoPartAnode(InnerOuterAnodes):
+class CylinderConcentricTwoPartAnode(CylindricalGeometry, InnerOuterAnodes):
     """
     Cylindrical TPC geometry with concentric inner disk anode and outer ring anode.
     """
@@ -22,6 +22,10 @@ class CylinderConcentricTwoPartAnode(InnerOuterAnodes):
         self.innerRadius = innerRadius
         self.outerRadius = outerRadius
         self.driftLength = driftLength
+
+        # Squared radii for the anode assignment (also refreshed by `resetAnodeSpectra`)
+        self.innerRadius2 = innerRadius**2
+        self.outerRadius2 = outerRadius**2
         
     def __repr__(
         self
@@ -65,19 +69,19 @@ class CylinderConcentricTwoPartAnode(InnerOuterAnodes):
             and self.driftLength == self.driftLength
         )
     
-    def draw(
+    @property
+    def activeRadius(
+        self
+    ) -> float_mm:
+        return self.outerRadius
+
+    def drawAnodes(
         self,
         ax
     ):
         """
-        Draw the geometry.
+        Draw the inner (blue) and outer (orange) anodes.
         """
-        ax.plot_surface(
-            *cylinder(radius = self.outerRadius, height = self.driftLength),
-            alpha = 0.125,
-            color = "k",
-            shade = False
-        )
         ax.plot_surface(
             *ring(innerRadius = 0, outerRadius = self.innerRadius, planeZ = self.driftLength),
             alpha = 0.5,
@@ -90,73 +94,40 @@ class CylinderConcentricTwoPartAnode(InnerOuterAnodes):
             color = "tab:orange",
             shade = False
         )
-        ax.plot_surface(
-            *ring(innerRadius = 0, outerRadius = self.outerRadius, planeZ = 0),
-            alpha = 0.25,
-            color = "k",
-            shade = False
-        )
-        ax.plot(
-            [0], [0], [0],
-            alpha = 1.,
-            markerfacecolor = "tab:green",
-            markeredgecolor = "tab:green",
-            marker = "o"
-        )
-        
-        # Equal axes (https://github.com/matplotlib/matplotlib/issues/17172#issuecomment-830139107)
-        ax.set_box_aspect([
-            upperBound - lowerBound
-            for lowerBound, upperBound in (getattr(ax, f"get_{axis}lim")() for axis in "xyz")
-        ])
-        
-    def isInsideActiveVolume(
-        self,
-        x: float_mm,
-        y: float_mm,
-        z: float_mm
-    ) -> bool:
-        """
-        Indicate whether a given 3D point (x, y, z) lies inside the active volume.
-        """
-        return ((x**2 + y**2) <= self.outerRadius**2) and (0 <= z <= self.driftLength)
-    
-    def decayVertexAndDirection(
-        self
-    ) -> tuple[tuple[float_mm, float_mm, float_mm], tuple[float, float, float]]:
-        """
-        Sample a random IC electron or gamma emission vertex at the surface of the radioactive
-        source, and a random direction in the upper half-space (i.e. from the cathode plane to the
-        anode plane).
-        """
-
-        # Random direction in the upper half-space (i.e. from the cathode plane to the anode plane)
-        ctheta = np.random.random()
-        stheta = np.sqrt(1.0 - ctheta**2)
-        phi = 2.0 * np.pi * np.random.random()
 
-        # Random point (x, y, z = 0) inside a disk of radius squared r² = 6.25
-        r = np.random.triangular(0, np.sqrt(6.25), np.sqrt(6.25))
-        theta = 2 * np.pi * np.random.random()
-        x = r * np.cos(theta)
-        y = r * np.sin(theta)
-        z = 0.0
-
-        return (x, y, z), (ctheta, stheta, phi)
-    
     def resetAnodeSpectra(
         self,
         nBins: int = 100,
         minEnergy: float_MeV = 0.0,
         maxEnergy: float_MeV = 2.0
     ):
-        self.innerAnodeSpectrum = np.zeros(nBins, dtype = int)
-        self.outerAnodeSpectrum = np.zeros(nBins, dtype = int)
+        # Inner and outer anode spectra are views of the rows of a single (2, nBins) array
+        self.anodeSpectraArray = np.zeros((2, nBins), dtype = int)
+        self.innerAnodeSpectrum = self.anodeSpectraArray[0]
+        self.outerAnodeSpectrum = self.anodeSpectraArray[1]
         self.energyBins = EnergyBins.fromRange(
             minEnergy = minEnergy,
             maxEnergy = maxEnergy,
             nBins = nBins
         )
+
+        self.innerRadius2 = self.innerRadius**2
+        self.outerRadius2 = self.outerRadius**2
+
+    def anodeIndices(
+        self,
+        x: np.ndarray,
+        y: np.ndarray,
+        z: np.ndarray
+    ) -> np.ndarray:
+        """
+        Index of the anode (0 for the inner anode, 1 for the outer anode) collecting the electrons
+        emitted at each given 3D point (x, y, z), or -1 for points outside of the active volume.
+        """
+        r2 = np.asarray(x)**2 + np.asarray(y)**2
+        z = np.asarray(z)
+        inVolume = (0 <= z) & (z <= self.driftLength) & (r2 <= self.outerRadius2)
+        return np.where(inVolume, (r2 > self.innerRadius2).astype(int), -1)
     
     def updateAnodeSpectra(
         self,
@@ -165,12 +136,26 @@ class CylinderConcentricTwoPartAnode(InnerOuterAnodes):
         z: float_mm,
         energy: float_MeV
     ):
-        mask = (energy > self.energyBins.lower) & (energy < self.energyBins.upper)
-        if 0 <= z <= self.driftLength:
-            if (x**2 + y**2) <= self.innerRadius**2:
-                self.innerAnodeSpectrum[mask] += 1
-            elif (x**2 + y**2) <= self.outerRadius**2:
-                self.outerAnodeSpectrum[mask] += 1
+        index = self.energyBins.binIndex(energy)
+        if 0 <= z <= self.driftLength and index >= 0:
+            if (x**2 + y**2) <= self.innerRadius2:
+                self.innerAnodeSpectrum[index] += 1
+            elif (x**2 + y**2) <= self.outerRadius2:
+                self.outerAnodeSpectrum[index] += 1
+
+    def fillAnodeSpectra(
+        self,
+        x: np.ndarray,
+        y: np.ndarray,
+        z: np.ndarray,
+        energy: np.ndarray
+    ):
+        """
+        Array counterpart of `updateAnodeSpectra`, filling the anode spectra with a batch of events.
+        Anodes are assigned by comparing r² to the precomputed squared radii, energy bins by direct
+        index calculation, and both spectra are filled with a single `np.bincount`.
+        """
+        self.fillAnodeSpectraFromIndices(self.anodeIndices(x, y, z), energy)
     
     def getAnodeSpectra(
         self
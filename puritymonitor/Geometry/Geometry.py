@@ -1,5 +1,6 @@
 import numpy as np
 from ..EnergySpectra import EnergyBins
+from ..rng import getRng, bindRng
 from collections.abc import Iterable # For type hint only
 from ..types import float_mm, float_MeV # For type hint only
 
@@ -42,11 +43,20 @@ def ring(
 class Geometry:
     """
     Abstract base class to inherit from and implement.
+
+    Geometries expose two protocols: a scalar one, handling one point or event at a time
+    (`isInsideActiveVolume`, `decayVertexAndDirection`, `updateAnodeSpectra`), and an array one,
+    handling arrays of points or events at once (`areInsideActiveVolume`,
+    `decayVerticesAndDirections`, `anodeIndices`, `fillAnodeSpectra`), used by the batched
+    simulation engine. Derived classes implementing only the scalar protocol still work with the
+    batched engine, through the (slower) default array methods below, which loop over the scalar
+    ones. `anodeIndices` has no scalar counterpart and is only needed for `EventTable`s.
     """
     def __init__(
         self
     ):
         self.description = "geometry"
+        self.nAnodes = 0 # Number of anodes (set by derived classes)
         self.energyBins = EnergyBins(
             lower = [],
             upper = [],
@@ -120,9 +130,29 @@ class Geometry:
         This method must be implemented in derived classes.
         """
         raise NotImplementedError
+
+    def areInsideActiveVolume(
+        self,
+        x: np.ndarray,
+        y: np.ndarray,
+        z: np.ndarray
+    ) -> np.ndarray:
+        """
+        Array counterpart of `isInsideActiveVolume`, indicating whether each given 3D point
+        (x, y, z) lies inside the active volume.
+
+        This default implementation loops over `isInsideActiveVolume` and should be overridden in
+        derived classes by an array implementation.
+        """
+        return np.fromiter(
+            (bool(self.isInsideActiveVolume(*point)) for point in zip(x, y, z)),
+            dtype = bool,
+            count = len(x)
+        )
     
     def decayVertexAndDirection(
-        self
+        self,
+        rng: np.random.Generator | None = None
     ) -> tuple[tuple[float_mm, float_mm, float_mm], tuple[float, float, float]]:
         """
         Sample a random IC electron or gamma emission vertex at the surface of the radioactive
@@ -132,6 +162,76 @@ class Geometry:
         This method must be implemented in derived classes.
         """
         raise NotImplementedError
+
+    def decayVerticesAndDirections(
+        self,
+        nEvents: int,
+        rng: np.random.Generator | None = None
+    ) -> tuple[tuple[np.ndarray, np.ndarray, np.ndarray], tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """
+        Array counterpart of `decayVertexAndDirection`, sampling `nEvents` vertices and directions
+        at once.
+
+        This default implementation loops over `decayVertexAndDirection` (called without `rng` if
+        it does not accept one, see `bindRng`) and should be overridden in derived classes by an
+        array implementation.
+        """
+        rng = getRng(rng)
+        decayVertexAndDirection = bindRng(self.decayVertexAndDirection, rng) # Even without `rng`
+        samples = np.array([
+            (*vertex, *direction)
+            for vertex, direction in (decayVertexAndDirection() for _ in range(nEvents))
+        ], dtype = float).reshape(nEvents, 6)
+        x, y, z, ctheta, stheta, phi = samples.T
+        return (x, y, z), (ctheta, stheta, phi)
+
+    def decayVertices(
+        self,
+        nEvents: int,
+        rng: np.random.Generator | None = None
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Sample `nEvents` random emission vertices at the surface of the radioactive source, without
+        directions (see `decayVerticesAndDirections`).
+
+        This default implementation discards the directions sampled by `decayVerticesAndDirections`
+        and should be overridden in derived classes.
+        """
+        vertices, _ = self.decayVerticesAndDirections(nEvents = nEvents, rng = rng)
+        return vertices
+
+    def decayDirections(
+        self,
+        nEvents: int,
+        rng: np.random.Generator | None = None
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Sample `nEvents` isotropic random directions (cos θ, sin θ, φ) in the upper half-space (i.e.
+        from the cathode plane to the anode plane), e.g. for the products of a decay sharing its
+        vertex.
+        """
+
+        rng = getRng(rng)
+
+        ctheta = rng.random(nEvents)
+        stheta = np.sqrt(1.0 - ctheta**2)
+        phi = 2.0 * np.pi * rng.random(nEvents)
+
+        return ctheta, stheta, phi
+    
+    def anodeIndices(
+        self,
+        x: np.ndarray,
+        y: np.ndarray,
+        z: np.ndarray
+    ) -> np.ndarray:
+        """
+        Index of the anode collecting the electrons emitted at each given 3D point (x, y, z), or -1
+        for points outside of the active volume.
+
+        This method must be implemented in derived classes.
+        """
+        raise NotImplementedError
     
     def resetAnodeSpectra(
         self,
@@ -151,6 +251,44 @@ class Geometry:
         This method must be implemented in derived classes.
         """
         raise NotImplementedError
+
+    def fillAnodeSpectra(
+        self,
+        x: np.ndarray,
+        y: np.ndarray,
+        z: np.ndarray,
+        energy: np.ndarray
+    ) -> None:
+        """
+        Array counterpart of `updateAnodeSpectra`, filling the anode spectra with a batch of events.
+
+        This default implementation loops over `updateAnodeSpectra` and should be overridden in
+        derived classes by an array implementation.
+        """
+        for event in zip(x, y, z, energy):
+            self.updateAnodeSpectra(*event)
+
+    def fillAnodeSpectraFromIndices(
+        self,
+        anode: np.ndarray,
+        energy: np.ndarray
+    ) -> None:
+        """
+        Fill the anode spectra with a batch of energy deposits already assigned to anodes (e.g.
+        summed per decay and anode), with a single `np.bincount`. Deposits with a negative anode
+        index or out of the energy range are ignored.
+        """
+        anode = np.asarray(anode)
+        index = self.energyBins.binIndex(energy)
+        valid = (anode >= 0) & (index >= 0)
+
+        nBins = self.energyBins.nBins
+        counts = np.bincount(
+            anode[valid] * nBins + index[valid],
+            minlength = self.nAnodes * nBins
+        ).reshape(self.nAnodes, nBins)
+        for spectrum, anodeCounts in zip(self.anodeSpectra, counts):
+            spectrum += anodeCounts
     
     @property
     def anodeSpectra(
@@ -172,4 +310,165 @@ class Geometry:
         """
         This method must be implemented in derived classes.
         """
-        raise NotImplementedError
\ No newline at end of file
+        raise NotImplementedError
+####################################################################################################
+
+class CylindricalGeometry(Geometry):
+    """
+    Base class of cylindrical TPC geometries: an active volume of radius `activeRadius` between the
+    cathode plane (z = 0), holding the radioactive source at its center, and the anode plane
+    (z = `driftLength`). Derived classes only implement the assignment of events to anodes
+    (`anodeIndices`, ...) and how the anodes are drawn (`drawAnodes`), e.g.
+
+    ```
+    class CylinderConcentricTwoPartAnode(CylindricalGeometry, InnerOuterAnodes):
+        ...
+    ```
+    """
+
+    @property
+    def activeRadius(
+        self
+    ) -> float_mm:
+        """
+        Radius of the active volume.
+
+        This property must be implemented in derived classes.
+        """
+        raise NotImplementedError
+
+    def draw(
+        self,
+        ax,
+        **kwargs
+    ):
+        """
+        Draw the geometry: active volume, anodes (see `drawAnodes`, with the keyword arguments
+        `kwargs`), cathode plane and radioactive source.
+        """
+        ax.plot_surface(
+            *cylinder(radius = self.activeRadius, height = self.driftLength),
+            alpha = 0.125,
+            color = "k",
+            shade = False
+        )
+        self.drawAnodes(ax, **kwargs)
+        ax.plot_surface(
+            *ring(innerRadius = 0, outerRadius = self.activeRadius, planeZ = 0),
+            alpha = 0.25,
+            color = "k",
+            shade = False
+        )
+        ax.plot(
+            [0], [0], [0],
+            alpha = 1.,
+            markerfacecolor = "tab:green",
+            markeredgecolor = "tab:green",
+            marker = "o"
+        )
+
+        # Equal axes (https://github.com/matplotlib/matplotlib/issues/17172#issuecomment-830139107)
+        ax.set_box_aspect([
+            upperBound - lowerBound
+            for lowerBound, upperBound in (getattr(ax, f"get_{axis}lim")() for axis in "xyz")
+        ])
+
+    def drawAnodes(
+        self,
+        ax
+    ):
+        """
+        Draw the anode plane, as a single disk by default.
+        """
+        ax.plot_surface(
+            *ring(innerRadius = 0, outerRadius = self.activeRadius, planeZ = self.driftLength),
+            alpha = 0.25,
+            color = "k",
+            shade = False
+        )
+
+    def isInsideActiveVolume(
+        self,
+        x: float_mm,
+        y: float_mm,
+        z: float_mm
+    ) -> bool:
+        """
+        Indicate whether a given 3D point (x, y, z) lies inside the active volume.
+        """
+        return ((x**2 + y**2) <= self.activeRadius**2) and (0 <= z <= self.driftLength)
+
+    def areInsideActiveVolume(
+        self,
+        x: np.ndarray,
+        y: np.ndarray,
+        z: np.ndarray
+    ) -> np.ndarray:
+        """
+        Array counterpart of `isInsideActiveVolume`, indicating whether each given 3D point
+        (x, y, z) lies inside the active volume.
+        """
+        x, y, z = np.asarray(x), np.asarray(y), np.asarray(z)
+        return ((x**2 + y**2) <= self.activeRadius**2) & (0 <= z) & (z <= self.driftLength)
+
+    def decayVertexAndDirection(
+        self,
+        rng: np.random.Generator | None = None
+    ) -> tuple[tuple[float_mm, float_mm, float_mm], tuple[float, float, float]]:
+        """
+        Sample a random IC electron or gamma emission vertex at the surface of the radioactive
+        source, and a random direction in the upper half-space (i.e. from the cathode plane to the
+        anode plane).
+        """
+
+        rng = getRng(rng)
+
+        # Random direction in the upper half-space (i.e. from the cathode plane to the anode plane)
+        ctheta = rng.random()
+        stheta = np.sqrt(1.0 - ctheta**2)
+        phi = 2.0 * np.pi * rng.random()
+
+        # Random point (x, y, z = 0) inside a disk of radius squared r² = 6.25
+        r = rng.triangular(0, np.sqrt(6.25), np.sqrt(6.25))
+        theta = 2 * np.pi * rng.random()
+        x = r * np.cos(theta)
+        y = r * np.sin(theta)
+        z = 0.0
+
+        return (x, y, z), (ctheta, stheta, phi)
+
+    def decayVerticesAndDirections(
+        self,
+        nEvents: int,
+        rng: np.random.Generator | None = None
+    ) -> tuple[tuple[np.ndarray, np.ndarray, np.ndarray], tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """
+        Array counterpart of `decayVertexAndDirection`, sampling `nEvents` vertices and directions
+        at once.
+        """
+
+        rng = getRng(rng)
+
+        # Directions first, in the same order of random draws as `decayVertexAndDirection`
+        directions = self.decayDirections(nEvents = nEvents, rng = rng)
+        return self.decayVertices(nEvents = nEvents, rng = rng), directions
+
+    def decayVertices(
+        self,
+        nEvents: int,
+        rng: np.random.Generator | None = None
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Sample `nEvents` random emission vertices at the surface of the radioactive source.
+        """
+
+        rng = getRng(rng)
+
+        # Random points (x, y, z = 0) inside a disk of radius squared r² = 6.25
+        r = rng.triangular(0, np.sqrt(6.25), np.sqrt(6.25), size = nEvents)
+        theta = 2 * np.pi * rng.random(nEvents)
+        x = r * np.cos(theta)
+        y = r * np.sin(theta)
+        z = np.zeros(nEvents, dtype = float)
+
+        return x, y, z
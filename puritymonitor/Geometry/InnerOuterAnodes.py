@@ -15,6 +15,7 @@ class InnerOuterAnodes(Geometry):
         self,
     ):
         super().__init__()
+        self.nAnodes = 2
         self.innerAnodeSpectrum: Iterable[int] = []
         self.outerAnodeSpectrum: Iterable[int] = []
 
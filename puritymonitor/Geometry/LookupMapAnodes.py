@@ -0,0 +1,283 @@
+from ..types import float_mm # For type hint only
+from .Geometry import CylindricalGeometry
+from .MultipleAnodes import MultipleAnodes
+from collections.abc import Callable # For type hint only
+import numpy as np
+
+####################################################################################################
+
+class RingLayout:
+    """
+    Anode layout of concentric anodes (a central disk and rings of outer radii `radii`), centered on
+    (`centerX`, `centerY`) in the anode plane. Calling it with arrays of (x, y) coordinates returns
+    the anode indices, or -1 outside of all anodes.
+    """
+
+    def __init__(
+        self,
+        radii: list[float_mm],
+        centerX: float_mm = 0.0,
+        centerY: float_mm = 0.0
+    ):
+        self.radii = [float(radius) for radius in radii]
+        self.centerX = centerX
+        self.centerY = centerY
+        self.nAnodes = len(self.radii)
+
+    def __repr__(
+        self
+    ) -> str:
+        return f"{self.__class__.__name__}(radii = {self.radii!r}, centerX = {self.centerX!r}, centerY = {self.centerY!r})"
+
+    def __call__(
+        self,
+        x: np.ndarray,
+        y: np.ndarray
+    ) -> np.ndarray:
+        r2 = (np.asarray(x) - self.centerX)**2 + (np.asarray(y) - self.centerY)**2
+        anode = np.searchsorted(np.square(self.radii), r2, side = "left")
+        return np.where(anode < self.nAnodes, anode, -1)
+
+####################################################################################################
+
+class PixelLayout:
+    """
+    Anode layout of `nPixelsX` by `nPixelsY` square pixels of pitch `pitch`, separated by insulating
+    gaps of width `gap`, centered on (`centerX`, `centerY`) in the anode plane. Pixel `(i, j)` has
+    the anode index `i * nPixelsY + j`. Calling it with arrays of (x, y) coordinates returns the
+    anode indices, or -1 outside of all pixels (including the gaps).
+    """
+
+    def __init__(
+        self,
+        pitch: float_mm,
+        nPixelsX: int,
+        nPixelsY: int,
+        gap: float_mm = 0.0,
+        centerX: float_mm = 0.0,
+        centerY: float_mm = 0.0
+    ):
+        self.pitch = pitch
+        self.nPixelsX = nPixelsX
+        self.nPixelsY = nPixelsY
+        self.gap = gap
+        self.centerX = centerX
+        self.centerY = centerY
+        self.nAnodes = nPixelsX * nPixelsY
+
+    def __repr__(
+        self
+    ) -> str:
+        return (
+            f"{self.__class__.__name__}(pitch = {self.pitch!r}, nPixelsX = {self.nPixelsX!r}, nPixelsY = {self.nPixelsY!r}, "
+            f"gap = {self.gap!r}, centerX = {self.centerX!r}, centerY = {self.centerY!r})"
+        )
+
+    def __call__(
+        self,
+        x: np.ndarray,
+        y: np.ndarray
+    ) -> np.ndarray:
+        u = (np.asarray(x) - self.centerX) / self.pitch + self.nPixelsX / 2
+        v = (np.asarray(y) - self.centerY) / self.pitch + self.nPixelsY / 2
+        i, j = np.floor(u).astype(int), np.floor(v).astype(int)
+        halfGap = self.gap / (2.0 * self.pitch)
+        onPixel = (
+              (0 <= i) & (i < self.nPixelsX) & (0 <= j) & (j < self.nPixelsY)
+            & (u - i >= halfGap) & (u - i <= 1.0 - halfGap)
+            & (v - j >= halfGap) & (v - j <= 1.0 - halfGap)
+        )
+        return np.where(onPixel, i * self.nPixelsY + j, -1)
+
+####################################################################################################
+
+class LookupMapAnodes(CylindricalGeometry, MultipleAnodes):
+    """
+    Cylindrical TPC geometry of radius `radius` with an arbitrary anode layout (e.g. segmented,
+    pixelated or off-centre anodes). `anodeLayout(x, y)` maps arrays of (x, y) coordinates in the
+    anode plane to anode indices (from 0 to `nAnodes - 1`, or -1 outside of all anodes), see
+    `RingLayout` and `PixelLayout`.
+
+    The layout is rasterized once into a 2D integer lookup grid of cells of size `cellSize` over the
+    anode plane, so that events are assigned to anodes by array indexing, whatever the complexity of
+    the layout. Cells crossed by a boundary (between anodes, or of the active volume) are detected by
+    evaluating the layout on `nSamples` by `nSamples` points per cell (including its corners), and
+    flagged together with their neighbours; with `exactBoundaries`, events in these cells are
+    assigned by evaluating the layout exactly, otherwise by the value of the layout at the cell
+    center. Example with 4 by 4 pixels of 10 mm:
+
+    ```
+    geometry = LookupMapAnodes(
+        anodeLayout = PixelLayout(pitch = 10.0, nPixelsX = 4, nPixelsY = 4, gap = 0.5),
+        nAnodes = 16,
+        radius = 30.0,
+        driftLength = 100.0,
+        cellSize = 0.25
+    )
+    ```
+
+    The layout must be picklable (e.g. not a lambda) for parallel simulations.
+    """
+
+    BOUNDARY = -2 # Lookup grid value of the cells crossed by a boundary
+
+    def __init__(
+        self,
+        anodeLayout: Callable[[np.ndarray, np.ndarray], np.ndarray],
+        nAnodes: int,
+        radius: float_mm,
+        driftLength: float_mm,
+        cellSize: float_mm = 0.1,
+        nSamples: int = 3,
+        exactBoundaries: bool = True
+    ):
+        super().__init__(nAnodes = nAnodes)
+        self.description = f"cylindrical geometry with {nAnodes} anodes mapped by a lookup grid"
+        self.anodeLayout = anodeLayout
+        self.radius = radius
+        self.radius2 = radius**2
+        self.driftLength = driftLength
+        self.cellSize = cellSize
+        self.nSamples = max(2, nSamples)
+        self.exactBoundaries = exactBoundaries
+        self.rasterize()
+
+    def __repr__(
+        self
+    ):
+        return "\n".join([
+            f"{self.__class__.__name__}(",
+            f"  anodeLayout = {repr(self.anodeLayout)},",
+            f"  nAnodes = {repr(self.nAnodes)},",
+            f"  radius = {repr(self.radius)}, # mm",
+            f"  driftLength = {repr(self.driftLength)}, # mm",
+            f"  cellSize = {repr(self.cellSize)}, # mm",
+            f"  nSamples = {repr(self.nSamples)},",
+            f"  exactBoundaries = {repr(self.exactBoundaries)}",
+            ")"
+        ])
+
+    def __eq__(
+        self,
+        other
+    ):
+        """
+        Equality test between two `LookupMapAnodes` instances, i.e. whether they describe the same
+        geometry (with the same lookup grid).
+        """
+
+        # Comparison between a `LookupMapAnodes` instance and any other object is not implemented.
+        if not isinstance(other, self.__class__):
+            raise NotImplementedError
+        return (
+                self.nAnodes == other.nAnodes
+            and self.radius == other.radius
+            and self.driftLength == other.driftLength
+            and np.array_equal(self.grid, other.grid)
+        )
+
+    def exactAnodeIndices(
+        self,
+        x: np.ndarray,
+        y: np.ndarray
+    ) -> np.ndarray:
+        """
+        Exact anode indices of points (x, y) of the anode plane, from the anode layout and the
+        radius of the active volume (-1 outside).
+        """
+        x, y = np.asarray(x, dtype = float), np.asarray(y, dtype = float)
+        return np.where(x**2 + y**2 <= self.radius2, self.anodeLayout(x, y), -1)
+
+    def rasterize(
+        self
+    ) -> None:
+        """
+        Compute the `(nCells, nCells)` lookup grid covering the square circumscribing the active
+        volume, with the anode index of each cell, or `BOUNDARY` for cells crossed by a boundary.
+        """
+
+        self.nCells = int(np.ceil(2.0 * self.radius / self.cellSize))
+        self.origin = -self.nCells * self.cellSize / 2.0
+
+        # Sample the layout on a lattice shared by neighbouring cells (corners and edges)
+        nSteps = self.nSamples - 1
+        lattice = self.origin + np.arange(self.nCells * nSteps + 1) * self.cellSize / nSteps
+        samples = self.exactAnodeIndices(*np.meshgrid(lattice, lattice, indexing = "ij"))
+        blocks = np.lib.stride_tricks.sliding_window_view(samples, (self.nSamples, self.nSamples))[::nSteps, ::nSteps]
+        boundary = blocks.min(axis = (2, 3)) != blocks.max(axis = (2, 3))
+
+        # Also flag the neighbours of boundary cells, to catch slivers of anodes (e.g. where two
+        # boundaries meet) smaller than the sampling step
+        padded = np.pad(boundary, 1)
+        boundary = np.any([
+            padded[1 + di:1 + di + self.nCells, 1 + dj:1 + dj + self.nCells]
+            for di in (-1, 0, 1) for dj in (-1, 0, 1)
+        ], axis = 0)
+
+        self.grid = np.where(boundary, self.BOUNDARY, blocks[:, :, 0, 0]).astype(np.int32)
+
+        # Value at the cell center for the approximate treatment of boundary cells
+        centers = self.origin + (np.arange(self.nCells) + 0.5) * self.cellSize
+        self.centerGrid = self.exactAnodeIndices(*np.meshgrid(centers, centers, indexing = "ij")).astype(np.int32)
+
+    @property
+    def boundaryFraction(
+        self
+    ) -> float:
+        """
+        Fraction of the cells of the lookup grid crossed by a boundary.
+        """
+        return float(np.mean(self.grid == self.BOUNDARY))
+
+    @property
+    def activeRadius(
+        self
+    ) -> float_mm:
+        return self.radius
+
+    def drawLookupGrid(
+        self,
+        ax,
+        cmap: str = "tab20"
+    ):
+        """
+        Draw the lookup grid in the anode plane (boundary cells and cells outside of all anodes are
+        masked).
+        """
+        extent = (self.origin, -self.origin, self.origin, -self.origin)
+        return ax.imshow(
+            np.ma.masked_less(self.grid.T, 0),
+            origin = "lower",
+            extent = extent,
+            cmap = cmap,
+            interpolation = "nearest"
+        )
+
+    def anodeIndices(
+        self,
+        x: np.ndarray,
+        y: np.ndarray,
+        z: np.ndarray
+    ) -> np.ndarray:
+        """
+        Index of the anode collecting the electrons emitted at each given 3D point (x, y, z), or -1
+        for points outside of the active volume or of all anodes, looked up in the grid (with an
+        exact evaluation of the layout in boundary cells if `exactBoundaries`).
+        """
+
+        x, y, z = np.asarray(x, dtype = float), np.asarray(y, dtype = float), np.asarray(z, dtype = float)
+        i = np.floor((x - self.origin) / self.cellSize).astype(np.intp)
+        j = np.floor((y - self.origin) / self.cellSize).astype(np.intp)
+        inGrid = (0 <= i) & (i < self.nCells) & (0 <= j) & (j < self.nCells) & (0 <= z) & (z <= self.driftLength)
+
+        anode = np.full(np.shape(x), -1, dtype = np.int32)
+        anode[inGrid] = self.grid[i[inGrid], j[inGrid]]
+
+        boundary = anode == self.BOUNDARY
+        if np.any(boundary):
+            if self.exactBoundaries:
+                anode[boundary] = self.exactAnodeIndices(x[boundary], y[boundary])
+            else:
+                anode[boundary] = self.centerGrid[i[boundary], j[boundary]]
+
+        return anode
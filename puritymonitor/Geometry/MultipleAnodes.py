@@ -0,0 +1,162 @@
+import numpy as np
+from ..EnergySpectra import EnergySpectra, EnergyBins
+from .Geometry import Geometry
+from collections.abc import Iterable, Callable # For type hint only
+from ..types import float_mm, float_MeV # For type hint only
+
+####################################################################################################
+
+class MultipleAnodes(Geometry):
+    """
+    Any number of anodes, whose spectra are the rows of a single `(nAnodes, nBins)` array
+    `anodeSpectraArray`. Derived classes only have to implement `anodeIndices` (as well as the
+    active volume and decay vertex methods) for the anode spectra to be filled, fitted and plotted.
+    """
+
+    def __init__(
+        self,
+        nAnodes: int
+    ):
+        super().__init__()
+        self.nAnodes = nAnodes
+        self.anodeSpectraArray = np.zeros((nAnodes, 0), dtype = int)
+
+    def resetAnodeSpectra(
+        self,
+        nBins: int = 100,
+        minEnergy: float_MeV = 0.0,
+        maxEnergy: float_MeV = 2.0
+    ):
+        self.anodeSpectraArray = np.zeros((self.nAnodes, nBins), dtype = int)
+        self.energyBins = EnergyBins.fromRange(
+            minEnergy = minEnergy,
+            maxEnergy = maxEnergy,
+            nBins = nBins
+        )
+
+    def updateAnodeSpectra(
+        self,
+        x: float_mm,
+        y: float_mm,
+        z: float_mm,
+        energy: float_MeV
+    ):
+        index = self.energyBins.binIndex(energy)
+        anode = int(self.anodeIndices(x, y, z))
+        if anode >= 0 and index >= 0:
+            self.anodeSpectraArray[anode, index] += 1
+
+    def fillAnodeSpectra(
+        self,
+        x: np.ndarray,
+        y: np.ndarray,
+        z: np.ndarray,
+        energy: np.ndarray
+    ):
+        """
+        Array counterpart of `updateAnodeSpectra`, filling all anode spectra with a batch of events
+        with a single `np.bincount`.
+        """
+        self.fillAnodeSpectraFromIndices(self.anodeIndices(x, y, z), energy)
+
+    def getAnodeSpectra(
+        self
+    ):
+        """
+        Anode spectra (rows of `anodeSpectraArray`).
+        """
+        return tuple(self.anodeSpectraArray)
+
+    def fitAnodeSpectra(
+        self,
+        energyStdDev: float_MeV,
+        nPeaks: int = 2,
+        initialGuess1: tuple[float, float, float] = (None, None, None),
+        initialGuess2: tuple[float, float, float] = (None, None, None),
+        method: str = "leastSquares",
+        energyBins: EnergyBins | None = None,
+        anodeSpectra: np.ndarray | None = None
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Fit the IC peaks of each anode spectrum (the simulated ones by default) with
+        `EnergySpectra.fitBatch`, and return the structured array of the fitted parameters (one row
+        per anode) and their covariance matrices.
+        """
+        return EnergySpectra.fitBatch(
+            energyBins if energyBins is not None else self.energyBins,
+            anodeSpectra if anodeSpectra is not None else self.anodeSpectraArray,
+            energyStdDev = energyStdDev,
+            nPeaks = nPeaks,
+            initialGuess1 = initialGuess1,
+            initialGuess2 = initialGuess2,
+            warmStart = False,
+            method = method
+        )
+
+    def plotAnodeSpectra(
+        self,
+        ax,
+        energyStdDev: float_MeV,
+        xAxisLabel: str = "Energy (MeV)",
+        yAxisLabel: str = "Events",
+        colors: Iterable[str] | None = None,
+        anodeLabel: Callable[[int], str] = lambda anode: f"Anode {anode}",
+        fitPeaks: bool = True,
+        nPeaks: int = 2,
+        initialGuess1: tuple[float, float, float] = (None, None, None),
+        initialGuess2: tuple[float, float, float] = (None, None, None),
+        method: str = "leastSquares",
+        legendTitle: str = "",
+        legendFontSize: int | None = None,
+        energyBins: EnergyBins | None = None,
+        anodeSpectra: np.ndarray | None = None,
+        **kwargs
+    ):
+        """
+        Plot the spectrum of each anode (the simulated ones by default), and with `fitPeaks`, the
+        fit of its IC peaks (dashed).
+        """
+
+        if energyBins is None:
+            energyBins = self.energyBins
+        if anodeSpectra is None:
+            anodeSpectra = self.anodeSpectraArray
+        anodeSpectra = np.asarray(anodeSpectra)
+        colors = list(colors) if colors is not None else [f"C{anode}" for anode in range(len(anodeSpectra))]
+        energy = np.append(energyBins.lower, energyBins.upper[-1])
+
+        ax.set_xlabel(xAxisLabel)
+        ax.set_ylabel(yAxisLabel)
+        ax.set_xlim(energyBins.lower[0], energyBins.upper[-1])
+
+        for anode, spectrum in enumerate(anodeSpectra):
+            color = colors[anode % len(colors)]
+            ax.plot(
+                energy,
+                np.append(spectrum, spectrum[-1]),
+                color = color,
+                drawstyle = "steps-post",
+                label = anodeLabel(anode)
+            )
+            if fitPeaks:
+                _, _, fitEnergy, fitted = EnergySpectra.fit(
+                    energyBins,
+                    spectrum,
+                    energyStdDev = energyStdDev,
+                    nPeaks = nPeaks,
+                    initialGuess1 = initialGuess1,
+                    initialGuess2 = initialGuess2,
+                    method = method
+                )
+                ax.plot(fitEnergy, fitted, color = color, linestyle = "--")
+
+        legend = ax.legend(
+            handlelength = 5/6,
+            borderaxespad = 0.1,
+            fancybox = False,
+            alignment = "left",
+            title = legendTitle,
+            **({"title_fontsize": legendFontSize} if legendFontSize is not None else {}),
+            prop = {"size": legendFontSize} if legendFontSize is not None else {}
+        )
+        legend.get_frame().set_linewidth(0)
@@ -1,3 +1,6 @@
-from .Geometry import Geometry
+from .Geometry import Geometry, CylindricalGeometry
 from .InnerOuterAnodes import InnerOuterAnodes
 from .CylinderConcentricTwoPartAnode import CylinderConcentricTwoPartAnode
+from .MultipleAnodes import MultipleAnodes
+from .CylinderConcentricRingAnodes import CylinderConcentricRingAnodes
+from .LookupMapAnodes import LookupMapAnodes, RingLayout, PixelLayout
@@ -0,0 +1,188 @@
+from ..EnergySpectra import EnergySpectra
+from ..EnergySpectra.Resolution import gaussianResponseMatrix
+from ..PurityMonitor import PurityMonitor
+from .SpectrumTemplates import SpectrumTemplates
+from collections.abc import Iterable # For type hint only
+from typing import Self # For type hint only
+from scipy.optimize import minimize
+import numpy as np
+import logging
+
+logger = logging.getLogger(__name__)
+
+####################################################################################################
+
+class LifetimeFit:
+    """
+    Joint fit of the electron attenuation distance (shared by all purity monitors), and of the
+    energy scale and energy resolution of each purity monitor, to experimental anode spectra.
+
+    Predicted spectra are computed from cached `SpectrumTemplates` (interpolated in attenuation
+    distance, then smeared and rescaled onto the experimental energy bins), so that the optimizer
+    never re-simulates. The number of decays of each purity monitor is profiled out in closed form,
+    and the binned Poisson deviance is minimized. Example for a dual purity monitor:
+
+    ```
+    lifetimeFit = LifetimeFit.fromPurityMonitors(
+        purityMonitors = [shortPM, longPM],
+        data = [EnergySpectra.load("short.csv"), EnergySpectra.load("long.csv")],
+        seed = 42
+    ).fit(attDistance = 500.0, energyScale = [1.0, 1.0], energyStdDev = [0.05, 0.05])
+    print(lifetimeFit.attDistance, lifetimeFit.energyScale, lifetimeFit.energyStdDev)
+    ```
+    """
+
+    def __init__(
+        self,
+        templates: Iterable[SpectrumTemplates],
+        data: Iterable[EnergySpectra],
+        anodes: Iterable[int] | None = None,
+        fitRange: tuple[float, float] | None = None
+    ):
+        """
+        `data[i].spectra[j]` is the experimental spectrum of the `anodes[j]`-th anode (all anodes
+        by default) of the `i`-th purity monitor, whose templates are `templates[i]`. Only the
+        energy bins within `fitRange` (in experimental energy units) are fitted.
+        """
+
+        self.templates = list(templates)
+        self.data = list(data)
+        if len(self.templates) != len(self.data):
+            raise ValueError("You must provide an equal number of templates and experimental energy spectra.")
+
+        self.anodes = [
+            list(anodes) if anodes is not None else list(range(templates.templates.shape[1]))
+            for templates in self.templates
+        ]
+        self.counts = [
+            np.array([np.asarray(spectrum, dtype = float) for spectrum in data.spectra[:len(anodes)]])
+            for data, anodes in zip(self.data, self.anodes)
+        ]
+        self.masks = [
+            np.ones(data.energyBins.nBins, dtype = bool) if fitRange is None else (
+                (np.asarray(data.energyBins.lower) >= fitRange[0]) & (np.asarray(data.energyBins.upper) <= fitRange[1])
+            )
+            for data in self.data
+        ]
+
+        self.attDistance = float("NaN")
+        self.energyScale = [float("NaN")] * len(self.data)
+        self.energyStdDev = [float("NaN")] * len(self.data)
+        self.nDecays = [float("NaN")] * len(self.data)
+        self.result = None
+
+    @classmethod
+    def fromPurityMonitors(
+        cls,
+        purityMonitors: Iterable[PurityMonitor],
+        data: Iterable[EnergySpectra],
+        attDistances: Iterable[float] = np.geomspace(100.0, 10000.0, 41),
+        nEvents: int = 10000000,
+        seed: int | None = None,
+        **kwargs
+    ) -> Self:
+        """
+        Simulate the templates of each purity monitor once (with `nEvents` events each), then
+        construct the fit. Additional keyword arguments are passed to the constructor.
+        """
+        seedSequences = np.random.SeedSequence(seed).spawn(len(purityMonitors))
+        templates = [
+            SpectrumTemplates.fromPurityMonitor(
+                purityMonitor,
+                attDistances = attDistances,
+                nEvents = nEvents,
+                rng = np.random.default_rng(seedSequence)
+            )
+            for purityMonitor, seedSequence in zip(purityMonitors, seedSequences)
+        ]
+        return cls(templates = templates, data = data, **kwargs)
+
+    def predict(
+        self,
+        index: int,
+        attDistance: float,
+        energyScale: float,
+        energyStdDev: float
+    ) -> np.ndarray:
+        """
+        Predicted anode spectra `(anode, energy bin)` of the `index`-th purity monitor per decay, on
+        its experimental energy bins, for the given parameters.
+        """
+        templates, energyBins = self.templates[index], self.data[index].energyBins
+        lower = np.asarray(energyBins.lower) / energyScale
+        upper = np.asarray(energyBins.upper) / energyScale
+
+        # Only fine energy bins within 8 standard deviations of the experimental energy range matter
+        window = (templates.energy > lower[0] - 8.0 * energyStdDev) & (templates.energy < upper[-1] + 8.0 * energyStdDev)
+
+        response = gaussianResponseMatrix(templates.energy[window], lower, upper, energyStdDev)
+        return templates.interpolate(attDistance)[self.anodes[index]][:, window] @ response.T
+
+    def deviance(
+        self,
+        parameters: np.ndarray
+    ) -> float:
+        """
+        Total binned Poisson deviance for the parameters `(attDistance, *energyScales,
+        *energyStdDevs)`, with the number of decays of each purity monitor profiled out.
+        """
+
+        nMonitors = len(self.data)
+        attDistance = parameters[0]
+        energyScales = parameters[1:1 + nMonitors]
+        energyStdDevs = parameters[1 + nMonitors:]
+        total = 0.0
+
+        for index, (counts, mask) in enumerate(zip(self.counts, self.masks)):
+            model = self.predict(index, attDistance, energyScales[index], energyStdDevs[index])[:, mask]
+            observed = counts[:, mask]
+            model = np.maximum(model * np.sum(observed) / max(np.sum(model), 1e-300), 1e-300)
+            with np.errstate(divide = "ignore", invalid = "ignore"):
+                logRatio = np.where(observed > 0, np.log(observed / model), 0.0)
+            total += 2.0 * np.sum(model - observed + observed * logRatio)
+
+        return total
+
+    def fit(
+        self,
+        attDistance: float = 1000.0,
+        energyScale: float | Iterable[float] = 1.0,
+        energyStdDev: float | Iterable[float] = 0.05,
+        energyScaleBounds: tuple[float, float] = (0.1, 10.0),
+        energyStdDevBounds: tuple[float, float] = (1e-3, 0.5)
+    ) -> Self:
+        """
+        Fit the attenuation distance, energy scales and energy resolutions, starting from the given
+        initial guesses. Energy scales and resolutions are given per purity monitor (or as a single
+        value for all of them). The attenuation distance is bounded by the template grid.
+        """
+
+        nMonitors = len(self.data)
+        energyScale = np.broadcast_to(energyScale, nMonitors).astype(float)
+        energyStdDev = np.broadcast_to(energyStdDev, nMonitors).astype(float)
+
+        self.result = minimize(
+            self.deviance,
+            x0 = np.array([attDistance, *energyScale, *energyStdDev]),
+            method = "Nelder-Mead",
+            bounds = [
+                (np.max([np.min(templates.attDistances) for templates in self.templates]),
+                 np.min([np.max(templates.attDistances) for templates in self.templates])),
+                *[energyScaleBounds] * nMonitors,
+                *[energyStdDevBounds] * nMonitors
+            ],
+            options = {"maxfev": 20000, "xatol": 1e-6, "fatol": 1e-6}
+        )
+        if not self.result.success:
+            logger.warning(f"Lifetime fit did not converge: {self.result.message}")
+
+        self.attDistance = float(self.result.x[0])
+        self.energyScale = [float(value) for value in self.result.x[1:1 + nMonitors]]
+        self.energyStdDev = [float(value) for value in self.result.x[1 + nMonitors:]]
+        self.nDecays = [
+            float(np.sum(counts[:, mask]) / np.sum(self.predict(index, self.attDistance, self.energyScale[index], self.energyStdDev[index])[:, mask]))
+            for index, (counts, mask) in enumerate(zip(self.counts, self.masks))
+        ]
+        logger.info(f"Lifetime fit: attDistance = {self.attDistance} mm, energyScale = {self.energyScale}, energyStdDev = {self.energyStdDev}")
+
+        return self
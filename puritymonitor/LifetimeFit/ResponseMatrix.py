@@ -0,0 +1,272 @@
+from ..EnergySpectra import EnergyBins
+from ..PurityMonitor import PurityMonitor
+from ..RadioactiveSource import RadioactiveSource
+from ..rng import getRng
+from collections.abc import Iterable # For type hint only
+from typing import Self # For type hint only
+import numpy as np
+import logging
+
+logger = logging.getLogger(__name__)
+
+####################################################################################################
+
+class ResponseMatrix:
+    """
+    Detector response of a purity monitor geometry to each decay line of a radioactive source: the
+    anode spectra per emitted electron or gamma photon of each line, as a `(line, anode, energy
+    bin)` array, optionally on a grid of attenuation distances (`(attDistance, line, anode, energy
+    bin)` array).
+
+    Each line is simulated once (see `fromPurityMonitor`). The expected anode spectra for any line
+    intensities are then a single matrix-vector product (see `predict`), without re-simulating:
+
+    ```
+    response = ResponseMatrix.fromPurityMonitor(purityMonitor, attDistances = np.geomspace(100.0, 10000.0, 41))
+    response.save("response.npz")
+    anodeSpectra = response.predict(attDistance = 750.0, nDecays = 1e6) # Line intensities of the source
+    kLineOnly = response.predict(intensities = response.lineEnergy == 0.9757, attDistance = 750.0)
+    ```
+
+    Response matrices are saved along with the geometry (`repr`) and the decay lines they were
+    computed for, so that `load` can check that they match a given geometry. Responses on a grid
+    of attenuation distances are linearly interpolated in `1 / attDistance` (see
+    `SpectrumTemplates`); without energy resolution, the sharp IC peaks move across energy bins
+    between grid points, so that the grid should be fine enough or the responses smeared.
+    """
+
+    def __init__(
+        self,
+        geometry: str,
+        lineEnergy: Iterable[float],
+        lineIsElectron: Iterable[bool],
+        lineIntensity: Iterable[float],
+        energyBins: EnergyBins,
+        responses: np.ndarray,
+        attDistances: Iterable[float] | None = None,
+        nEventsPerLine: int = 0
+    ):
+        self.geometry = geometry # `repr` of the geometry
+        self.lineEnergy = np.asarray(lineEnergy, dtype = float)
+        self.lineIsElectron = np.asarray(lineIsElectron, dtype = bool)
+        self.lineIntensity = np.asarray(lineIntensity, dtype = float)
+        self.energyBins = energyBins
+        self.nEventsPerLine = nEventsPerLine
+        responses = np.asarray(responses, dtype = float)
+
+        if attDistances is None:
+            self.attDistances = None
+            self.responses = responses # (line, anode, energy bin)
+        else:
+            order = np.argsort(1.0 / np.asarray(attDistances, dtype = float))
+            self.attDistances = np.asarray(attDistances, dtype = float)[order]
+            self.responses = responses[order] # (attDistance, line, anode, energy bin)
+
+    def __repr__(
+        self
+    ) -> str:
+        return "\n".join([
+            f"{self.__class__.__name__}(",
+            f"  geometry = {self.geometry.splitlines()[0]}...,",
+            f"  lineEnergy = {self.lineEnergy.tolist()}, # MeV",
+            f"  energyBins = {self.energyBins},",
+            f"  nAnodes = {self.nAnodes},",
+            *(
+                [f"  attDistances = {self.attDistances[0]} to {self.attDistances[-1]} mm ({len(self.attDistances)} values)"]
+                if self.attDistances is not None else []
+            ),
+            ")"
+        ])
+
+    @property
+    def nLines(
+        self
+    ) -> int:
+        return len(self.lineEnergy)
+
+    @property
+    def nAnodes(
+        self
+    ) -> int:
+        return self.responses.shape[-2]
+
+    @classmethod
+    def fromPurityMonitor(
+        cls,
+        purityMonitor: PurityMonitor,
+        attDistances: float | Iterable[float] = 1000.0,
+        nEventsPerLine: int = 1000000,
+        nBins: int = 100,
+        minEnergy: float = 0.0,
+        maxEnergy: float = 2.0,
+        energyStdDev: float = 0.0,
+        chunkSize: int = 100000,
+        seed: int | None = None,
+        rng: np.random.Generator | None = None
+    ) -> Self:
+        """
+        Simulate `nEventsPerLine` initial decays of each decay line of the radioactive source of
+        `purityMonitor` alone (electron lines, then gamma lines), and compute the response of its
+        geometry to each of them. A single event table is simulated per line (see
+        `PurityMonitor.simulateEventTable`) and replayed for each attenuation distance of
+        `attDistances` (a grid, or a single value for responses without attenuation distance axis),
+        with the energy resolution `energyStdDev`.
+        """
+
+        rng = getRng(rng, seed)
+        source = purityMonitor.radioactiveSource
+        lines = [
+            (energy, True, 0.0, proba)
+            for energy, proba in zip(source.electronEnergy, source.electronProba)
+        ] + [
+            (energy, False, distance, proba)
+            for energy, proba, distance in zip(source.gammaEnergy, source.gammaProba, source.gammaComptonDistance)
+        ]
+        grid = np.ndim(attDistances) > 0
+        responses = []
+
+        for index, (energy, isElectron, distance, _) in enumerate(lines):
+            lineSource = RadioactiveSource(
+                electronEnergy = [energy] if isElectron else [],
+                gammaEnergy = [] if isElectron else [energy],
+                electronProba = [1.0] if isElectron else [],
+                gammaProba = [] if isElectron else [1.0],
+                gammaComptonDistance = [] if isElectron else [distance],
+                description = f"{energy} MeV {'electron' if isElectron else 'gamma'} line of the {source}"
+            )
+            eventTable = PurityMonitor(
+                radioactiveSource = lineSource,
+                geometry = purityMonitor.geometry
+            ).simulateEventTable(nEvents = nEventsPerLine, chunkSize = chunkSize, rng = rng)
+
+            lineResponses = []
+            for attDistance in np.atleast_1d(attDistances):
+                energyBins, anodeSpectra = eventTable.replay(
+                    attDistance = attDistance,
+                    energyStdDev = energyStdDev,
+                    nBins = nBins,
+                    minEnergy = minEnergy,
+                    maxEnergy = maxEnergy,
+                    rng = rng
+                )
+                lineResponses.append(np.array(anodeSpectra, dtype = float) / nEventsPerLine)
+            responses.append(lineResponses)
+            logger.info(f"Response matrix: {index + 1}/{len(lines)} lines simulated")
+
+        responses = np.array(responses).transpose(1, 0, 2, 3) # (attDistance, line, anode, energy bin)
+        return cls(
+            geometry = repr(purityMonitor.geometry),
+            lineEnergy = [line[0] for line in lines],
+            lineIsElectron = [line[1] for line in lines],
+            lineIntensity = [line[3] for line in lines],
+            energyBins = energyBins,
+            responses = responses if grid else responses[0],
+            attDistances = np.atleast_1d(attDistances) if grid else None,
+            nEventsPerLine = nEventsPerLine
+        )
+
+    def interpolate(
+        self,
+        attDistance: float | None = None
+    ) -> np.ndarray:
+        """
+        Response `(line, anode, energy bin)` for any attenuation distance within the grid, linearly
+        interpolated in `1 / attDistance`, or the response without attenuation distance axis.
+        """
+
+        if self.attDistances is None:
+            if attDistance is not None:
+                raise ValueError("This response matrix has no attenuation distance axis (`attDistance` should be `None`).")
+            return self.responses
+        if attDistance is None:
+            raise ValueError("This response matrix has an attenuation distance axis (`attDistance` is required).")
+
+        inverse = 1.0 / self.attDistances
+        position = np.interp(1.0 / attDistance, inverse, np.arange(len(inverse)))
+        index = min(int(position), len(inverse) - 2)
+        weight = position - index
+
+        return (1.0 - weight) * self.responses[index] + weight * self.responses[index + 1]
+
+    def predict(
+        self,
+        intensities: Iterable[float] | None = None,
+        attDistance: float | None = None,
+        nDecays: float = 1.0
+    ) -> np.ndarray:
+        """
+        Expected anode spectra `(anode, energy bin)` of `nDecays` decays with the given line
+        intensities (numbers of electrons or gamma photons of each line per decay, by default the
+        ones of the radioactive source normalized to a single product per decay, as in initial
+        decay simulations), as a single matrix-vector product.
+        """
+        if intensities is None:
+            intensities = self.lineIntensity / np.sum(self.lineIntensity)
+        intensities = np.asarray(intensities, dtype = float)
+        if intensities.shape != (self.nLines,):
+            raise ValueError(f"`intensities` should have one item per decay line ({self.nLines}), not shape {intensities.shape}.")
+
+        response = self.interpolate(attDistance)
+        return nDecays * (intensities @ response.reshape(self.nLines, -1)).reshape(response.shape[1:])
+
+    def matches(
+        self,
+        geometry
+    ) -> bool:
+        """
+        Whether the response matrix was computed for `geometry` (same `repr`).
+        """
+        return repr(geometry) == self.geometry
+
+    def save(
+        self,
+        filename: str
+    ) -> Self:
+        """
+        Save the response matrix to a `npz` file, along with the geometry and the decay lines.
+        """
+        np.savez(
+            filename,
+            geometry = self.geometry,
+            lineEnergy = self.lineEnergy,
+            lineIsElectron = self.lineIsElectron,
+            lineIntensity = self.lineIntensity,
+            lower = self.energyBins.lower,
+            upper = self.energyBins.upper,
+            responses = self.responses,
+            attDistances = self.attDistances if self.attDistances is not None else np.empty(0),
+            nEventsPerLine = self.nEventsPerLine
+        )
+        return self
+
+    @classmethod
+    def load(
+        cls,
+        filename: str,
+        geometry = None
+    ) -> Self:
+        """
+        Load a response matrix from a `npz` file written by `save`. If `geometry` is given, raise a
+        `ValueError` if the response matrix was computed for another geometry.
+        """
+        with np.load(filename) as data:
+            lower, upper = data["lower"], data["upper"]
+            responseMatrix = cls(
+                geometry = str(data["geometry"]),
+                lineEnergy = data["lineEnergy"],
+                lineIsElectron = data["lineIsElectron"],
+                lineIntensity = data["lineIntensity"],
+                energyBins = EnergyBins(
+                    lower = lower,
+                    upper = upper,
+                    nBins = len(lower),
+                    binWidth = float(np.median(upper - lower))
+                ),
+                responses = data["responses"],
+                attDistances = data["attDistances"] if len(data["attDistances"]) > 0 else None,
+                nEventsPerLine = int(data["nEventsPerLine"])
+            )
+
+        if geometry is not None and not responseMatrix.matches(geometry):
+            raise ValueError(f"The response matrix of {filename} was computed for another geometry:\n{responseMatrix.geometry}")
+        return responseMatrix
@@ -0,0 +1,141 @@
+from ..EnergySpectra import EnergyBins
+from ..PurityMonitor import PurityMonitor, EventTable
+from collections.abc import Iterable # For type hint only
+from typing import Self # For type hint only
+import numpy as np
+
+####################################################################################################
+
+class SpectrumTemplates:
+    """
+    Simulated anode spectra of a purity monitor on a grid of attenuation distances, with fine
+    energy bins and without energy resolution nor energy scale, normalized per simulated decay.
+
+    Templates are computed once from a single simulation (see `fromPurityMonitor`), can be saved to
+    and loaded from disk, and are linearly interpolated in `1 / attDistance` (to which the electron
+    attenuation `exp(-d / attDistance)` is smooth) between grid points.
+    """
+
+    def __init__(
+        self,
+        attDistances: Iterable[float],
+        energyBins: EnergyBins,
+        templates: np.ndarray
+    ):
+        order = np.argsort(1.0 / np.asarray(attDistances, dtype = float))
+        self.attDistances = np.asarray(attDistances, dtype = float)[order]
+        self.energyBins = energyBins
+        self.templates = np.asarray(templates, dtype = float)[order] # (attDistance, anode, energy bin)
+        self.energy = (np.asarray(energyBins.lower) + np.asarray(energyBins.upper)) / 2
+
+    def __repr__(
+        self
+    ) -> str:
+        return "\n".join([
+            f"{self.__class__.__name__}(",
+            f"  attDistances = {self.attDistances[0]} to {self.attDistances[-1]} mm ({len(self.attDistances)} values),",
+            f"  energyBins = {self.energyBins},",
+            f"  nAnodes = {self.templates.shape[1]}",
+            ")"
+        ])
+
+    @classmethod
+    def fromEventTable(
+        cls,
+        eventTable: EventTable,
+        attDistances: Iterable[float] = np.geomspace(100.0, 10000.0, 41),
+        maxEnergy: float = 2.0,
+        fineBinWidth: float = 0.002
+    ) -> Self:
+        """
+        Compute templates by replaying `eventTable` (without energy resolution) for each given
+        attenuation distance, with energy bins of width `fineBinWidth` from 0 to `maxEnergy` MeV.
+        """
+
+        nBins = int(round(maxEnergy / fineBinWidth))
+        templates = []
+
+        for attDistance in attDistances:
+            energyBins, anodeSpectra = eventTable.replay(
+                attDistance = attDistance,
+                nBins = nBins,
+                minEnergy = 0.0,
+                maxEnergy = maxEnergy
+            )
+            templates.append(np.array(anodeSpectra, dtype = float) / eventTable.nEvents)
+
+        return cls(attDistances = attDistances, energyBins = energyBins, templates = templates)
+
+    @classmethod
+    def fromPurityMonitor(
+        cls,
+        purityMonitor: PurityMonitor,
+        attDistances: Iterable[float] = np.geomspace(100.0, 10000.0, 41),
+        nEvents: int = 10000000,
+        maxEnergy: float = 2.0,
+        fineBinWidth: float = 0.002,
+        seed: int | None = None,
+        rng: np.random.Generator | None = None
+    ) -> Self:
+        """
+        Compute templates from a single simulation of `nEvents` events of `purityMonitor`.
+        """
+        return cls.fromEventTable(
+            purityMonitor.simulateEventTable(nEvents = nEvents, seed = seed, rng = rng),
+            attDistances = attDistances,
+            maxEnergy = maxEnergy,
+            fineBinWidth = fineBinWidth
+        )
+
+    def interpolate(
+        self,
+        attDistance: float
+    ) -> np.ndarray:
+        """
+        Anode spectra templates `(anode, energy bin)` for any attenuation distance within the grid,
+        linearly interpolated in `1 / attDistance`.
+        """
+
+        inverse = 1.0 / self.attDistances
+        position = np.interp(1.0 / attDistance, inverse, np.arange(len(inverse)))
+        index = min(int(position), len(inverse) - 2)
+        weight = position - index
+
+        return (1.0 - weight) * self.templates[index] + weight * self.templates[index + 1]
+
+    def save(
+        self,
+        filename: str
+    ) -> Self:
+        """
+        Save the templates to a `npz` file.
+        """
+        np.savez(
+            filename,
+            attDistances = self.attDistances,
+            lower = self.energyBins.lower,
+            upper = self.energyBins.upper,
+            templates = self.templates
+        )
+        return self
+
+    @classmethod
+    def load(
+        cls,
+        filename: str
+    ) -> Self:
+        """
+        Load templates from a `npz` file written by `save`.
+        """
+        with np.load(filename) as data:
+            lower, upper = data["lower"], data["upper"]
+            return cls(
+                attDistances = data["attDistances"],
+                energyBins = EnergyBins(
+                    lower = lower,
+                    upper = upper,
+                    nBins = len(lower),
+                    binWidth = float(np.median(upper - lower))
+                ),
+                templates = data["templates"]
+            )
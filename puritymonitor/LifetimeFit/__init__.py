@@ -0,0 +1,3 @@
+from .SpectrumTemplates import SpectrumTemplates
+from .LifetimeFit import LifetimeFit
+from .ResponseMatrix import ResponseMatrix
@@ -1,4 +1,5 @@
-from . import Medium
+from .Medium import Medium
+import numpy as np
 from typing import Callable, Self
 
 # For type hint only
@@ -43,6 +44,8 @@ class LAr(Medium):
         electricField: float_V
     ) -> float_cm2_per_μs_per_V:
         """
+        Electron mobility in liquid argon (cm²/µs/V) at the given temperature(s) and electric
+        field(s), as scalars or arrays (broadcast against each other).
         """
 
         a0 = 551.6   # (cm/s) / (V/cm)
@@ -53,9 +56,10 @@ class LAr(Medium):
         a5 = 0.2053  # (cm/s) / (V/cm)
 
         refTemperature = 89.0 # K
-        E = electricField / 1000.0
+        E = np.asarray(electricField, dtype = float) / 1000.0
         mu = (a0 + a1*E + a2*E**(3/2) + a3*E**(5/2))
         mu /= (1 + (a1/a0)*E + a4*E**2 + a5*E**3)
-        mu *= (temperature / refTemperature)**(3/2)
+        mu = mu * (np.asarray(temperature, dtype = float) / refTemperature)**(3/2)
+        mu *= 1e-6 # (cm/s) / (V/cm) to (cm/µs) / (V/cm)
 
-        return mu
+        return mu.item() if mu.ndim == 0 else mu
@@ -1,4 +1,5 @@
-from math import isnan
+import numpy as np
+import hashlib
 from typing import Callable, Self
 
 # For type hint only
@@ -14,10 +15,64 @@ from ..types import (
 
 ####################################################################################################
 
+def fillMissing(
+    value: float | np.ndarray,
+    compute: Callable[[], float | np.ndarray]
+) -> float | np.ndarray:
+    """
+    Replace the missing (NaN) items of `value` by the ones computed by `compute()`, which is only
+    called if any item is missing. Scalars are returned as Python floats, arrays as arrays.
+    """
+    missing = np.isnan(value)
+    if not np.any(missing):
+        return value
+    filled = np.where(missing, compute(), value)
+    return filled.item() if filled.ndim == 0 else filled
+
+def gridIndex(
+    grid: np.ndarray,
+    values: float | np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Index `i` of the grid interval `[grid[i], grid[i + 1]]` containing each value, and the position
+    of the value inside this interval (from 0 to 1), for linear interpolation. The index is
+    computed directly for uniform grids, with `np.searchsorted` otherwise. Values outside of the
+    grid raise a `ValueError`.
+    """
+    values = np.asarray(values, dtype = float)
+    if np.any(values < grid[0]) or np.any(values > grid[-1]):
+        raise ValueError(f"Values outside of the interpolation grid [{grid[0]}, {grid[-1]}].")
+    step = (grid[-1] - grid[0]) / (len(grid) - 1)
+    if np.allclose(np.diff(grid), step):
+        index = np.minimum(((values - grid[0]) / step).astype(np.intp), len(grid) - 2)
+    else:
+        index = np.clip(np.searchsorted(grid, values, side = "right") - 1, 0, len(grid) - 2)
+    return index, (values - grid[index]) / (grid[index + 1] - grid[index])
+
+####################################################################################################
+
 class Medium:
     """
     Set of physical parameters defining free electrons drift in a medium.
+
+    All parameters can be given either as scalars or as NumPy arrays (broadcast against each
+    other), e.g. for temperature or electric field scans; missing (NaN) parameters, or missing
+    items of array parameters, are computed from the given ones:
+
+    ```
+    medium = LAr(temperature = 87.0, electricField = np.linspace(100.0, 1000.0, 10), lifetime = 1000.0)
+    medium.driftVelocity, medium.attenuationLength # Arrays of 10 items
+    ```
+
+    With `tabulate`, the mobility is evaluated once on a (temperature, electric field) grid and
+    then interpolated, so that per-event lookups (`mobilityAt`, `driftVelocityAt`) cost the same
+    (a few array operations per item) whatever the cost of the mobility model.
     """
+
+    # Grid of the mobility values identifying the mobility model (see `mobilityKey`)
+    keyTemperatures = np.linspace(83.0, 93.0, 11)     # K
+    keyElectricFields = np.linspace(50.0, 2000.0, 40) # V/cm
+
     def __init__(
         self,
         temperature: float_K = float("NaN"),
@@ -28,20 +83,23 @@ class Medium:
         attenuationLength: float_cm = float("NaN")
     ):
         self.temperature = temperature
-        self.mobility = mobility if mobility else self.defautMobility
+        self.mobility = mobility if mobility else self.defaultMobility
+        self.mobilityTable = None
         self.electricField = electricField
         self.driftVelocity = driftVelocity
         self.lifetime = lifetime
         self.attenuationLength = attenuationLength
-        
+
         # Compute all missing physical parameters from the all given ones and an ordered list of
         # mathematical functions defining their relationships
-        
+
         self.functions = [
             self.computeDriftVelocity,
-            self.computeElectricField
+            self.computeElectricField,
+            self.computeAttenuationLength,
+            self.computeLifetime
         ]
-        
+
         for computeVariable in self.functions:
             computeVariable()
 
@@ -51,7 +109,7 @@ class Medium:
         """
         """
         return "LAr volume"
-    
+
     def __repr__(
         self
     ) -> str:
@@ -59,21 +117,59 @@ class Medium:
         """
         props = (
             ("temperature", "K"),
-            ("mobility", "(cm/µs) / (V/cm)"),
+            ("mobility", "cm²/µs/V"),
             ("electricField", "V/cm"),
             ("driftVelocity", "cm/µs"),
             ("lifetime", "µs"),
             ("attenuationLength", "cm")
         )
         return "\n".join([
-            "LAr(",
+            f"{self.__class__.__name__}(",
             *[
                 f"  {prop} = {getattr(self, prop)}, # {unit}"
-                for prop, unit in zip(props)
+                for prop, unit in props
             ],
             ")"
         ])
-    
+
+    def mobilityKey(
+        self
+    ) -> str | None:
+        """
+        Hash of the mobility model, identifying it across processes (unlike its `repr`, which holds
+        the memory address of custom callables): of its table if tabulated (see `tabulate`), and of
+        its values on the fixed (`keyTemperatures`, `keyElectricFields`) grid otherwise. `None` if
+        the mobility cannot be evaluated on this grid.
+        """
+        if self.mobilityTable is not None:
+            arrays = self.mobilityTable
+        else:
+            try:
+                arrays = (self.mobility(*np.meshgrid(self.keyTemperatures, self.keyElectricFields, indexing = "ij")),)
+            except Exception:
+                return None
+        digest = hashlib.sha256()
+        for array in arrays:
+            digest.update(np.ascontiguousarray(array, dtype = float).tobytes())
+        return digest.hexdigest()
+
+    def configuration(
+        self
+    ) -> dict:
+        """
+        Parameters of the medium which simulation results depend on, identified across processes
+        (see `mobilityKey`), as used by `SimulationCache` keys.
+        """
+        return {
+            "class": self.__class__.__name__,
+            "temperature": self.temperature,
+            "mobility": self.mobilityKey(),
+            "electricField": self.electricField,
+            "driftVelocity": self.driftVelocity,
+            "lifetime": self.lifetime,
+            "attenuationLength": self.attenuationLength
+        }
+
     @classmethod
     def defaultMobility(
         cls,
@@ -81,38 +177,124 @@ class Medium:
         electricField: float_V
     ) -> float_cm2_per_μs_per_V:
         """
-        
+        Electron mobility at the given temperature(s) and electric field(s), as scalars or arrays.
+
         This method must be implemented in derived classes.
         """
         raise NotImplementedError
-        
+
+    def tabulate(
+        self,
+        temperatures: np.ndarray,
+        electricFields: np.ndarray
+    ) -> Self:
+        """
+        Evaluate the mobility once on the grid of the given (increasing) `temperatures` and
+        `electricFields`, and interpolate it (bilinearly) in `mobilityAt` from now on. Lookups
+        outside of the grid raise a `ValueError`.
+
+        ```
+        medium = LAr(temperature = 87.0, electricField = 500.0).tabulate(
+            temperatures = np.linspace(84.0, 90.0, 61),
+            electricFields = np.linspace(0.0, 2000.0, 401)
+        )
+        velocity = medium.driftVelocityAt(temperature, electricField) # Arrays of millions of items
+        ```
+        """
+        self.mobilityTable = (
+            np.asarray(temperatures, dtype = float),
+            np.asarray(electricFields, dtype = float),
+            self.mobility(*np.meshgrid(temperatures, electricFields, indexing = "ij"))
+        )
+        return self
+
+    def mobilityAt(
+        self,
+        temperature: float_K | np.ndarray,
+        electricField: float_V_per_cm | np.ndarray
+    ) -> float_cm2_per_μs_per_V | np.ndarray:
+        """
+        Electron mobility at the given temperature(s) and electric field(s) (broadcast against each
+        other), bilinearly interpolated from the table built by `tabulate` if any.
+        """
+        if self.mobilityTable is None:
+            return self.mobility(temperature, electricField)
+        temperatures, electricFields, mobility = self.mobilityTable
+        i, u = gridIndex(temperatures, temperature)
+        j, v = gridIndex(electricFields, electricField)
+        mobility = (
+            (1 - u) * ((1 - v) * mobility[i, j] + v * mobility[i, j + 1])
+            + u * ((1 - v) * mobility[i + 1, j] + v * mobility[i + 1, j + 1])
+        )
+        return mobility.item() if mobility.ndim == 0 else mobility
+
+    def driftVelocityAt(
+        self,
+        temperature: float_K | np.ndarray,
+        electricField: float_V_per_cm | np.ndarray
+    ) -> float_cm_per_µs | np.ndarray:
+        """
+        Electron drift velocity at the given temperature(s) and electric field(s).
+        """
+        return electricField * self.mobilityAt(temperature, electricField)
+
+    def electricFieldAt(
+        self,
+        temperature: float_K | np.ndarray,
+        driftVelocity: float_cm_per_µs | np.ndarray,
+        maxElectricField: float_V_per_cm = 1e5,
+        nIterations: int = 60
+    ) -> float_V_per_cm | np.ndarray:
+        """
+        Electric field(s) giving the drift velocity(ies) `driftVelocity` at the given
+        temperature(s), by vectorized bisection of `driftVelocityAt` (assumed to increase with the
+        electric field) between 0 and `maxElectricField`.
+        """
+        temperature, driftVelocity = np.broadcast_arrays(
+            np.asarray(temperature, dtype = float),
+            np.asarray(driftVelocity, dtype = float)
+        )
+        lower = np.zeros(temperature.shape)
+        upper = np.full(temperature.shape, float(maxElectricField))
+        for _ in range(nIterations):
+            middle = 0.5 * (lower + upper)
+            tooSlow = self.driftVelocityAt(temperature, middle) < driftVelocity
+            lower = np.where(tooSlow, middle, lower)
+            upper = np.where(tooSlow, upper, middle)
+        # No solution for missing drift velocities or mobilities
+        missing = np.isnan(driftVelocity) | np.isnan(self.driftVelocityAt(temperature, upper))
+        electricField = np.where(missing, np.nan, 0.5 * (lower + upper))
+        return electricField.item() if electricField.ndim == 0 else electricField
+
     def computeDriftVelocity(self):
-        if isnan(self.driftVelocity):
-            self.driftVelocity = self.electricField * self.mobility(
-                self.temperature,
-                self.electricField
-            )
+        self.driftVelocity = fillMissing(
+            self.driftVelocity,
+            lambda: self.driftVelocityAt(self.temperature, self.electricField)
+        )
         return self.driftVelocity
-        
+
     def computeElectricField(self):
-        if isnan(self.electricField):
-            self.electricField = self.driftVelocity / self.mobility(
-                self.temperature,
-                self.electricField
-            )
+        self.electricField = fillMissing(
+            self.electricField,
+            lambda: self.electricFieldAt(self.temperature, self.driftVelocity)
+        )
         return self.electricField
-        
+
     def computeMobility(self):
         if self.mobility is None:
             self.mobility = lambda temperature, electricField: self.driftVelocity / self.electricField
         return self.mobility
-        
+
     def computeAttenuationLength(self):
-        if isnan(self.attenuationLength):
-            self.attenuationLength = self.driftVelocity * self.lifetime
+        self.attenuationLength = fillMissing(
+            self.attenuationLength,
+            lambda: np.multiply(self.driftVelocity, self.lifetime)
+        )
         return self.attenuationLength
-        
+
     def computeLifetime(self):
-        if isnan(self.lifetime):
-            self.lifetime = self.attenuationLength / self.driftVelocity
+        self.lifetime = fillMissing(
+            self.lifetime,
+            lambda: np.divide(self.attenuationLength, self.driftVelocity)
+        )
         return self.lifetime
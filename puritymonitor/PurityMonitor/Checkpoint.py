@@ -0,0 +1,146 @@
+import numpy as np
+import os
+import json
+import time
+import logging
+import tempfile
+from .SimulationCache import canonical
+from .StoppingRule import StoppingRule # For type hint only
+
+logger = logging.getLogger(__name__)
+
+####################################################################################################
+
+def encodeArray(
+    value
+) -> dict:
+    """
+    JSON encoding of the arrays of random number generator states (e.g. the key of MT19937 or the
+    counter of Philox), restored losslessly by `decodeArray`.
+    """
+    if isinstance(value, np.ndarray):
+        return {"__ndarray__": value.tolist(), "dtype": value.dtype.str}
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def decodeArray(
+    value: dict
+):
+    """
+    Inverse of `encodeArray`.
+    """
+    if "__ndarray__" in value:
+        return np.array(value["__ndarray__"], dtype = value["dtype"])
+    return value
+
+####################################################################################################
+
+class Checkpoint:
+    """
+    Checkpoint file of a long simulation (see `PurityMonitor.streamEnergySpectra`): the partial
+    anode spectra, the state of the random number generator (of any bit generator), the number of
+    events simulated so far and the configuration of the simulation (purity monitor and simulation
+    parameters, including `chunkSize` and `seed`), saved at most every `interval` seconds:
+
+    ```
+    energyBins, anodeSpectra = purityMonitor.simulateEnergySpectra(
+        nEvents = 500_000_000,
+        seed = 42,
+        checkpoint = "run42.checkpoint.npz",
+        checkpointInterval = 600.0
+    )
+    ```
+
+    If the job is killed, running the same call again resumes the simulation from the last
+    checkpoint, and gives the same anode spectra as an uninterrupted run. Checkpoints are written to
+    temporary files renamed atomically (`os.replace`), so that a job killed while writing one
+    leaves the previous one intact. The checkpoint file is removed once the simulation ends.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        configuration: dict,
+        interval: float = 600.0
+    ):
+        self.path = os.path.expanduser(path)
+        self.configuration = json.dumps(canonical(configuration), sort_keys = True)
+        self.interval = interval # s
+        self.lastSave = time.monotonic()
+
+    def __repr__(
+        self
+    ) -> str:
+        return f"{self.__class__.__name__}({self.path!r}, interval = {self.interval})"
+
+    def load(
+        self
+    ) -> dict | None:
+        """
+        Partial anode spectra (`anodeSpectra`), random number generator state (`rngState`), number
+        of simulated events (`nSimulatedEvents`) and stopping rule state (`lastCheck`) of the
+        checkpoint, or `None` if there is no checkpoint file. Raise a `ValueError` if the
+        checkpoint belongs to another simulation.
+        """
+        try:
+            with np.load(self.path) as data:
+                configuration = str(data["configuration"])
+                state = {
+                    "anodeSpectra": data["anodeSpectra"],
+                    "rngState": json.loads(str(data["rngState"]), object_hook = decodeArray),
+                    "nSimulatedEvents": int(data["nSimulatedEvents"]),
+                    "lastCheck": int(data["lastCheck"])
+                }
+        except FileNotFoundError:
+            return None
+        if configuration != self.configuration:
+            raise ValueError(f"The checkpoint {self.path} belongs to another simulation (remove it to start over):\n{configuration}")
+        logger.info(f"Resuming from checkpoint {self.path} ({state['nSimulatedEvents']} events simulated)")
+        return state
+
+    def due(
+        self
+    ) -> bool:
+        """
+        Whether `interval` seconds have elapsed since the last checkpoint (or since the start).
+        """
+        return time.monotonic() - self.lastSave >= self.interval
+
+    def save(
+        self,
+        nSimulatedEvents: int,
+        anodeSpectra: np.ndarray,
+        rng: np.random.Generator,
+        stoppingRule: StoppingRule | None = None
+    ) -> None:
+        """
+        Write the checkpoint atomically.
+        """
+        directory = os.path.dirname(os.path.abspath(self.path))
+        descriptor, temporary = tempfile.mkstemp(dir = directory, suffix = ".tmp")
+        try:
+            with os.fdopen(descriptor, "wb") as file:
+                np.savez(
+                    file,
+                    anodeSpectra = np.asarray(anodeSpectra),
+                    rngState = json.dumps(rng.bit_generator.state, default = encodeArray),
+                    nSimulatedEvents = nSimulatedEvents,
+                    lastCheck = stoppingRule.lastCheck if stoppingRule is not None else 0,
+                    configuration = self.configuration
+                )
+            os.replace(temporary, self.path)
+        except BaseException:
+            os.remove(temporary)
+            raise
+        self.lastSave = time.monotonic()
+        logger.info(f"Checkpoint {self.path} saved ({nSimulatedEvents} events simulated)")
+
+    def remove(
+        self
+    ) -> None:
+        """
+        Remove the checkpoint file, if any.
+        """
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,118 @@
+from ..EnergySpectra import EnergyBins
+from ..rng import getRng
+from ..types import float_mm # For type hint only
+from typing import Self # For type hint only
+import numpy as np
+
+####################################################################################################
+
+class EventTable:
+    """
+    Compact per-event table of a Monte Carlo simulation, with one row per electron emitted inside
+    the active volume: emission height `z`, index of the collecting `anode`, and electron `energy`
+    before attenuation and energy resolution. Anode indices are stored with the smallest signed
+    integer type holding `nAnodes` anodes (int8 up to 128 anodes).
+
+    None of these depend on the attenuation distance, the energy resolution or the energy scale,
+    so that anode spectra can be rebuilt for any of them with `replay`, without re-simulating:
+
+    ```
+    table = purityMonitor.simulateEventTable(nEvents = 10_000_000, seed = 42)
+    for attDistance in np.linspace(200.0, 2000.0, 50):
+        energyBins, anodeSpectra = table.replay(attDistance = attDistance, energyStdDev = 0.05)
+    ```
+    """
+
+    def __init__(
+        self,
+        z: np.ndarray,
+        anode: np.ndarray,
+        energy: np.ndarray,
+        driftLength: float_mm,
+        nAnodes: int,
+        nEvents: int
+    ):
+        self.z = np.asarray(z, dtype = np.float32)
+        self.anode = np.asarray(anode, dtype = np.min_scalar_type(-max(nAnodes, 1))) # Smallest signed int for all anodes
+        self.energy = np.asarray(energy, dtype = np.float32)
+        self.driftLength = driftLength
+        self.nAnodes = nAnodes
+        self.nEvents = nEvents # Number of simulated decays (including the ones without any row)
+
+    def __len__(
+        self
+    ) -> int:
+        return len(self.energy)
+
+    def __repr__(
+        self
+    ) -> str:
+        return f"{self.__class__.__name__}({len(self)} rows, {self.nEvents} events, {self.nAnodes} anodes, driftLength = {self.driftLength} mm)"
+
+    def replay(
+        self,
+        attDistance: float = 1000.0, # Electron attenuation distance in mm
+        energyStdDev: float = 0.0,   # Electron energy standard deviation/resolution/systematic error
+        energyScale: float = 1.0,    # Arbitrary units per MeV
+        nBins: int = 100,            # Number of energy bins
+        minEnergy: float = 0.0,      # Lowest energy in arbitrary units
+        maxEnergy: float = 2.0,      # Highest energy in arbitrary units
+        seed: int | None = None,
+        rng: np.random.Generator | None = None
+    ) -> tuple[EnergyBins, tuple[np.ndarray]]:
+        """
+        Rebuild the anode spectra for the given attenuation distance, energy resolution and energy
+        scale in one vectorized pass. Return the same `(energyBins, anodeSpectra)` output as
+        `PurityMonitor.simulateEnergySpectra`.
+        """
+
+        energy = self.energy * np.exp(-(self.driftLength - self.z.astype(float)) / attDistance)
+        if energyStdDev != 0.0:
+            energy += energyStdDev * getRng(rng, seed).standard_normal(len(energy))
+
+        energyBins = EnergyBins.fromRange(minEnergy = minEnergy, maxEnergy = maxEnergy, nBins = nBins)
+        index = energyBins.binIndex(energy)
+        valid = index >= 0
+        anodeSpectra = np.bincount(
+            self.anode[valid].astype(int) * nBins + index[valid],
+            minlength = self.nAnodes * nBins
+        ).reshape(self.nAnodes, nBins)
+
+        energyBins.scale(scale = energyScale)
+        return energyBins, tuple(anodeSpectra)
+
+    def save(
+        self,
+        filename: str
+    ) -> Self:
+        """
+        Save the event table to a `npz` file.
+        """
+        np.savez(
+            filename,
+            z = self.z,
+            anode = self.anode,
+            energy = self.energy,
+            driftLength = self.driftLength,
+            nAnodes = self.nAnodes,
+            nEvents = self.nEvents
+        )
+        return self
+
+    @classmethod
+    def load(
+        cls,
+        filename: str
+    ) -> Self:
+        """
+        Load an event table from a `npz` file written by `save`.
+        """
+        with np.load(filename) as data:
+            return cls(
+                z = data["z"],
+                anode = data["anode"],
+                energy = data["energy"],
+                driftLength = float(data["driftLength"]),
+                nAnodes = int(data["nAnodes"]),
+                nEvents = int(data["nEvents"])
+            )
@@ -1,18 +1,73 @@
+from .. import __version__
 from .. import RadioactiveSource
 from .. import Geometry
 from .. import EnergyBins
+from ..EnergySpectra import TrueEnergySpectra
+from ..Medium import Medium
+from ..rng import getRng, bindRng
+from .EventTable import EventTable
+from .SimulationCache import SimulationCache
+from .StoppingRule import StoppingRule
+from .Checkpoint import Checkpoint
 import numpy as np
+import re
+import hashlib
+import logging
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from copy import deepcopy
+
+logger = logging.getLogger(__name__)
+
+####################################################################################################
+
+def simulateShard(
+    purityMonitor,
+    nEvents: int,
+    rng: np.random.Generator,
+    simulation: dict
+) -> tuple[np.ndarray]:
+    """
+    Simulate one shard of `nEvents` events with its own random number generator `rng`, and return
+    the resulting anode spectra. This is the entry point of the worker processes of
+    `PurityMonitor.simulateEnergySpectra` in parallel mode.
+    """
+    purityMonitor.simulateEnergySpectra(nEvents = nEvents, rng = rng, **simulation)
+    return tuple(np.array(spectrum) for spectrum in purityMonitor.geometry.anodeSpectra)
 
 ####################################################################################################
 
 class PurityMonitor:
+    defaultAttDistance = 1000.0 # mm, without `attDistance` nor medium
+
     def __init__(
         self,
         radioactiveSource: RadioactiveSource,
-        geometry: Geometry
+        geometry: Geometry,
+        medium: Medium | None = None
     ) -> None:
         self.radioactiveSource = radioactiveSource
         self.geometry = geometry
+        self.medium = medium # Drift velocity and electron lifetime, if given
+        self.driftVelocityOverride = None # Explicit drift velocity, instead of the one of `medium`
+
+    @property
+    def driftVelocity(
+        self
+    ) -> float:
+        """
+        Electron drift velocity (cm/µs): the one set explicitly if any, otherwise the current one of
+        `medium` (NaN without medium), so that replacing `medium` updates the drift times.
+        """
+        if self.driftVelocityOverride is not None:
+            return self.driftVelocityOverride
+        return self.medium.driftVelocity if self.medium is not None else float("NaN")
+
+    @driftVelocity.setter
+    def driftVelocity(
+        self,
+        driftVelocity: float | None
+    ) -> None:
+        self.driftVelocityOverride = driftVelocity
         
     def __str__(
         self
@@ -60,6 +115,36 @@ class PurityMonitor:
         
         return (self.radioactiveSource == other.radioactiveSource) and (self.geometry == other.geometry)
         
+    def configuration(
+        self
+    ) -> dict:
+        """
+        Parameters of the purity monitor which its simulation results depend on (class, radioactive
+        source lines and decay scheme, geometry parameters, medium and drift velocity, package
+        version), as used by `SimulationCache` keys.
+
+        The geometry is identified by its `repr`, without memory addresses (e.g. of a custom anode
+        layout), and by a hash of its lookup grids if it has some (`LookupMapAnodes`), and the
+        medium by its parameters and a hash of its mobility (see `Medium.configuration`), so that
+        keys are the same across processes.
+        """
+        source = self.radioactiveSource
+        lookupGrids = [getattr(self.geometry, name) for name in ("grid", "centerGrid") if hasattr(self.geometry, name)]
+        return {
+            "version": __version__,
+            "purityMonitor": self.__class__.__name__,
+            "radioactiveSource": {
+                "class": source.__class__.__name__,
+                "lines": source.linesKey(),
+                "activity": source.activity,
+                "cascade": vars(source.cascade) if source.cascade is not None else None
+            },
+            "geometry": re.sub(r" at 0x[0-9a-fA-F]+", "", repr(self.geometry)),
+            "lookupGrids": [hashlib.sha256(np.ascontiguousarray(grid).tobytes()).hexdigest() for grid in lookupGrids],
+            "medium": self.medium.configuration() if self.medium is not None else None,
+            "driftVelocity": self.driftVelocity
+        }
+
     def draw(
         self,
         ax
@@ -76,23 +161,507 @@ class PurityMonitor:
         maxEnergy: float = 2.0,      # Highest energy in arbitrary units
         energyScale: float = 1.0,    # Arbitrary units per MeV
         energyStdDev: float = 0.0,   # Electron energy standard deviation/resolution/systematic error
-        attDistance: float = 1000.0, # Electron attenuation distance in mm
+        attDistance: float | None = None, # Electron attenuation distance in mm (see `attenuate`)
+        mode: str = "batch",         # "batch" (vectorized, chunk by chunk) or "event" (event by event)
+        chunkSize: int = 100000,     # Number of events per chunk in "batch" mode
+        nWorkers: int | None = None, # Number of worker processes (parallel mode if not `None`)
+        seed: int | None = None,     # Seed of the random number generator (if `rng` is not given)
+        shardSize: int = 1000000,    # Number of events per shard in parallel mode
+        rng: np.random.Generator | None = None, # Random number generator
+        cache: SimulationCache | None = None,   # On-disk cache of simulated spectra
+        stoppingRule: StoppingRule | None = None, # Early stopping in "batch" mode (`nEvents` at most)
+        checkpoint: str | None = None,          # Checkpoint file in "batch" mode (see `Checkpoint`)
+        checkpointInterval: float = 600.0,      # Minimum time between checkpoints in seconds
         **kwargs
     ):
         """
+        Monte Carlo simulation of the energy spectra measured by the anodes of the purity monitor.
+
+        In `"batch"` mode (default), events are simulated by chunks of `chunkSize` events stored as
+        NumPy arrays, from the decay vertex sampling to the anode spectra filling. In `"event"` mode,
+        events are simulated one at a time (much slower, kept as a reference implementation).
+
+        All random numbers are drawn from `rng`, or from `np.random.default_rng(seed)` if `rng` is
+        not given, so that spectra are bitwise reproducible for a given `seed` (and `chunkSize`).
+
+        If `nWorkers` is given, `nEvents` is split into shards of `shardSize` events which are
+        simulated by a pool of `nWorkers` processes, each shard with its own random number stream
+        spawned from `np.random.SeedSequence(seed)` (or from `rng`), and the anode spectra of all
+        shards are summed. For a given `seed` and shard layout, the result does not depend on
+        `nWorkers`. Progress is logged (`logging.INFO`) as shards finish.
+
+        Without `attDistance`, electron energies are attenuated according to their drift times and
+        the electron lifetime if the purity monitor has a medium (see `attenuate`), e.g. to scan the
+        electric field and the purity:
+
+        ```
+        for electricField in [250.0, 500.0, 1000.0]:
+            purityMonitor.medium = LAr(temperature = 87.0, electricField = electricField, lifetime = 1000.0)
+            energyBins, anodeSpectra = purityMonitor.simulateEnergySpectra(nEvents = 10_000_000)
+        ```
+
+        With `cache` and `seed`, the anode spectra are loaded from the cache if the same simulation
+        (same configuration, simulation parameters and `seed`) was cached before, and cached
+        otherwise (see `SimulationCache`). Simulations without `seed`, or with a medium whose
+        mobility cannot be identified (see `Medium.mobilityKey`), are not cached.
+
+        With `stoppingRule` (in `"batch"` mode, without `nWorkers`), `nEvents` is the maximum number
+        of events: the simulation stops as soon as the cumulative anode spectra reach the target
+        precision of the stopping rule (see `streamEnergySpectra`), and the number of simulated
+        events is stored as `nSimulatedEvents` (`None` for spectra loaded from the cache). The
+        spectra are the same as the ones of a simulation of `nSimulatedEvents` events without
+        stopping rule, with the same `seed` and `chunkSize`.
+
+        With `checkpoint` (in `"batch"` mode, without `nWorkers`), the progress of the simulation is
+        saved to the `checkpoint` file every `checkpointInterval` seconds, and the simulation
+        resumes from this file if it exists, e.g. after the job was killed, with the same result as
+        an uninterrupted run (see `Checkpoint`).
+
+        All modes return the same `(energyBins, anodeSpectra)` output:
+
+        ```
+        energyBins, (innerAnodeSpectrum, outerAnodeSpectrum) = purityMonitor.simulateEnergySpectra(
+            nEvents = 10_000_000,
+            energyStdDev = 0.05,
+            attDistance = 500.0
+        )
+        ```
+        """
+
+        if mode not in ("batch", "event"):
+            raise ValueError(f"Unknown simulation mode `mode = {mode!r}`. `mode` should be either \"batch\" or \"event\".")
+        if stoppingRule is not None and (mode != "batch" or nWorkers is not None):
+            raise NotImplementedError("Early stopping (`stoppingRule`) is only implemented in \"batch\" mode, without `nWorkers`.")
+        if checkpoint is not None and (mode != "batch" or nWorkers is not None):
+            raise NotImplementedError("Checkpoints are only implemented in \"batch\" mode, without `nWorkers`.")
+
+        cached, cacheKey = None, None
+        reproducible = self.medium is None or self.medium.mobilityKey() is not None
+        if cache is not None and cache.enabled and not reproducible:
+            logger.info(f"{self}: not cached, the mobility of the medium cannot be identified (see `Medium.mobilityKey`)")
+        if cache is not None and cache.enabled and reproducible and seed is not None and rng is None:
+            configuration = {
+                **self.configuration(),
+                "simulation": {
+                    "nEvents": nEvents,
+                    "nBins": nBins,
+                    "minEnergy": minEnergy,
+                    "maxEnergy": maxEnergy,
+                    "energyStdDev": energyStdDev,
+                    "attDistance": attDistance,
+                    "mode": mode,
+                    "chunkSize": chunkSize,
+                    "shardSize": shardSize if nWorkers is not None else None, # Not `nWorkers`
+                    "seed": seed,
+                    "stoppingRule": repr(stoppingRule) if stoppingRule is not None else None
+                }
+            }
+            cacheKey = cache.key(configuration)
+            cached = cache.load(cacheKey)
+
+        self.geometry.resetAnodeSpectra(
+            nBins = nBins,
+            minEnergy = minEnergy,
+            maxEnergy = maxEnergy
+        )
+
+        self.nSimulatedEvents = nEvents
+        if cached is not None:
+            for spectrum, cachedSpectrum in zip(self.geometry.anodeSpectra, cached):
+                spectrum[:] = cachedSpectrum
+            if stoppingRule is not None:
+                self.nSimulatedEvents = None
+        elif nWorkers is not None:
+            self.simulateShards(
+                nEvents = nEvents,
+                nWorkers = nWorkers,
+                seed = seed,
+                rng = rng,
+                shardSize = shardSize,
+                simulation = {
+                    "nBins": nBins,
+                    "minEnergy": minEnergy,
+                    "maxEnergy": maxEnergy,
+                    "energyStdDev": energyStdDev,
+                    "attDistance": attDistance,
+                    "mode": mode,
+                    "chunkSize": chunkSize
+                }
+            )
+        elif mode == "batch":
+            for _ in self.streamEnergySpectra(
+                nEvents = nEvents,
+                nBins = nBins,
+                minEnergy = minEnergy,
+                maxEnergy = maxEnergy,
+                energyStdDev = energyStdDev,
+                attDistance = attDistance,
+                chunkSize = chunkSize,
+                seed = seed,
+                rng = rng,
+                stoppingRule = stoppingRule,
+                checkpoint = checkpoint,
+                checkpointInterval = checkpointInterval
+            ):
+                pass
+        else:
+            self.simulateEventByEvent(
+                nEvents = nEvents,
+                energyStdDev = energyStdDev,
+                attDistance = attDistance,
+                rng = getRng(rng, seed)
+            )
+
+        if cacheKey is not None and cached is None:
+            cache.save(cacheKey, np.array(self.geometry.anodeSpectra), configuration)
+
+        self.geometry.energyBins.scale(scale = energyScale)
+        return self.geometry.energyBins, self.geometry.anodeSpectra
+
+    def streamEnergySpectra(
+        self,
+        nEvents: int = 1000000,      # Maximum number of events to simulate
+        nBins: int = 100,            # Number of energy bins
+        minEnergy: float = 0.0,      # Lowest energy in MeV
+        maxEnergy: float = 2.0,      # Highest energy in MeV
+        energyStdDev: float = 0.0,   # Electron energy standard deviation/resolution/systematic error
+        attDistance: float | None = None, # Electron attenuation distance in mm (see `attenuate`)
+        chunkSize: int = 100000,     # Number of events per chunk
+        seed: int | None = None,     # Seed of the random number generator (if `rng` is not given)
+        rng: np.random.Generator | None = None, # Random number generator
+        stoppingRule: StoppingRule | None = None, # Convergence criterion
+        checkpoint: str | None = None,            # Checkpoint file (see `Checkpoint`)
+        checkpointInterval: float = 600.0         # Minimum time between checkpoints in seconds
+    ):
+        """
+        Monte Carlo simulation of the energy spectra measured by the anodes of the purity monitor,
+        chunk by chunk (as in the `"batch"` mode of `simulateEnergySpectra`), yielding the number of
+        events simulated so far and the cumulative `(energyBins, anodeSpectra)` after each chunk.
+        The simulation ends after `nEvents` events, or as soon as `stoppingRule` is satisfied (see
+        `StoppingRule`), or when the caller stops iterating:
+
+        ```
+        stoppingRule = PeakMeanPrecision(energyStdDev = 0.05, relativePrecision = 1e-3)
+        for nSimulated, energyBins, anodeSpectra in purityMonitor.streamEnergySpectra(
+            nEvents = 100_000_000,
+            energyStdDev = 0.05,
+            seed = 42,
+            stoppingRule = stoppingRule
+        ):
+            print(f"{nSimulated} events: {[int(spectrum.sum()) for spectrum in anodeSpectra]} collected")
+        ```
+
+        The yielded anode spectra are the ones of the geometry, updated in place by the next chunks
+        (copy them to keep them). The number of simulated events is also stored as
+        `nSimulatedEvents`. After `n` chunks, the spectra are the same as the ones of a simulation
+        of `n * chunkSize` events with the same `seed` and `chunkSize`.
+
+        With `checkpoint`, the partial anode spectra, the state of the random number generator and
+        the number of simulated events are saved to the `checkpoint` file after a chunk whenever
+        `checkpointInterval` seconds have elapsed since the last checkpoint. If the file exists,
+        the simulation resumes from it instead of starting over (the simulation parameters, except
+        `nEvents`, should be the same), and the file is removed once the simulation ends.
         """
+
+        rng = getRng(rng, seed)
         self.geometry.resetAnodeSpectra(
             nBins = nBins,
             minEnergy = minEnergy,
             maxEnergy = maxEnergy
         )
+        if stoppingRule is not None:
+            stoppingRule.reset()
+        self.nSimulatedEvents = 0
+
+        if checkpoint is not None:
+            checkpoint = Checkpoint(
+                path = checkpoint,
+                interval = checkpointInterval,
+                configuration = {
+                    **self.configuration(),
+                    "simulation": {
+                        "nBins": nBins,
+                        "minEnergy": minEnergy,
+                        "maxEnergy": maxEnergy,
+                        "energyStdDev": energyStdDev,
+                        "attDistance": attDistance,
+                        "chunkSize": chunkSize,
+                        "seed": seed,
+                        "stoppingRule": repr(stoppingRule) if stoppingRule is not None else None
+                    }
+                }
+            )
+            state = checkpoint.load()
+            if state is not None:
+                if state["nSimulatedEvents"] > nEvents:
+                    raise ValueError(f"The checkpoint {checkpoint.path} has more simulated events ({state['nSimulatedEvents']}) than `nEvents = {nEvents}`.")
+                for spectrum, checkpointSpectrum in zip(self.geometry.anodeSpectra, state["anodeSpectra"]):
+                    spectrum[:] = checkpointSpectrum
+                rng.bit_generator.state = state["rngState"]
+                self.nSimulatedEvents = state["nSimulatedEvents"]
+                if stoppingRule is not None:
+                    stoppingRule.lastCheck = state["lastCheck"]
 
-        for energy, isElec, elecDist in self.radioactiveSource.decay(nEvents = nEvents):
-            (x0, y0, z0), (ctheta, stheta, phi) = self.geometry.decayVertexAndDirection()
+        while self.nSimulatedEvents < nEvents:
+            nChunkEvents = min(chunkSize, nEvents - self.nSimulatedEvents)
+            self.simulateChunk(
+                nEvents = nChunkEvents,
+                energyStdDev = energyStdDev,
+                attDistance = attDistance,
+                rng = rng
+            )
+            self.nSimulatedEvents += nChunkEvents
+            energyBins, anodeSpectra = self.geometry.energyBins, self.geometry.anodeSpectra
+            stop = stoppingRule is not None and stoppingRule(self.nSimulatedEvents, energyBins, anodeSpectra)
+            # Checkpoints are only written between full chunks, so that `nEvents` can be increased
+            if checkpoint is not None and not stop and self.nSimulatedEvents < nEvents and checkpoint.due():
+                checkpoint.save(self.nSimulatedEvents, np.array(anodeSpectra), rng, stoppingRule)
+            yield self.nSimulatedEvents, energyBins, anodeSpectra
+            if stop:
+                logger.info(f"{self}: target precision reached after {self.nSimulatedEvents}/{nEvents} events ({stoppingRule})")
+                break
+
+        if checkpoint is not None:
+            checkpoint.remove()
+
+    def simulateTrueEnergySpectra(
+        self,
+        nEvents: int = 1000000,           # Number of events to simulate
+        fineBinWidth: float = 0.002,      # Width of the fine energy bins in MeV
+        maxEnergy: float = 2.0,           # Highest energy in MeV
+        attDistance: float | None = None, # Electron attenuation distance in mm (see `attenuate`)
+        **kwargs                          # Other `simulateEnergySpectra` parameters (mode, seed...)
+    ) -> TrueEnergySpectra:
+        """
+        Monte Carlo simulation of the anode spectra of true (unsmeared) electron energies, with fine
+        energy bins from 0 to `maxEnergy` MeV, to which any energy resolution and energy binning can
+        then be applied with `TrueEnergySpectra.smear` in a few operations per bin, without
+        re-simulating.
+        """
+        energyBins, anodeSpectra = self.simulateEnergySpectra(
+            nEvents = nEvents,
+            nBins = int(round(maxEnergy / fineBinWidth)),
+            minEnergy = 0.0,
+            maxEnergy = maxEnergy,
+            energyStdDev = 0.0,
+            attDistance = attDistance,
+            **kwargs
+        )
+        return TrueEnergySpectra(energyBins = energyBins, anodeSpectra = np.array(anodeSpectra), nEvents = nEvents)
+
+    def simulateEventTable(
+        self,
+        nEvents: int = 1000000,  # Number of events to simulate
+        chunkSize: int = 100000, # Number of events per chunk
+        seed: int | None = None, # Seed of the random number generator (if `rng` is not given)
+        rng: np.random.Generator | None = None
+    ) -> EventTable:
+        """
+        Simulate `nEvents` events by chunks, up to the electron emission (i.e. without attenuation
+        nor energy resolution), and return the compact per-event table of the electrons emitted
+        inside the active volume. Anode spectra can then be rebuilt from the table for any
+        attenuation distance, energy resolution or energy scale with `EventTable.replay`.
+        """
+
+        rng = getRng(rng, seed)
+        z, anode, energy = [], [], []
+
+        for chunkStart in range(0, nEvents, chunkSize):
+            x1, y1, z1, energy1 = self.sampleElectronEmissions(nEvents = min(chunkSize, nEvents - chunkStart), rng = rng)
+            anode1 = self.geometry.anodeIndices(x1, y1, z1)
+            collected = anode1 >= 0
+            z.append(z1[collected])
+            anode.append(anode1[collected])
+            energy.append(energy1[collected])
+
+        return EventTable(
+            z = np.concatenate(z),
+            anode = np.concatenate(anode),
+            energy = np.concatenate(energy),
+            driftLength = self.geometry.driftLength,
+            nAnodes = self.geometry.nAnodes,
+            nEvents = nEvents
+        )
+
+    def simulateShards(
+        self,
+        nEvents: int,
+        nWorkers: int,
+        seed: int | None,
+        shardSize: int,
+        simulation: dict,
+        rng: np.random.Generator | None = None
+    ) -> None:
+        """
+        Split `nEvents` into shards of `shardSize` events, simulate them with a pool of `nWorkers`
+        processes (or in the current process if `nWorkers == 1`), and add their anode spectra to
+        the (already reset) anode spectra of the geometry. Each shard has its own generator,
+        spawned from `rng` if given, otherwise from `np.random.SeedSequence(seed)`.
+        """
+
+        shards = [min(shardSize, nEvents - shardStart) for shardStart in range(0, nEvents, shardSize)]
+        if rng is None:
+            shardRngs = [np.random.default_rng(seedSequence) for seedSequence in np.random.SeedSequence(seed).spawn(len(shards))]
+        else:
+            shardRngs = rng.spawn(len(shards))
+        anodeSpectra = self.geometry.anodeSpectra
+
+        def addShard(shardSpectra, nDone):
+            for spectrum, shardSpectrum in zip(anodeSpectra, shardSpectra):
+                spectrum += shardSpectrum
+            logger.info(f"{self}: {nDone}/{len(shards)} shards simulated")
+
+        if nWorkers == 1:
+            for index, (nShardEvents, shardRng) in enumerate(zip(shards, shardRngs)):
+                addShard(simulateShard(deepcopy(self), nShardEvents, shardRng, simulation), index + 1)
+            return
+
+        with ProcessPoolExecutor(max_workers = nWorkers) as executor:
+            futures = [
+                executor.submit(simulateShard, self, nShardEvents, shardRng, simulation)
+                for nShardEvents, shardRng in zip(shards, shardRngs)
+            ]
+            for index, future in enumerate(as_completed(futures)):
+                addShard(future.result(), index + 1)
+
+    def simulateChunk(
+        self,
+        nEvents: int,
+        energyStdDev: float = 0.0,
+        attDistance: float | None = None,
+        rng: np.random.Generator | None = None
+    ) -> None:
+        """
+        Simulate a chunk of `nEvents` events with array operations and fill the anode spectra
+        accordingly.
+        """
+        rng = getRng(rng)
+        x, y, z, energy = self.sampleElectronEmissions(nEvents = nEvents, rng = rng)
+        energy = self.attenuateAndSmear(z, energy, energyStdDev = energyStdDev, attDistance = attDistance, rng = rng)
+        self.geometry.fillAnodeSpectra(x, y, z, energy)
+
+    def sampleElectronEmissions(
+        self,
+        nEvents: int,
+        rng: np.random.Generator | None = None,
+        returnEvents: bool = False
+    ) -> tuple[np.ndarray, ...]:
+        """
+        Sample `nEvents` initial decays and return the electron emission vertices (x, y, z) and the
+        electron energies before attenuation, as arrays, for the electrons emitted inside the active
+        volume only. With `returnEvents`, the index of the decay of each electron (from 0 to
+        `nEvents - 1`) is returned first.
+        """
+
+        rng = getRng(rng)
+
+        energy, isElec, elecDist = self.radioactiveSource.sampleDecays(nEvents = nEvents, rng = rng)
+
+        (x0, y0, z0), (ctheta, stheta, phi) = self.geometry.decayVerticesAndDirections(nEvents = nEvents, rng = rng)
+
+        # Sample random propagation distances `propDist` before Compton electron emission from
+        # exponential probability density functions of characteristic distances `elecDist`
+        propDist = elecDist * rng.standard_exponential(nEvents)
+
+        # Random electron emission vertices
+        # (which might be outside of the active volume for Compton electrons)
+        x1 = x0 + propDist * stheta * np.sin(phi)
+        y1 = y0 + propDist * stheta * np.cos(phi)
+        z1 = z0 + propDist * ctheta
+
+        # Discard events for which the electron emission vertex lies outside of the LAr volume
+        inside = self.geometry.areInsideActiveVolume(x1, y1, z1)
+        x1, y1, z1 = x1[inside], y1[inside], z1[inside]
+        energy, isElec, ctheta = energy[inside], isElec[inside], ctheta[inside]
+        event = np.flatnonzero(inside)
+
+        energyElec = np.empty_like(energy)
+
+        # Electrons: account for the foil on top of the Bi-207 radioactive source
+        with np.errstate(divide = "ignore"):
+            energyElec[isElec] = np.maximum(0.0, energy[isElec] - 0.0035 / ctheta[isElec])
+
+        # Gamma photons
+        energyElec[~isElec] = self.radioactiveSource.sampleComptonElectronEnergy(energy[~isElec], rng = rng)
+
+        # Electrons: account for the rim around the Bi-207 radioactive source
+        rim = isElec & (ctheta <= 0.2)
+        energyElec[rim] *= ctheta[rim] / 0.2
+
+        keep = energyElec >= 0
+        if returnEvents:
+            return event[keep], x1[keep], y1[keep], z1[keep], energyElec[keep]
+        return x1[keep], y1[keep], z1[keep], energyElec[keep]
+
+    def attenuateAndSmear(
+        self,
+        z: np.ndarray,
+        energy: np.ndarray,
+        energyStdDev: float = 0.0,
+        attDistance: float | None = None,
+        rng: np.random.Generator | None = None
+    ) -> np.ndarray:
+        """
+        Attenuate electron energies according to their drift distance to the anode plane, then
+        account for the electron energy resolution/systematic error.
+        """
+        energy = self.attenuate(z, energy, attDistance = attDistance)
+        return energy + energyStdDev * getRng(rng).standard_normal(len(energy))
+
+    def attenuate(
+        self,
+        z: np.ndarray,
+        energy: np.ndarray,
+        attDistance: float | None = None,
+        driftTime: np.ndarray | None = None
+    ) -> np.ndarray:
+        """
+        Attenuate electron energies according to their drift distance to the anode plane, as
+        `exp(-(driftLength - z) / attDistance)`.
+
+        If `attDistance` is not given and the purity monitor has a medium, electron energies are
+        attenuated according to their drift time `t` instead, as `exp(-t / medium.lifetime)`, the
+        drift times being computed with `driftTime` unless given. Otherwise, `attDistance` defaults
+        to `defaultAttDistance`.
+        """
+        if attDistance is None and self.medium is not None:
+            if not np.all(self.medium.lifetime > 0):
+                raise ValueError(f"The electron lifetime of the medium is required (`lifetime = {self.medium.lifetime}`) to attenuate electron energies without `attDistance`.")
+            if driftTime is None:
+                driftTime = self.driftTime(z)
+            return energy * np.exp(-driftTime / self.medium.lifetime)
+        if attDistance is None:
+            attDistance = self.defaultAttDistance
+        return energy * np.exp(-(self.geometry.driftLength - z) / attDistance)
+
+    def driftTime(
+        self,
+        z: np.ndarray
+    ) -> np.ndarray:
+        """
+        Drift time (µs) of electrons emitted at height `z` (mm) to the anode plane, at the drift
+        velocity `driftVelocity` (cm/µs, the one of the medium by default).
+        """
+        return (self.geometry.driftLength - z) / (10.0 * self.driftVelocity)
+
+    def simulateEventByEvent(
+        self,
+        nEvents: int,
+        energyStdDev: float = 0.0,
+        attDistance: float | None = None,
+        rng: np.random.Generator | None = None
+    ) -> None:
+        """
+        Simulate `nEvents` events one at a time and fill the anode spectra accordingly.
+        """
+        rng = getRng(rng)
+        decayVertexAndDirection = bindRng(self.geometry.decayVertexAndDirection, rng) # Even without `rng`
+        for energy, isElec, elecDist in self.radioactiveSource.decay(nEvents = nEvents, rng = rng):
+            (x0, y0, z0), (ctheta, stheta, phi) = decayVertexAndDirection()
 
             # Sample a random propagation distance `propDist` before Compton electron emission from
             # an exponential probability density function of characteristic distance `elecDist`
-            propDist = -elecDist * np.log(np.random.random())
+            propDist = -elecDist * np.log(rng.random())
             
             # Random electron emission vertex
             # (which might be outside of the active volume for Compton electrons)
@@ -112,10 +681,10 @@ class PurityMonitor:
             else:
                 success = False
                 while not success:
-                    ct = 2. * np.random.random() - 1. # Random value between -1 and +1
+                    ct = 2. * rng.random() - 1. # Random value between -1 and +1
                     epsilon = 1. / (1. + energy / 0.511 * (1.0 - ct))
                     scatteringProba = 0.5 * epsilon**2 * (epsilon + 1 / epsilon - (1.0 - ct**2))
-                    if np.random.random() <= scatteringProba:
+                    if rng.random() <= scatteringProba:
                         success = True
                         energyGamma = energy * epsilon
                         energyElec = energy - energyGamma
@@ -126,17 +695,13 @@ class PurityMonitor:
                     energyElec *= ctheta/0.2
 
             if energyElec >= 0:
-                #print(self.geometry.driftLength, z1, attDistance)
-                energyElec *= np.exp(-(self.geometry.driftLength - z1) / attDistance)
+                energyElec = self.attenuate(z1, energyElec, attDistance = attDistance)
                 
                 # Electron energy resolution/systematic error
-                energyElec += np.random.normal(loc = 0.0, scale = energyStdDev)
+                energyElec += rng.normal(loc = 0.0, scale = energyStdDev)
 
                 # Increment the event count for right anode
                 self.geometry.updateAnodeSpectra(x1, y1, z1, energyElec)
-        
-        self.geometry.energyBins.scale(scale = energyScale)
-        return self.geometry.energyBins, self.geometry.anodeSpectra
     
     def plotAnodeSpectra(
         self,
@@ -1,17 +1,149 @@
 from .PurityMonitor import PurityMonitor
 from .. import RadioactiveSource
 from .. import Geometry
+from ..Medium import Medium
+from ..RadioactiveSource import DecayCascade
+from ..rng import getRng
+import numpy as np
 
 ####################################################################################################
 
 class PurityMonitorFullDecay(PurityMonitor):
+    """
+    Purity monitor simulated with the full decay cascade of each decay (IC electrons, gamma photons,
+    Auger electrons and X-rays, see `RadioactiveSource.sampleCascades`), instead of a single initial
+    decay product.
+
+    Decay products are simulated as flat arrays with an event id column. Each product has its own
+    direction, but all the products of a decay share its vertex; products emitted towards the
+    source backing (lower half-space, each with probability 1/2) are absorbed. After attenuation,
+    the energies deposited by the products of a decay on the same anode are summed, before the
+    energy resolution is applied, so that each decay gives at most one count per anode.
+
+    Only the `"batch"` simulation mode is supported.
+    """
+
     def __init__(
         self,
         radioactiveSource: RadioactiveSource,
-        geometry: Geometry
+        geometry: Geometry,
+        medium: Medium | None = None
     ):
-        raise NotImplementedError
         super().__init__(
             radioactiveSource = radioactiveSource,
-            geometry = geometry
+            geometry = geometry,
+            medium = medium
         )
+        if radioactiveSource.cascade is None:
+            raise ValueError(f"The full decay scheme (`cascade`) of the {radioactiveSource} is required.")
+
+    def __str__(
+        self
+    ) -> str:
+        """
+        """
+        return f"purity monitor ({self.radioactiveSource}, {self.geometry}, full decay)"
+
+    def simulateChunk(
+        self,
+        nEvents: int,
+        energyStdDev: float = 0.0,
+        attDistance: float | None = None,
+        rng: np.random.Generator | None = None
+    ) -> None:
+        """
+        Simulate a chunk of `nEvents` full decays with array operations and fill the anode spectra
+        with the energy deposited by each decay on each anode.
+        """
+
+        rng = getRng(rng)
+        event, x, y, z, energy = self.sampleCascadeEmissions(nEvents = nEvents, rng = rng)
+        energy = self.attenuate(z, energy, attDistance = attDistance)
+
+        anode = self.geometry.anodeIndices(x, y, z)
+        collected = anode >= 0
+        event, anode, energy = event[collected], anode[collected], energy[collected]
+
+        # Sum the energies deposited by the products of each decay on each anode
+        deposits, depositIndex = np.unique(event * self.geometry.nAnodes + anode, return_inverse = True)
+        energy = np.bincount(depositIndex, weights = energy, minlength = len(deposits))
+
+        energy += energyStdDev * rng.standard_normal(len(energy))
+        self.geometry.fillAnodeSpectraFromIndices(deposits % self.geometry.nAnodes, energy)
+
+    def sampleCascadeEmissions(
+        self,
+        nEvents: int,
+        rng: np.random.Generator | None = None
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Sample `nEvents` full decays and return, for each electron emitted inside the active volume
+        (IC and Auger electrons from the source, Compton electrons from gamma photons, and
+        photoelectrons from X-rays), the index of its decay, its emission vertex (x, y, z) and its
+        energy before attenuation, as flat arrays.
+        """
+
+        rng = getRng(rng)
+
+        event, energy, kind, distance = self.radioactiveSource.sampleCascades(nEvents = nEvents, rng = rng)
+
+        # Products emitted towards the source backing are absorbed
+        upward = rng.random(len(event)) < 0.5
+        event, energy, kind, distance = event[upward], energy[upward], kind[upward], distance[upward]
+        nProducts = len(event)
+
+        # Shared decay vertices, and one direction per product
+        x0, y0, z0 = self.geometry.decayVertices(nEvents = nEvents, rng = rng)
+        ctheta, stheta, phi = self.geometry.decayDirections(nEvents = nProducts, rng = rng)
+
+        # Random propagation distances before the electron emission (0 for electrons)
+        propDist = distance * rng.standard_exponential(nProducts)
+
+        x1 = x0[event] + propDist * stheta * np.sin(phi)
+        y1 = y0[event] + propDist * stheta * np.cos(phi)
+        z1 = z0[event] + propDist * ctheta
+
+        # Discard products whose electron emission vertex lies outside of the active volume
+        inside = self.geometry.areInsideActiveVolume(x1, y1, z1)
+        event, x1, y1, z1 = event[inside], x1[inside], y1[inside], z1[inside]
+        energy, kind, ctheta = energy[inside], kind[inside], ctheta[inside]
+
+        isElec = kind == DecayCascade.ELECTRON
+        isGamma = kind == DecayCascade.GAMMA
+        energyElec = energy.copy() # X-rays: full photo-absorption
+
+        # Electrons: account for the foil on top of the Bi-207 radioactive source
+        with np.errstate(divide = "ignore"):
+            energyElec[isElec] = np.maximum(0.0, energy[isElec] - 0.0035 / ctheta[isElec])
+
+        # Gamma photons: Compton electrons
+        energyElec[isGamma] = self.radioactiveSource.sampleComptonElectronEnergy(energy[isGamma], rng = rng)
+
+        # Electrons: account for the rim around the Bi-207 radioactive source
+        rim = isElec & (ctheta <= 0.2)
+        energyElec[rim] *= ctheta[rim] / 0.2
+
+        keep = energyElec >= 0
+        return event[keep], x1[keep], y1[keep], z1[keep], energyElec[keep]
+
+    def simulateEventByEvent(
+        self,
+        nEvents: int,
+        energyStdDev: float = 0.0,
+        attDistance: float | None = None,
+        rng: np.random.Generator | None = None
+    ) -> None:
+        """
+        Full decays are only simulated in `"batch"` mode.
+        """
+        raise NotImplementedError("Full decays are only simulated in \"batch\" mode.")
+
+    def simulateEventTable(
+        self,
+        *args,
+        **kwargs
+    ):
+        """
+        Event tables store a single electron per decay, which does not describe full decays.
+        """
+        raise NotImplementedError("Event tables are not available for full decays.")
@@ -1,6 +1,7 @@
 from .PurityMonitor import PurityMonitor
 from .. import RadioactiveSource
 from .. import Geometry
+from ..Medium import Medium
 
 ####################################################################################################
 
@@ -8,11 +9,13 @@ class PurityMonitorInitDecay(PurityMonitor):
     def __init__(
         self,
         radioactiveSource: RadioactiveSource,
-        geometry: Geometry
+        geometry: Geometry,
+        medium: Medium | None = None
     ):
         super().__init__(
             radioactiveSource = radioactiveSource,
-            geometry = geometry
+            geometry = geometry,
+            medium = medium
         )
         
     def __str__(
@@ -1,17 +1,283 @@
 from .PurityMonitor import PurityMonitor
 from .. import RadioactiveSource
 from .. import Geometry
+from ..Medium import Medium
+from ..rng import getRng
+from ..types import float_µs, float_cm_per_µs # For type hint only
+import numpy as np
 
 ####################################################################################################
 
 class PurityMonitorInitDecayTimed(PurityMonitor):
+    """
+    Purity monitor simulated with the initial decay only, with timestamps: decays are a Poisson
+    process of rate `radioactiveSource.activity`, and each electron reaches its anode after a drift
+    time `(driftLength - z) / driftVelocity` (with the drift velocity of `medium`, unless
+    `driftVelocity` is given).
+
+    Signals reaching the same anode less than `shapingTime` after each other pile up, i.e. are
+    measured as a single pulse (`pileUp = "sum"`, the pulse energy being the sum of their energies),
+    or are discarded (`pileUp = "reject"`, as with an ideal pile-up rejection). Time units are µs.
+
+    ```
+    purityMonitor = PurityMonitorInitDecayTimed(
+        radioactiveSource = Bi207(activity = 100.0), # kBq
+        geometry = CylinderConcentricTwoPartAnode(innerRadius = 10.0, outerRadius = 25.0, driftLength = 100.0),
+        driftVelocity = 0.15, # cm/µs
+        shapingTime = 2.0     # µs
+    )
+    energyBins, anodeSpectra = purityMonitor.simulateEnergySpectra(nEvents = 100_000_000, seed = 42)
+    purityMonitor.pulseTimes, purityMonitor.pulseMultiplicities # Pulse timestamps and pile-up
+    ```
+
+    Only the `"batch"` simulation mode is supported.
+    """
+
     def __init__(
         self,
         radioactiveSource: RadioactiveSource,
-        geometry: Geometry
+        geometry: Geometry,
+        medium: Medium | None = None,
+        driftVelocity: float_cm_per_µs | None = None,
+        shapingTime: float_µs = 1.0,
+        pileUp: str = "sum"
     ):
-        raise NotImplementedError
         super().__init__(
             radioactiveSource = radioactiveSource,
-            geometry = geometry
+            geometry = geometry,
+            medium = medium
         )
+        if not radioactiveSource.activity > 0:
+            raise ValueError(f"The activity of the {radioactiveSource} is required (`activity = {radioactiveSource.activity}`).")
+        self.driftVelocity = driftVelocity # The one of `medium` if `None`
+        if not self.driftVelocity > 0:
+            raise ValueError(f"A drift velocity is required (`driftVelocity = {self.driftVelocity}`), from `medium` or given explicitly.")
+        if pileUp not in ("sum", "reject"):
+            raise ValueError(f"Unknown pile-up treatment `pileUp = {pileUp!r}`. `pileUp` should be either \"sum\" or \"reject\".")
+
+        self.shapingTime = shapingTime
+        self.pileUp = pileUp
+
+    def __str__(
+        self
+    ) -> str:
+        """
+        """
+        return f"purity monitor ({self.radioactiveSource}, {self.geometry}, initial decay only, timed)"
+
+    @property
+    def decayRate(
+        self
+    ) -> float:
+        """
+        Decay rate in decays per µs (the activity being in kBq).
+        """
+        return self.radioactiveSource.activity * 1e-3
+
+    def simulateEnergySpectra(
+        self,
+        nEvents: int = 1000000,      # Number of events to simulate
+        nBins: int = 100,            # Number of energy bins
+        minEnergy: float = 0.0,      # Lowest energy in arbitrary units
+        maxEnergy: float = 2.0,      # Highest energy in arbitrary units
+        energyScale: float = 1.0,    # Arbitrary units per MeV
+        energyStdDev: float = 0.0,   # Electron energy standard deviation/resolution/systematic error
+        attDistance: float | None = None, # Electron attenuation distance in mm (see `attenuate`)
+        mode: str = "batch",         # Only "batch" is supported
+        chunkSize: int = 100000,     # Number of events per chunk
+        nWorkers: int | None = None, # Not supported (decays are timestamped sequentially)
+        seed: int | None = None,     # Seed of the random number generator (if `rng` is not given)
+        storePulses: bool = True,    # Whether to store the timestamps of all pulses
+        rng: np.random.Generator | None = None, # Random number generator
+        **kwargs
+    ):
+        """
+        Monte Carlo simulation of the energy spectra measured by the anodes of the purity monitor,
+        with pile-up. Return the same `(energyBins, anodeSpectra)` output as
+        `PurityMonitor.simulateEnergySpectra`.
+
+        Decay times are generated chunk by chunk (cumulative sums of exponential waiting times), and
+        the signals of each chunk are grouped into pulses in a single pass over the signals sorted by
+        anode and arrival time. Pulses which may still pile up with signals of the next chunk are
+        carried over to it, so that the result does not depend on `chunkSize` beyond the random
+        number stream.
+
+        With `storePulses`, the pulses are stored as arrays (one item per pulse, in chunk order):
+        `pulseTimes` (arrival time of the first signal at the anode, µs), `pulseDecayTimes` (time of
+        the first decay, µs), `pulseAnodes`, `pulseEnergies` (measured energy, MeV) and
+        `pulseMultiplicities` (number of piled-up signals, 1 without pile-up). `simulatedTime` is the
+        time of the last decay (µs).
+
+        Early stopping (`stoppingRule`), checkpoints (`checkpoint`) and caching (`cache`) are not
+        available for timed simulations.
+        """
+
+        if mode != "batch":
+            raise NotImplementedError("Timed simulations are only available in \"batch\" mode.")
+        if nWorkers is not None:
+            raise NotImplementedError("Timed simulations are not available in parallel mode.")
+        if kwargs.get("stoppingRule") is not None:
+            raise NotImplementedError("Early stopping is not available for timed simulations.")
+        if kwargs.get("checkpoint") is not None:
+            raise NotImplementedError("Checkpoints are not available for timed simulations.")
+        if kwargs.get("cache") is not None:
+            raise NotImplementedError("Caching is not available for timed simulations (pulses are not cached).")
+
+        self.geometry.resetAnodeSpectra(
+            nBins = nBins,
+            minEnergy = minEnergy,
+            maxEnergy = maxEnergy
+        )
+
+        rng = getRng(rng, seed)
+        self.simulatedTime = 0.0
+        self.pendingSignals = tuple(np.empty(0, dtype = dtype) for dtype in (float, float, np.intp, float))
+        self.pulses = [] if storePulses else None
+
+        for chunkStart in range(0, nEvents, chunkSize):
+            self.simulateChunk(
+                nEvents = min(chunkSize, nEvents - chunkStart),
+                energyStdDev = energyStdDev,
+                attDistance = attDistance,
+                rng = rng
+            )
+        self.collectPulses(*self.pendingSignals, energyStdDev = energyStdDev, final = True, rng = rng)
+
+        if storePulses:
+            (
+                self.pulseTimes,
+                self.pulseDecayTimes,
+                self.pulseAnodes,
+                self.pulseEnergies,
+                self.pulseMultiplicities
+            ) = (np.concatenate(column) for column in zip(*self.pulses))
+        del self.pulses, self.pendingSignals
+
+        self.geometry.energyBins.scale(scale = energyScale)
+        return self.geometry.energyBins, self.geometry.anodeSpectra
+
+    def simulateChunk(
+        self,
+        nEvents: int,
+        energyStdDev: float = 0.0,
+        attDistance: float | None = None,
+        rng: np.random.Generator | None = None
+    ) -> None:
+        """
+        Simulate a chunk of `nEvents` consecutive decays with array operations, and fill the anode
+        spectra with the pulses which can no longer pile up with later signals.
+        """
+
+        rng = getRng(rng)
+
+        # Poisson process: exponential waiting times between consecutive decays
+        decayTime = self.simulatedTime + np.cumsum(rng.standard_exponential(nEvents)) / self.decayRate
+        self.simulatedTime = decayTime[-1]
+
+        event, x, y, z, energy = self.sampleElectronEmissions(nEvents = nEvents, rng = rng, returnEvents = True)
+        anode = self.geometry.anodeIndices(x, y, z)
+        collected = anode >= 0
+        event, z, anode, energy = event[collected], z[collected], anode[collected], energy[collected]
+
+        # Drift times: both the arrival times and the attenuation (with a medium) depend on them
+        driftTime = self.driftTime(z)
+        energy = self.attenuate(z, energy, attDistance = attDistance, driftTime = driftTime)
+        decayTime = decayTime[event]
+
+        pendingDecayTime, pendingArrivalTime, pendingAnode, pendingEnergy = self.pendingSignals
+        self.collectPulses(
+            np.concatenate((pendingDecayTime, decayTime)),
+            np.concatenate((pendingArrivalTime, decayTime + driftTime)),
+            np.concatenate((pendingAnode, anode)),
+            np.concatenate((pendingEnergy, energy)),
+            energyStdDev = energyStdDev,
+            final = False,
+            rng = rng
+        )
+
+    def collectPulses(
+        self,
+        decayTime: np.ndarray,
+        arrivalTime: np.ndarray,
+        anode: np.ndarray,
+        energy: np.ndarray,
+        energyStdDev: float = 0.0,
+        final: bool = True,
+        rng: np.random.Generator | None = None
+    ) -> None:
+        """
+        Group signals into pulses, signals on the same anode being piled up when they arrive less
+        than `shapingTime` after the previous one, then account for the energy resolution and fill
+        the anode spectra. Unless `final`, the pulses which may still pile up with the signals of
+        decays after `simulatedTime` are kept in `pendingSignals` instead.
+        """
+
+        order = np.lexsort((arrivalTime, anode))
+        decayTime, arrivalTime, anode, energy = decayTime[order], arrivalTime[order], anode[order], energy[order]
+
+        # One sorted pass: a new pulse starts at each anode change or gap longer than the shaping time
+        newPulse = np.ones(len(energy), dtype = bool)
+        newPulse[1:] = (anode[1:] != anode[:-1]) | (np.diff(arrivalTime) > self.shapingTime)
+        pulse = np.cumsum(newPulse) - 1
+        first = np.flatnonzero(newPulse)
+
+        if not final:
+            # Later signals arrive after `simulatedTime` (their decay time)
+            last = np.append(first[1:] - 1, len(energy) - 1)
+            pending = (arrivalTime[last] >= self.simulatedTime - self.shapingTime)[pulse]
+            self.pendingSignals = (decayTime[pending], arrivalTime[pending], anode[pending], energy[pending])
+            decayTime, arrivalTime, anode, energy = decayTime[~pending], arrivalTime[~pending], anode[~pending], energy[~pending]
+            newPulse = newPulse[~pending]
+            pulse = np.cumsum(newPulse) - 1
+            first = np.flatnonzero(newPulse)
+
+        multiplicity = np.bincount(pulse, minlength = len(first))
+        pulseEnergy = np.bincount(pulse, weights = energy, minlength = len(first))
+        pulseEnergy = pulseEnergy + energyStdDev * getRng(rng).standard_normal(len(first))
+        pulseAnode = anode[first]
+
+        if self.pileUp == "reject":
+            accepted = multiplicity == 1
+            self.geometry.fillAnodeSpectraFromIndices(pulseAnode[accepted], pulseEnergy[accepted])
+        else:
+            self.geometry.fillAnodeSpectraFromIndices(pulseAnode, pulseEnergy)
+
+        if self.pulses is not None:
+            self.pulses.append((
+                arrivalTime[first],
+                decayTime[first],
+                pulseAnode,
+                pulseEnergy.astype(np.float32),
+                multiplicity
+            ))
+
+    def simulateEventByEvent(
+        self,
+        *args,
+        **kwargs
+    ):
+        """
+        Timed simulations are only available in `"batch"` mode.
+        """
+        raise NotImplementedError("Timed simulations are only available in \"batch\" mode.")
+
+    def streamEnergySpectra(
+        self,
+        *args,
+        **kwargs
+    ):
+        """
+        Pulses which may still pile up with the signals of the next chunk are only filled into the
+        anode spectra at the next chunk, so that the cumulative spectra are not streamed.
+        """
+        raise NotImplementedError("Streamed simulations are not available for timed simulations.")
+
+    def simulateEventTable(
+        self,
+        *args,
+        **kwargs
+    ):
+        """
+        Event tables do not store decay times, which are required for pile-up.
+        """
+        raise NotImplementedError("Event tables are not available for timed simulations.")
@@ -0,0 +1,198 @@
+import numpy as np
+import os
+import json
+import hashlib
+import logging
+import tempfile
+import zipfile
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError: # Not available on Windows: eviction is then not serialized between processes
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+####################################################################################################
+
+def canonical(
+    value
+):
+    """
+    Canonical, JSON-serializable form of `value` (nested dicts, lists, tuples, NumPy arrays and
+    scalars), with sorted dict keys, so that equal configurations always have the same hash.
+    """
+    if isinstance(value, dict):
+        return {str(key): canonical(value[key]) for key in sorted(value, key = str)}
+    if isinstance(value, (list, tuple)):
+        return [canonical(item) for item in value]
+    if isinstance(value, np.ndarray):
+        return canonical(value.tolist())
+    if isinstance(value, np.generic):
+        return value.item()
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return repr(value)
+
+####################################################################################################
+
+class SimulationCache:
+    """
+    On-disk cache of the anode spectra simulated by `PurityMonitor.simulateEnergySpectra`, keyed by
+    a hash of the purity monitor configuration (radioactive source lines, geometry parameters,
+    medium), of the simulation parameters, of the seed and of the package version:
+
+    ```
+    cache = SimulationCache("~/.cache/puritymonitor", maxBytes = 2**30)
+    energyBins, anodeSpectra = purityMonitor.simulateEnergySpectra(nEvents = 10_000_000, seed = 42, cache = cache)
+    ```
+
+    The second identical call loads the spectra from disk instead of simulating them. Simulations
+    without `seed`, or drawing from a given `rng`, are never cached (a single random realization
+    would otherwise be reused forever).
+
+    The least recently used entries are evicted when the cache exceeds `maxBytes`. Entries are
+    written to temporary files renamed atomically (`os.replace`), and evictions are serialized with
+    a lock file, so that several processes can share the same cache directory. The cache can be
+    bypassed with `enabled = False`, or by setting the `PURITYMONITOR_NO_CACHE` environment
+    variable (to any non-empty value).
+    """
+
+    def __init__(
+        self,
+        directory: str | None = None,
+        maxBytes: int = 2**30,
+        enabled: bool | None = None
+    ):
+        if directory is None:
+            directory = os.environ.get("PURITYMONITOR_CACHE", os.path.join("~", ".cache", "puritymonitor"))
+        self.directory = os.path.expanduser(directory)
+        self.maxBytes = maxBytes
+        self.enabled = enabled if enabled is not None else not os.environ.get("PURITYMONITOR_NO_CACHE")
+        os.makedirs(self.directory, exist_ok = True)
+
+    def __repr__(
+        self
+    ) -> str:
+        return f"{self.__class__.__name__}({self.directory!r}, maxBytes = {self.maxBytes}, enabled = {self.enabled})"
+
+    def key(
+        self,
+        configuration: dict
+    ) -> str:
+        """
+        SHA-256 hash of the canonical JSON form of `configuration`.
+        """
+        return hashlib.sha256(json.dumps(canonical(configuration), sort_keys = True).encode()).hexdigest()
+
+    def path(
+        self,
+        key: str
+    ) -> str:
+        return os.path.join(self.directory, f"{key}.npz")
+
+    def load(
+        self,
+        key: str
+    ) -> np.ndarray | None:
+        """
+        Cached anode spectra `(anode, energy bin)` for `key`, or `None` if there is none. A hit
+        marks the entry as recently used.
+        """
+        path = self.path(key)
+        try:
+            with np.load(path) as data:
+                anodeSpectra = data["anodeSpectra"]
+            os.utime(path)
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile): # Missing, evicted or partial entry
+            return None
+        logger.info(f"Simulation cache hit: {path}")
+        return anodeSpectra
+
+    def save(
+        self,
+        key: str,
+        anodeSpectra: np.ndarray,
+        configuration: dict
+    ) -> None:
+        """
+        Store the anode spectra for `key` (along with the configuration, for inspection), then
+        evict the least recently used entries if needed.
+        """
+        descriptor, temporary = tempfile.mkstemp(dir = self.directory, suffix = ".tmp")
+        try:
+            with os.fdopen(descriptor, "wb") as file:
+                np.savez(
+                    file,
+                    anodeSpectra = np.asarray(anodeSpectra),
+                    configuration = json.dumps(canonical(configuration), sort_keys = True)
+                )
+            os.replace(temporary, self.path(key))
+        except BaseException:
+            os.remove(temporary)
+            raise
+        self.evict()
+
+    @contextmanager
+    def lock(
+        self
+    ):
+        """
+        Exclusive lock on the cache directory, shared between processes (where `fcntl` exists).
+        """
+        with open(os.path.join(self.directory, ".lock"), "a") as lockFile:
+            if fcntl is not None:
+                fcntl.flock(lockFile, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lockFile, fcntl.LOCK_UN)
+
+    def entries(
+        self
+    ) -> list[tuple[float, int, str]]:
+        """
+        Last access time, size and path of all cache entries, least recently used first.
+        """
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".npz"):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError: # Evicted by another process
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return sorted(entries)
+
+    def evict(
+        self
+    ) -> None:
+        """
+        Remove the least recently used entries until the cache fits in `maxBytes`.
+        """
+        with self.lock():
+            entries = self.entries()
+            size = sum(entrySize for _, entrySize, _ in entries)
+            for _, entrySize, path in entries:
+                if size <= self.maxBytes:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                size -= entrySize
+
+    def clear(
+        self
+    ) -> None:
+        """
+        Remove all cache entries.
+        """
+        with self.lock():
+            for _, _, path in self.entries():
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
@@ -0,0 +1,221 @@
+import numpy as np
+import logging
+from scipy.signal import find_peaks
+from ..EnergySpectra.EnergySpectra import gaussian, gaussianJacobian
+from ..EnergySpectra.Likelihood import fitCurve
+from ..EnergySpectra import EnergyBins # For type hint only
+from collections.abc import Iterable # For type hint only
+from ..types import float_MeV # For type hint only
+
+logger = logging.getLogger(__name__)
+
+####################################################################################################
+
+class StoppingRule:
+    """
+    Convergence criterion of streamed simulations (see `PurityMonitor.streamEnergySpectra`), called
+    with the cumulative anode spectra after each chunk of events. The criterion (`converged`) is
+    only evaluated once at least `minEvents` events have been simulated, and then whenever the
+    number of simulated events has grown by a fraction `checkGrowth` since the last evaluation, so
+    that costly criteria (e.g. fits) take a negligible fraction of the simulation time while the
+    simulation overshoots the required number of events by at most this fraction.
+    """
+
+    def __init__(
+        self,
+        minEvents: int = 100000,
+        checkGrowth: float = 0.2
+    ):
+        self.minEvents = minEvents
+        self.checkGrowth = checkGrowth
+        self.reset()
+
+    def __repr__(
+        self
+    ) -> str:
+        return f"{self.__class__.__name__}({', '.join(f'{name} = {value!r}' for name, value in vars(self).items() if name != 'lastCheck')})"
+
+    def __call__(
+        self,
+        nEvents: int,
+        energyBins: EnergyBins,
+        anodeSpectra: Iterable[np.ndarray]
+    ) -> bool:
+        """
+        Whether the simulation of `nEvents` events, with the given cumulative anode spectra, can be
+        stopped.
+        """
+        if nEvents < self.minEvents or nEvents < (1.0 + self.checkGrowth) * self.lastCheck:
+            return False
+        self.lastCheck = nEvents
+        return self.converged(energyBins, np.asarray(anodeSpectra, dtype = float))
+
+    def reset(
+        self
+    ) -> None:
+        """
+        Forget the previous evaluations, before a new simulation.
+        """
+        self.lastCheck = 0
+
+    def converged(
+        self,
+        energyBins: EnergyBins,
+        anodeSpectra: np.ndarray
+    ) -> bool:
+        """
+        Whether the anode spectra `(anode, energy bin)` reached the target precision.
+
+        This method must be implemented in derived classes.
+        """
+        raise NotImplementedError
+
+####################################################################################################
+
+class PeakMeanPrecision(StoppingRule):
+    """
+    Stop once the mean of the IC peak of each anode spectrum (or of the `anodes` given) is known
+    with a relative statistical precision `relativePrecision`.
+
+    By default, the peak is the highest-energy peak within `icWindow` (the window of the ~1 MeV
+    Bi-207 IC peak, in MeV, above the Compton continuum which holds the highest bins of the
+    spectrum) standing out by at least a fraction `prominence` of the highest bin of the window;
+    with `fitRange`, it is the highest bin within `fitRange`. It is fitted with a Gaussian of
+    initial standard deviation `energyStdDev` by binned Poisson maximum likelihood over `nStdDevs`
+    standard deviations on each side, so that its uncertainty decreases as `1 / sqrt(nEvents)`
+    (unweighted least-squares uncertainties are dominated by the shape of the peak rather than by
+    the number of events). Example:
+
+    ```
+    energyBins, anodeSpectra = purityMonitor.simulateEnergySpectra(
+        nEvents = 10_000_000, # At most
+        energyStdDev = 0.067,
+        stoppingRule = PeakMeanPrecision(energyStdDev = 0.067, anodes = [0])
+    )
+    ```
+
+    With the default `relativePrecision` (0.1 %), in a typical dual purity monitor (inner and outer
+    anodes of radii 15 and 30 mm, drift length 65 mm, attenuation distance 458.5 mm), the IC peak
+    of the inner anode (`anodes = [0]`) is reached after 1,000,000 events with `energyStdDev =
+    0.067` (300,000 events with 0.03), with the same fitted peak mean as a 10,000,000 event
+    simulation to 0.1 %. The IC peak of the outer anode, degraded by grazing emissions, is much
+    wider: it is only known to 0.11 to 0.12 % after 10,000,000 events (0.1 % with 0.03), so that
+    a rule on all anodes does not stop a 10,000,000 event simulation early; with
+    `relativePrecision = 2e-3`, it stops after 2,700,000 to 4,000,000 events.
+    """
+
+    icWindow = (0.4, 1.2) # MeV, window of the ~1 MeV Bi-207 IC peak, above the Compton continuum
+
+    def __init__(
+        self,
+        energyStdDev: float_MeV,
+        relativePrecision: float = 1e-3,
+        fitRange: tuple[float, float] | None = None,
+        nStdDevs: float = 1.5,
+        anodes: Iterable[int] | None = None,
+        prominence: float = 0.1,
+        minEvents: int = 100000,
+        checkGrowth: float = 0.2
+    ):
+        self.energyStdDev = energyStdDev
+        self.relativePrecision = relativePrecision
+        self.fitRange = fitRange
+        self.nStdDevs = nStdDevs
+        self.prominence = prominence
+        self.anodes = list(anodes) if anodes is not None else None
+        super().__init__(minEvents = minEvents, checkGrowth = checkGrowth)
+
+    def peakIndex(
+        self,
+        energy: np.ndarray,
+        spectrum: np.ndarray
+    ) -> int | None:
+        """
+        Index of the bin of the IC peak of `spectrum` (`None` if there is none), given the bin
+        centers `energy`.
+        """
+        if self.fitRange is not None:
+            inRange = (energy >= self.fitRange[0]) & (energy <= self.fitRange[1])
+            return int(np.argmax(np.where(inRange, spectrum, -np.inf)))
+
+        # Highest-energy peak of the IC window standing out by a fraction `prominence` of the
+        # highest bin of the window (the Compton continuum peaks below the window)
+        inWindow = np.flatnonzero((energy >= self.icWindow[0]) & (energy <= self.icWindow[1]))
+        if len(inWindow) < 3:
+            return None
+        windowSpectrum = spectrum[inWindow]
+        peaks, _ = find_peaks(windowSpectrum, prominence = self.prominence * np.max(windowSpectrum))
+        return int(inWindow[peaks[-1]]) if len(peaks) > 0 else None
+
+    def peakMeanPrecision(
+        self,
+        energyBins: EnergyBins,
+        spectrum: np.ndarray
+    ) -> float:
+        """
+        Relative statistical uncertainty of the fitted mean of the IC peak of `spectrum` (infinite
+        if there is no peak or if the fit fails).
+        """
+        energy = (np.asarray(energyBins.lower) + np.asarray(energyBins.upper)) / 2
+        peak = self.peakIndex(energy, spectrum)
+        if peak is None:
+            return np.inf
+        window = np.abs(energy - energy[peak]) <= self.nStdDevs * self.energyStdDev
+        if spectrum[peak] <= 0 or np.count_nonzero(window) < 4:
+            return np.inf
+        try:
+            (_, mean, _), covariance = fitCurve(
+                f = gaussian,
+                xdata = energy[window],
+                ydata = spectrum[window],
+                p0 = (spectrum[peak], energy[peak], self.energyStdDev),
+                jac = gaussianJacobian,
+                method = "poisson"
+            )
+        except RuntimeError:
+            return np.inf
+        precision = np.sqrt(covariance[1, 1]) / abs(mean)
+        return precision if np.isfinite(precision) else np.inf
+
+    def converged(
+        self,
+        energyBins: EnergyBins,
+        anodeSpectra: np.ndarray
+    ) -> bool:
+        anodes = self.anodes if self.anodes is not None else range(len(anodeSpectra))
+        precision = max(self.peakMeanPrecision(energyBins, anodeSpectra[anode]) for anode in anodes)
+        logger.debug(f"IC peak mean relative precision: {precision:.3g} (target: {self.relativePrecision:.3g})")
+        return precision <= self.relativePrecision
+
+####################################################################################################
+
+class BinRelativeError(StoppingRule):
+    """
+    Stop once every energy bin of each anode spectrum (or of the `anodes` given) with at least a
+    fraction `threshold` of the counts of the highest bin of the spectrum has a relative
+    statistical error `1 / sqrt(counts)` below `relativeError`, e.g. for spectrum templates.
+    """
+
+    def __init__(
+        self,
+        relativeError: float = 0.01,
+        threshold: float = 0.1,
+        anodes: Iterable[int] | None = None,
+        minEvents: int = 100000,
+        checkGrowth: float = 0.0
+    ):
+        self.relativeError = relativeError
+        self.threshold = threshold
+        self.anodes = list(anodes) if anodes is not None else None
+        super().__init__(minEvents = minEvents, checkGrowth = checkGrowth)
+
+    def converged(
+        self,
+        energyBins: EnergyBins,
+        anodeSpectra: np.ndarray
+    ) -> bool:
+        if self.anodes is not None:
+            anodeSpectra = anodeSpectra[self.anodes]
+        highest = np.max(anodeSpectra, axis = -1, keepdims = True)
+        counts = np.where(anodeSpectra >= self.threshold * highest, anodeSpectra, np.inf)
+        return bool(np.all(highest > 0) and np.min(counts) * self.relativeError**2 >= 1.0)
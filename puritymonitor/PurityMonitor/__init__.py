@@ -1,2 +1,8 @@
+from .EventTable import EventTable
+from .SimulationCache import SimulationCache
+from .StoppingRule import StoppingRule, PeakMeanPrecision, BinRelativeError
+from .Checkpoint import Checkpoint
 from .PurityMonitor import PurityMonitor
 from .PurityMonitorInitDecay import PurityMonitorInitDecay
+from .PurityMonitorInitDecayTimed import PurityMonitorInitDecayTimed
+from .PurityMonitorFullDecay import PurityMonitorFullDecay
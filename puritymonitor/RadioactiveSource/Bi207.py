@@ -1,8 +1,41 @@
 from . import RadioactiveSource
+from .DecayCascade import DecayCascade
 from ..types import float_MeV, float_mm, float_kBq
 
 ####################################################################################################
 
+def bi207Cascade() -> DecayCascade:
+    """
+    Approximate Bi-207 decay scheme (electron capture to Pb-207), from evaluated nuclear data:
+
+    - 1633.4 keV level (84.0%): 1063.7 keV then 569.7 keV transitions;
+    - 2339.9 keV level (7.0%): 1770.2 keV then 569.7 keV transitions;
+    - 569.7 keV level (9.0%): 569.7 keV transition.
+
+    Atomic shells are K, L and M (Pb binding energies, fluorescence yields, main X-ray lines and
+    Auger electron energies), and X-ray absorption distances are given in liquid argon.
+    """
+    return DecayCascade(
+        branchProba = [0.8398, 0.0703, 0.0899],
+        branchTransitions = [[1, 0], [2, 0], [0]],
+        transitionEnergy = [0.569702, 1.063662, 1.770237], # Same as the gamma lines of `Bi207`
+        conversionCoefficients = [ # K, L, M
+            [0.01575, 0.00439, 0.00109],
+            [0.0951, 0.0184, 0.0045],
+            [0.00323, 0.00054, 0.00013]
+        ],
+        gammaComptonDistance = [80.0, 120.0, 160.0],
+        captureProba = [0.82, 0.14, 0.04],
+        bindingEnergy = [0.088005, 0.0145, 0.0033],
+        fluorescenceYield = [0.963, 0.37, 0.03],
+        xRayEnergy = [[0.072805, 0.074969, 0.0849], [0.01055, 0.0126], [0.00235]],
+        xRayProba = [[0.277, 0.463, 0.26], [0.6, 0.4], [1.0]],
+        augerEnergy = [0.0560, 0.0079, 0.0020],
+        xRayAbsorptionDistance = [18.0, 0.1, 0.02]
+    )
+
+####################################################################################################
+
 class Bi207(RadioactiveSource):
     """
     Bi-207 radioactive source, which decays almost exclusively by electron capture (EC) to an
@@ -15,6 +48,9 @@ class Bi207(RadioactiveSource):
     Low-energy (0 to 100 keV) decay products:
     - Auger electrons;
     - X-rays.
+
+    The initial decay lines describe a single product per decay, while `cascade` (`bi207Cascade()`
+    by default) describes all the correlated products of each decay.
     """
     def __init__(
         self,
@@ -24,7 +60,8 @@ class Bi207(RadioactiveSource):
         gammaProba: list[float] = [0.0, 0.0, 0.980, 0.0, 0.750, 0.0, 0.069], # To do
         gammaComptonDistance: list[float_mm] = [0.0, 0.0, 80.0, 0.0, 120.0, 0.0, 160.0], # To do
         activity: float_kBq = float("NaN"),
-        description: str = "Bi-207 radioactive source"
+        description: str = "Bi-207 radioactive source",
+        cascade: DecayCascade | None = None
     ) -> None:
         super().__init__(
             electronEnergy = electronEnergy,
@@ -33,5 +70,6 @@ class Bi207(RadioactiveSource):
             gammaProba = gammaProba,
             gammaComptonDistance = gammaComptonDistance,
             activity = activity,
-            description = description
+            description = description,
+            cascade = cascade if cascade is not None else bi207Cascade()
         )
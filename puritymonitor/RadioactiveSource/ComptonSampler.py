@@ -0,0 +1,143 @@
+import numpy as np
+from collections.abc import Iterable # For type hint only
+from ..rng import getRng
+from ..types import float_MeV # For type hint only
+
+####################################################################################################
+
+def kleinNishinaDensity(
+    gammaEnergy: float_MeV,
+    ct: float
+) -> float:
+    """
+    Unnormalized probability density of the cosine `ct` of the Compton scattering angle of a gamma
+    photon of energy `gammaEnergy`, according to the Klein-Nishina formula.
+    """
+    epsilon = 1.0 / (1.0 + gammaEnergy / 0.511 * (1.0 - ct))
+    return 0.5 * epsilon**2 * (epsilon + 1.0 / epsilon - (1.0 - ct**2))
+
+####################################################################################################
+
+def comptonElectronEnergyRejection(
+    gammaEnergy: np.ndarray,
+    rng: np.random.Generator | None = None
+) -> np.ndarray:
+    """
+    Sample the energies of Compton electrons for an array of gamma photon energies, according to
+    the Klein-Nishina formula, with a vectorized rejection sampling.
+    """
+
+    rng = getRng(rng)
+
+    energyElec = np.empty_like(gammaEnergy)
+    pending = np.arange(len(gammaEnergy))
+
+    while len(pending) > 0:
+        energy = gammaEnergy[pending]
+        ct = 2.0 * rng.random(len(pending)) - 1.0 # Random values between -1 and +1
+        epsilon = 1.0 / (1.0 + energy / 0.511 * (1.0 - ct))
+        accepted = rng.random(len(pending)) <= kleinNishinaDensity(energy, ct)
+        energyElec[pending[accepted]] = energy[accepted] * (1.0 - epsilon[accepted])
+        pending = pending[~accepted]
+
+    return energyElec
+
+####################################################################################################
+
+class ComptonSampler:
+    """
+    Sampler of Compton electron energies, based on inverse cumulative distribution function (CDF)
+    tables of the Compton scattering angle which are precomputed once for each given gamma energy.
+    Gamma energies without a table are sampled with a vectorized rejection sampling instead.
+
+    The Klein-Nishina density is tabulated on `nPoints` equally spaced values of the cosine of the
+    scattering angle and linearly interpolated in between, so that the CDF is piecewise quadratic
+    and can be inverted exactly. A guide table (one starting index per equally likely CDF slice)
+    replaces the binary search in the CDF by a few vectorized steps.
+    """
+
+    def __init__(
+        self,
+        gammaEnergy: Iterable[float_MeV],
+        nPoints: int = 4097
+    ):
+        self.gammaEnergy = np.unique(np.asarray(gammaEnergy, dtype = float))
+        self.cosTheta = np.linspace(-1.0, 1.0, nPoints)
+        self.step = self.cosTheta[1] - self.cosTheta[0]
+
+        # One row per gamma energy
+        self.density = kleinNishinaDensity(self.gammaEnergy[:, np.newaxis], self.cosTheta[np.newaxis, :])
+        self.cdf = np.zeros_like(self.density)
+        self.cdf[:, 1:] = np.cumsum(0.5 * self.step * (self.density[:, :-1] + self.density[:, 1:]), axis = 1)
+
+        # Index of the CDF interval containing the start of each of the `nPoints - 1` CDF slices
+        self.nSlices = nPoints - 1
+        self.guide = np.array([
+            np.clip(np.searchsorted(cdf, np.arange(self.nSlices) / self.nSlices * cdf[-1], side = "right") - 1, 0, nPoints - 2)
+            for cdf in self.cdf
+        ], dtype = int).reshape(len(self.gammaEnergy), self.nSlices)
+
+    def __repr__(
+        self
+    ) -> str:
+        return f"{self.__class__.__name__}(gammaEnergy = {repr(list(self.gammaEnergy))}, nPoints = {len(self.cosTheta)})"
+
+    def sampleCosTheta(
+        self,
+        row: int,
+        nEvents: int,
+        rng: np.random.Generator | None = None
+    ) -> np.ndarray:
+        """
+        Sample `nEvents` cosines of the Compton scattering angle from the table at index `row`.
+        """
+
+        density, cdf = self.density[row], self.cdf[row]
+        u = getRng(rng).random(nEvents)
+        index = self.guide[row][(u * self.nSlices).astype(int)]
+        u *= cdf[-1]
+
+        # Walk from the start of each CDF slice to the CDF interval containing `u`
+        while True:
+            advance = cdf[index + 1] <= u
+            if not advance.any():
+                break
+            index += advance
+
+        # Solve `density[index] * t + slope * t² / 2 = u - cdf[index]` for `t` in [0, step]
+        remainder = u - cdf[index]
+        slope = (density[index + 1] - density[index]) / self.step
+        discriminant = np.maximum(density[index]**2 + 2.0 * slope * remainder, 0.0)
+        t = 2.0 * remainder / (density[index] + np.sqrt(discriminant))
+
+        return np.clip(self.cosTheta[index] + t, -1.0, 1.0)
+
+    def sample(
+        self,
+        gammaEnergy: np.ndarray,
+        rng: np.random.Generator | None = None
+    ) -> np.ndarray:
+        """
+        Sample the energies of Compton electrons for an array of gamma photon energies.
+        """
+
+        rng = getRng(rng)
+
+        gammaEnergy = np.asarray(gammaEnergy, dtype = float)
+        energyElec = np.empty_like(gammaEnergy)
+
+        row = np.clip(np.searchsorted(self.gammaEnergy, gammaEnergy), 0, max(len(self.gammaEnergy) - 1, 0))
+        tabulated = (self.gammaEnergy[row] == gammaEnergy) if len(self.gammaEnergy) > 0 else np.zeros(len(gammaEnergy), dtype = bool)
+
+        for index, energy in enumerate(self.gammaEnergy):
+            mask = tabulated & (row == index)
+            nEvents = np.count_nonzero(mask)
+            if nEvents == 0:
+                continue
+            epsilon = 1.0 / (1.0 + energy / 0.511 * (1.0 - self.sampleCosTheta(index, nEvents, rng = rng)))
+            energyElec[mask] = energy * (1.0 - epsilon)
+
+        # Fallback for gamma energies without a table
+        energyElec[~tabulated] = comptonElectronEnergyRejection(gammaEnergy[~tabulated], rng = rng)
+
+        return energyElec
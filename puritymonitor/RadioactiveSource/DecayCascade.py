@@ -0,0 +1,185 @@
+import numpy as np
+from ..rng import getRng
+from ..types import float_MeV, float_mm # For type hint only
+
+####################################################################################################
+
+class DecayCascade:
+    """
+    Decay scheme of an electron capture (EC) radioactive isotope, as a table of de-excitation
+    cascades sampled for many decays at once:
+
+    - the daughter nucleus is populated in the initial level of branch `b` with probability
+      `branchProba[b]`, then de-excites through the nuclear transitions `branchTransitions[b]`
+      (indices into the transition lists, in order);
+    - transition `t` of energy `transitionEnergy[t]` emits either a gamma photon, or an internal
+      conversion (IC) electron from atomic shell `s` (K, L, M...) of energy
+      `transitionEnergy[t] - bindingEnergy[s]`, with probabilities proportional to 1 and to the
+      conversion coefficient `conversionCoefficients[t][s]`;
+    - the electron capture leaves a vacancy in shell `s` with probability `captureProba[s]`, and
+      each IC electron a vacancy in its own shell;
+    - each vacancy in shell `s` is filled by emitting either an X-ray (with the fluorescence yield
+      `fluorescenceYield[s]`, of energy `xRayEnergy[s][k]` with probability proportional to
+      `xRayProba[s][k]`) or an Auger electron of energy `augerEnergy[s]`. Only the first step of
+      the atomic relaxation is simulated.
+
+    Decay products are returned as flat arrays with an event id column (see `sample`), without any
+    per-decay Python object.
+    """
+
+    ELECTRON = 0 # Electron emitted at the source surface
+    GAMMA = 1    # Gamma photon, producing a Compton electron away from the source
+    XRAY = 2     # X-ray, photo-absorbed away from the source
+
+    def __init__(
+        self,
+        branchProba: list[float],
+        branchTransitions: list[list[int]],
+        transitionEnergy: list[float_MeV],
+        conversionCoefficients: list[list[float]],
+        gammaComptonDistance: list[float_mm],
+        captureProba: list[float],
+        bindingEnergy: list[float_MeV],
+        fluorescenceYield: list[float],
+        xRayEnergy: list[list[float_MeV]],
+        xRayProba: list[list[float]],
+        augerEnergy: list[float_MeV],
+        xRayAbsorptionDistance: list[float_mm]
+    ):
+        self.branchProba = branchProba
+        self.branchTransitions = branchTransitions
+        self.transitionEnergy = transitionEnergy
+        self.conversionCoefficients = conversionCoefficients
+        self.gammaComptonDistance = gammaComptonDistance
+        self.captureProba = captureProba
+        self.bindingEnergy = bindingEnergy
+        self.fluorescenceYield = fluorescenceYield
+        self.xRayEnergy = xRayEnergy
+        self.xRayProba = xRayProba
+        self.augerEnergy = augerEnergy
+        self.xRayAbsorptionDistance = xRayAbsorptionDistance
+        self.compile()
+
+    def __repr__(
+        self
+    ) -> str:
+        return f"{self.__class__.__name__}({len(self.branchProba)} branches, {len(self.transitionEnergy)} transitions, {len(self.bindingEnergy)} shells)"
+
+    def compile(
+        self
+    ) -> None:
+        """
+        Build the padded arrays and cumulative probability tables used by `sample`.
+        """
+
+        nShells = len(self.bindingEnergy)
+
+        self.branchCdf = np.cumsum(self.branchProba, dtype = float)
+        self.branchCdf /= self.branchCdf[-1]
+        self.nSteps = max(len(transitions) for transitions in self.branchTransitions)
+        self.branchTable = np.full((len(self.branchProba), self.nSteps), -1, dtype = np.intp)
+        for branch, transitions in enumerate(self.branchTransitions):
+            self.branchTable[branch, :len(transitions)] = transitions
+
+        # Outcome of each transition: 0 for a gamma photon, 1 + s for an IC electron from shell s
+        outcomes = np.column_stack((
+            np.ones(len(self.transitionEnergy)),
+            np.asarray(self.conversionCoefficients, dtype = float).reshape(len(self.transitionEnergy), nShells)
+        ))
+        self.outcomeCdf = np.cumsum(outcomes, axis = 1) / np.sum(outcomes, axis = 1, keepdims = True)
+
+        self.transitionEnergyArray = np.asarray(self.transitionEnergy, dtype = float)
+        self.gammaComptonDistanceArray = np.asarray(self.gammaComptonDistance, dtype = float)
+        self.bindingEnergyArray = np.asarray(self.bindingEnergy, dtype = float)
+
+        # Capture shell: s with probability captureProba[s], no vacancy otherwise
+        self.captureCdf = np.cumsum(self.captureProba, dtype = float)
+
+        self.fluorescenceYieldArray = np.asarray(self.fluorescenceYield, dtype = float)
+        self.augerEnergyArray = np.asarray(self.augerEnergy, dtype = float)
+        self.xRayAbsorptionDistanceArray = np.asarray(self.xRayAbsorptionDistance, dtype = float)
+        nLines = max(len(energies) for energies in self.xRayEnergy)
+        self.xRayEnergyTable = np.zeros((nShells, nLines), dtype = float)
+        self.xRayCdf = np.ones((nShells, nLines), dtype = float)
+        for shell, (energies, probas) in enumerate(zip(self.xRayEnergy, self.xRayProba)):
+            self.xRayEnergyTable[shell, :len(energies)] = energies
+            self.xRayCdf[shell, :len(probas)] = np.cumsum(probas) / np.sum(probas)
+
+    def sample(
+        self,
+        nEvents: int,
+        rng: np.random.Generator | None = None
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Sample the decay products of `nEvents` decays. Return flat arrays with one item per product:
+        the index of its decay (event id, from 0 to `nEvents - 1`), its energy, its kind (`ELECTRON`,
+        `GAMMA` or `XRAY`), and the mean distance between the decay vertex and its interaction (0 for
+        electrons, the Compton distance for gamma photons, the absorption distance for X-rays).
+        """
+
+        rng = getRng(rng)
+        events = np.arange(nEvents)
+        event, energy, kind, distance = [], [], [], []
+        vacancyEvent, vacancyShell = [], []
+
+        def addProducts(productEvent, productEnergy, productKind, productDistance):
+            event.append(productEvent)
+            energy.append(productEnergy)
+            kind.append(np.full(len(productEvent), productKind, dtype = np.int8))
+            distance.append(productDistance)
+
+        # Electron capture: initial nuclear level and atomic vacancy
+        branch = np.searchsorted(self.branchCdf, rng.random(nEvents), side = "right")
+        captureShell = np.searchsorted(self.captureCdf, rng.random(nEvents), side = "right")
+        captured = captureShell < len(self.bindingEnergyArray)
+        vacancyEvent.append(events[captured])
+        vacancyShell.append(captureShell[captured])
+
+        # Nuclear de-excitation, one step of all cascades at a time
+        for step in range(self.nSteps):
+            transition = self.branchTable[branch, step]
+            active = transition >= 0
+            stepEvent, transition = events[active], transition[active]
+            outcome = np.sum(rng.random(len(transition))[:, np.newaxis] >= self.outcomeCdf[transition], axis = 1)
+
+            gamma = outcome == 0
+            addProducts(
+                stepEvent[gamma],
+                self.transitionEnergyArray[transition[gamma]],
+                self.GAMMA,
+                self.gammaComptonDistanceArray[transition[gamma]]
+            )
+
+            shell = outcome[~gamma] - 1
+            addProducts(
+                stepEvent[~gamma],
+                self.transitionEnergyArray[transition[~gamma]] - self.bindingEnergyArray[shell],
+                self.ELECTRON,
+                np.zeros(len(shell), dtype = float)
+            )
+            vacancyEvent.append(stepEvent[~gamma])
+            vacancyShell.append(shell)
+
+        # Atomic relaxation of the vacancies: X-ray or Auger electron
+        vacancyEvent = np.concatenate(vacancyEvent)
+        vacancyShell = np.concatenate(vacancyShell)
+        fluorescence = rng.random(len(vacancyShell)) < self.fluorescenceYieldArray[vacancyShell]
+
+        xRayShell = vacancyShell[fluorescence]
+        line = np.sum(rng.random(len(xRayShell))[:, np.newaxis] >= self.xRayCdf[xRayShell], axis = 1)
+        addProducts(
+            vacancyEvent[fluorescence],
+            self.xRayEnergyTable[xRayShell, line],
+            self.XRAY,
+            self.xRayAbsorptionDistanceArray[xRayShell]
+        )
+
+        augerShell = vacancyShell[~fluorescence]
+        addProducts(
+            vacancyEvent[~fluorescence],
+            self.augerEnergyArray[augerShell],
+            self.ELECTRON,
+            np.zeros(len(augerShell), dtype = float)
+        )
+
+        return np.concatenate(event), np.concatenate(energy), np.concatenate(kind), np.concatenate(distance)
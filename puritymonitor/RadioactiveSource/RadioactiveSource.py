@@ -1,4 +1,7 @@
 import numpy as np
+from .ComptonSampler import ComptonSampler
+from .DecayCascade import DecayCascade
+from ..rng import getRng
 from collections.abc import Generator # For type hint only
 from ..types import float_MeV, float_mm, float_kBq
 
@@ -16,7 +19,8 @@ class RadioactiveSource:
         gammaProba: list[float] = [],
         gammaComptonDistance: list[float_mm] = [],
         activity: float_kBq = float("NaN"),
-        description: str = "unspecified radioactive source"
+        description: str = "unspecified radioactive source",
+        cascade: DecayCascade | None = None
     ) -> None:
         assert len(electronEnergy) == len(electronProba)
         assert len(gammaEnergy) == len(gammaProba) == len(gammaComptonDistance)
@@ -28,23 +32,9 @@ class RadioactiveSource:
         self.gammaComptonDistance = gammaComptonDistance
         self.activity = activity
         self.description = description
+        self.cascade = cascade # Full decay scheme (for `PurityMonitorFullDecay`), if known
 
-        # Concatenate electrons and gamma photons
-        self.energy = np.array([*self.electronEnergy, *self.gammaEnergy])
-        self.proba = np.array([*self.electronProba, *self.gammaProba])
-        self.proba /= np.sum(self.proba)
-
-        # Boolean mask
-        self.isElectron = np.concatenate((
-            np.ones(len(self.electronEnergy), dtype = bool),
-            np.zeros(len(self.electronEnergy), dtype = bool)
-        ))
-
-        # Distance between the decay vertex and the electron emission vertex
-        self.electronEmissionDistance = np.concatenate((
-            np.zeros(len(self.electronEnergy), dtype = float),
-            np.array(self.gammaComptonDistance, dtype = float)
-        ))
+        self.updateDecayTable()
         
     def __str__(
         self
@@ -101,15 +91,138 @@ class RadioactiveSource:
             and self.description == self.description
         )
     
-    def decay(
+    def linesKey(
+        self
+    ) -> tuple:
+        """
+        Snapshot of the decay lines, used to detect changes since the last decay table update.
+        """
+        return (
+            tuple(self.electronEnergy),
+            tuple(self.gammaEnergy),
+            tuple(self.electronProba),
+            tuple(self.gammaProba),
+            tuple(self.gammaComptonDistance)
+        )
+
+    def updateDecayTable(
+        self
+    ) -> None:
+        """
+        (Re)build the arrays describing the decay lines, the alias table used to sample them in
+        constant time per decay (Vose's alias method), and the Compton sampler of the gamma lines.
+        This is done once in `__init__`, then again only when the decay lines have changed.
+        """
+
+        assert len(self.electronEnergy) == len(self.electronProba)
+        assert len(self.gammaEnergy) == len(self.gammaProba) == len(self.gammaComptonDistance)
+
+        self.decayTableKey = self.linesKey()
+
+        # Concatenate electrons and gamma photons
+        self.energy = np.array([*self.electronEnergy, *self.gammaEnergy], dtype = float)
+        self.proba = np.array([*self.electronProba, *self.gammaProba], dtype = float)
+        self.proba /= np.sum(self.proba)
+
+        # Boolean mask
+        self.isElectron = np.concatenate((
+            np.ones(len(self.electronEnergy), dtype = bool),
+            np.zeros(len(self.gammaEnergy), dtype = bool)
+        ))
+
+        # Distance between the decay vertex and the electron emission vertex
+        self.electronEmissionDistance = np.concatenate((
+            np.zeros(len(self.electronEnergy), dtype = float),
+            np.array(self.gammaComptonDistance, dtype = float)
+        ))
+
+        # Alias table: line `index` is kept with probability `aliasProba[index]`, otherwise it is
+        # replaced by line `alias[index]`
+        nLines = len(self.proba)
+        scaled = self.proba * nLines
+        self.aliasProba = np.ones(nLines, dtype = float)
+        self.alias = np.arange(nLines)
+        small = [index for index in range(nLines) if scaled[index] < 1.0]
+        large = [index for index in range(nLines) if scaled[index] >= 1.0]
+        while small and large:
+            smallIndex, largeIndex = small.pop(), large.pop()
+            self.aliasProba[smallIndex] = scaled[smallIndex]
+            self.alias[smallIndex] = largeIndex
+            scaled[largeIndex] -= 1.0 - scaled[smallIndex]
+            (small if scaled[largeIndex] < 1.0 else large).append(largeIndex)
+
+        # Inverse CDF tables of the Compton scattering angle, for each gamma energy
+        self.comptonSampler = ComptonSampler(self.gammaEnergy)
+
+    def sampleLines(
         self,
-        nEvents = 1000000
-    ) -> Generator[tuple[any, bool, float], None, None]:
+        nEvents: int = 1000000,
+        rng: np.random.Generator | None = None
+    ) -> np.ndarray:
+        """
+        Sample the decay line indices of `nEvents` initial decays at once.
+        """
+
+        if self.linesKey() != self.decayTableKey:
+            self.updateDecayTable()
+
+        rng = getRng(rng)
+        index = rng.integers(len(self.alias), size = nEvents)
+        keep = rng.random(nEvents) < self.aliasProba[index]
+        return np.where(keep, index, self.alias[index])
+
+    def sampleDecays(
+        self,
+        nEvents: int = 1000000,
+        rng: np.random.Generator | None = None
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Sample `nEvents` initial decay products at once. Return their energies, whether they are
+        electrons (rather than gamma photons), and their electron emission distances as arrays.
+        """
+        lineIndex = self.sampleLines(nEvents = nEvents, rng = rng)
+        return self.energy[lineIndex], self.isElectron[lineIndex], self.electronEmissionDistance[lineIndex]
+
+    def sampleComptonElectronEnergy(
+        self,
+        gammaEnergy: np.ndarray,
+        rng: np.random.Generator | None = None
+    ) -> np.ndarray:
         """
-        Generator of possible initial decay products of a parent radioactive isotope.
+        Sample the energies of Compton electrons for an array of gamma photon energies, from the
+        precomputed tables of the gamma lines (with a rejection sampling fallback for other gamma
+        energies).
         """
 
-        zipped = tuple(zip(self.energy, self.isElectron, self.electronEmissionDistance))
+        if self.linesKey() != self.decayTableKey:
+            self.updateDecayTable()
+
+        return self.comptonSampler.sample(gammaEnergy, rng = rng)
+
+    def sampleCascades(
+        self,
+        nEvents: int = 1000000,
+        rng: np.random.Generator | None = None
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Sample all the decay products (IC electrons, gamma photons, Auger electrons and X-rays) of
+        `nEvents` full decays at once, as flat arrays with an event id column (see
+        `DecayCascade.sample`).
+        """
+        if self.cascade is None:
+            raise NotImplementedError(f"The full decay scheme (`cascade`) of the {self} is unknown.")
+        return self.cascade.sample(nEvents = nEvents, rng = rng)
 
-        for _ in range(nEvents):
-            yield zipped[np.random.choice(len(zipped), p = self.proba)]
+    def decay(
+        self,
+        nEvents = 1000000,
+        chunkSize: int = 100000,
+        rng: np.random.Generator | None = None
+    ) -> Generator[tuple[any, bool, float], None, None]:
+        """
+        Generator of possible initial decay products of a parent radioactive isotope. This is a
+        thin wrapper over `sampleDecays`, sampling `chunkSize` decays at a time.
+        """
+        rng = getRng(rng)
+        for chunkStart in range(0, nEvents, chunkSize):
+            yield from zip(*self.sampleDecays(nEvents = min(chunkSize, nEvents - chunkStart), rng = rng))
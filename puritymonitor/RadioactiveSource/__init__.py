@@ -1,2 +1,4 @@
+from .ComptonSampler import ComptonSampler
+from .DecayCascade import DecayCascade
 from .RadioactiveSource import RadioactiveSource
 from .Bi207 import Bi207
@@ -6,7 +6,9 @@ __version__ = "0.1.0"
 
 from .EnergySpectra import (
     EnergyBins,
-    EnergySpectra
+    EnergySpectra,
+    SpectralModel,
+    TrueEnergySpectra
 )
 
 from .Medium import (
@@ -20,17 +22,34 @@ from .RadioactiveSource import (
 
 from .Geometry import (
     Geometry,
-    CylinderConcentricTwoPartAnode
+    CylindricalGeometry,
+    CylinderConcentricTwoPartAnode,
+    CylinderConcentricRingAnodes,
+    LookupMapAnodes,
+    RingLayout,
+    PixelLayout
 )
 
 from .PurityMonitor import (
+    EventTable,
+    SimulationCache,
+    Checkpoint,
+    StoppingRule,
+    PeakMeanPrecision,
+    BinRelativeError,
     PurityMonitor,
     PurityMonitorInitDecay,
-    PurityMonitorInitDecayTimed, # Not implemented
-    PurityMonitorFullDecay,      # Not implemented
+    PurityMonitorInitDecayTimed,
+    PurityMonitorFullDecay,
     PurityMonitorFullDecayTimed, # Not implemented
 )
 
+from .LifetimeFit import (
+    SpectrumTemplates,
+    LifetimeFit,
+    ResponseMatrix
+)
+
 from .cli import (
     cctpa
 )
@@ -0,0 +1,51 @@
+"""
+Random number generation utilities.
+"""
+
+import numpy as np
+import inspect
+import functools
+from collections.abc import Callable # For type hint only
+
+####################################################################################################
+
+def getRng(
+    rng: np.random.Generator | None = None,
+    seed: int | np.random.SeedSequence | None = None
+) -> np.random.Generator:
+    """
+    Return `rng` if given, otherwise a new `np.random.Generator` (with the default PCG64 bit
+    generator) seeded from `seed`, or from fresh OS entropy if `seed` is `None`. Any other bit
+    generator can be used by passing a generator directly, e.g.:
+
+    ```
+    rng = np.random.Generator(np.random.Philox(seed = 42))
+    ```
+    """
+    if rng is not None:
+        return rng
+    return np.random.default_rng(seed)
+
+####################################################################################################
+
+def bindRng(
+    method: Callable,
+    rng: np.random.Generator
+) -> Callable:
+    """
+    Return `method` with its `rng` keyword argument bound to `rng`, or `method` itself if it does
+    not accept one, e.g. the `decayVertexAndDirection(self)` method of a geometry written against
+    the API without random number generators. Such methods draw from their own random numbers, so
+    that seeding is best-effort.
+    """
+    try:
+        parameters = inspect.signature(method).parameters.values()
+    except (TypeError, ValueError): # No signature (e.g. some builtins)
+        return method
+    if any(
+        parameter.name == "rng" and parameter.kind != parameter.POSITIONAL_ONLY
+        or parameter.kind == parameter.VAR_KEYWORD
+        for parameter in parameters
+    ):
+        return functools.partial(method, rng = rng)
+    return method
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+from puritymonitor import Bi207, CylinderConcentricTwoPartAnode, PurityMonitorInitDecay
+from puritymonitor.PurityMonitor import Checkpoint
+
+####################################################################################################
+
+@pytest.mark.parametrize("bitGenerator", [np.random.PCG64, np.random.MT19937, np.random.Philox, np.random.SFC64])
+def test_rng_state_round_trip(tmp_path, bitGenerator):
+    rng = np.random.Generator(bitGenerator(42))
+    rng.random(7) # Partially consumed buffers
+    checkpoint = Checkpoint(path = str(tmp_path / "run.checkpoint.npz"), configuration = {})
+    checkpoint.save(10, np.zeros((2, 5), dtype = int), rng)
+
+    restored = np.random.Generator(bitGenerator())
+    restored.bit_generator.state = checkpoint.load()["rngState"]
+    np.testing.assert_array_equal(restored.random(100), rng.random(100))
+    assert restored.integers(0, 2**32, 5).tolist() == rng.integers(0, 2**32, 5).tolist()
+
+####################################################################################################
+
+def test_resume_with_mt19937(tmp_path):
+    purityMonitor = PurityMonitorInitDecay(Bi207(), CylinderConcentricTwoPartAnode(15.0, 30.0, 65.0))
+    kwargs = dict(nEvents = 50000, chunkSize = 10000, attDistance = 458.5)
+    path = str(tmp_path / "run.checkpoint.npz")
+
+    _, reference = purityMonitor.simulateEnergySpectra(rng = np.random.Generator(np.random.MT19937(1)), **kwargs)
+    reference = np.array(reference)
+
+    for nSimulatedEvents, _, _ in purityMonitor.streamEnergySpectra(
+        rng = np.random.Generator(np.random.MT19937(1)),
+        checkpoint = path,
+        checkpointInterval = 0.0,
+        **kwargs
+    ):
+        if nSimulatedEvents >= 20000:
+            break # Interrupted simulation
+    _, resumed = purityMonitor.simulateEnergySpectra(
+        rng = np.random.Generator(np.random.MT19937(1)),
+        checkpoint = path,
+        **kwargs
+    )
+    assert purityMonitor.nSimulatedEvents == 50000
+    np.testing.assert_array_equal(np.array(resumed), reference)
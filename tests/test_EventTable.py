@@ -0,0 +1,42 @@
+import numpy as np
+from puritymonitor import Bi207, EventTable, LookupMapAnodes, PixelLayout, PurityMonitorInitDecay
+
+####################################################################################################
+
+def test_more_than_127_anodes():
+    nAnodes = 256
+    table = EventTable(
+        z = np.zeros(nAnodes),
+        anode = np.arange(nAnodes),
+        energy = np.ones(nAnodes),
+        driftLength = 100.0,
+        nAnodes = nAnodes,
+        nEvents = nAnodes
+    )
+    np.testing.assert_array_equal(table.anode, np.arange(nAnodes))
+    _, anodeSpectra = table.replay(attDistance = np.inf, nBins = 10, maxEnergy = 2.0)
+    assert len(anodeSpectra) == nAnodes
+    assert all(spectrum.sum() == 1 for spectrum in anodeSpectra)
+
+####################################################################################################
+
+def test_replay_pixel_layout_matches_simulation():
+    geometry = LookupMapAnodes(
+        anodeLayout = PixelLayout(pitch = 2.0, nPixelsX = 16, nPixelsY = 16),
+        nAnodes = 256,
+        radius = 30.0,
+        driftLength = 100.0,
+        cellSize = 0.5
+    )
+    purityMonitor = PurityMonitorInitDecay(Bi207(), geometry)
+    table = purityMonitor.simulateEventTable(nEvents = 20000, seed = 1)
+    assert table.anode.min() >= 0 and table.anode.max() < 256
+    _, replayed = table.replay(attDistance = 500.0, nBins = 50, maxEnergy = 1.5)
+    _, simulated = purityMonitor.simulateEnergySpectra(
+        nEvents = 20000,
+        nBins = 50,
+        maxEnergy = 1.5,
+        attDistance = 500.0,
+        seed = 1
+    )
+    np.testing.assert_array_equal(np.array(replayed), np.array(simulated))
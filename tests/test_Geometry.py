@@ -0,0 +1,74 @@
+import numpy as np
+from puritymonitor import Bi207, Geometry, EnergyBins, PurityMonitorInitDecay
+
+####################################################################################################
+
+class BaselineGeometry(Geometry):
+    """
+    Single-anode cylindrical geometry implementing only the scalar protocol, with the signatures of
+    the original API (`decayVertexAndDirection` without `rng`).
+    """
+
+    def __init__(
+        self,
+        radius: float = 30.0,
+        driftLength: float = 100.0
+    ):
+        super().__init__()
+        self.nAnodes = 1
+        self.radius = radius
+        self.driftLength = driftLength
+
+    def isInsideActiveVolume(
+        self,
+        x,
+        y,
+        z
+    ):
+        return ((x**2 + y**2) <= self.radius**2) and (0 <= z <= self.driftLength)
+
+    def decayVertexAndDirection(
+        self
+    ):
+        ctheta = np.random.random()
+        phi = 2.0 * np.pi * np.random.random()
+        return (0.0, 0.0, 0.0), (ctheta, np.sqrt(1.0 - ctheta**2), phi)
+
+    def resetAnodeSpectra(
+        self,
+        nBins: int = 100,
+        minEnergy: float = 0.0,
+        maxEnergy: float = 2.0
+    ):
+        self.spectrum = np.zeros(nBins, dtype = int)
+        self.energyBins = EnergyBins.fromRange(minEnergy = minEnergy, maxEnergy = maxEnergy, nBins = nBins)
+
+    def updateAnodeSpectra(
+        self,
+        x,
+        y,
+        z,
+        energy
+    ):
+        index = self.energyBins.binIndex(energy)
+        if self.isInsideActiveVolume(x, y, z) and index >= 0:
+            self.spectrum[index] += 1
+
+    def getAnodeSpectra(
+        self
+    ):
+        return (self.spectrum,)
+
+####################################################################################################
+
+def test_baseline_geometry_batch_mode():
+    purityMonitor = PurityMonitorInitDecay(Bi207(), BaselineGeometry())
+    _, (spectrum,) = purityMonitor.simulateEnergySpectra(nEvents = 2000, seed = 1, mode = "batch")
+    assert 0 < spectrum.sum() <= 2000
+
+####################################################################################################
+
+def test_baseline_geometry_event_mode():
+    purityMonitor = PurityMonitorInitDecay(Bi207(), BaselineGeometry())
+    _, (spectrum,) = purityMonitor.simulateEnergySpectra(nEvents = 2000, seed = 1, mode = "event")
+    assert 0 < spectrum.sum() <= 2000
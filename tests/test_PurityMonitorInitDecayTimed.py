@@ -0,0 +1,22 @@
+import numpy as np
+from puritymonitor import Bi207, LookupMapAnodes, PixelLayout, PurityMonitorInitDecayTimed
+
+####################################################################################################
+
+def test_pulse_anodes_more_than_127_anodes():
+    geometry = LookupMapAnodes(
+        anodeLayout = PixelLayout(pitch = 2.0, nPixelsX = 16, nPixelsY = 16),
+        nAnodes = 256,
+        radius = 30.0,
+        driftLength = 100.0,
+        cellSize = 0.5
+    )
+    purityMonitor = PurityMonitorInitDecayTimed(Bi207(activity = 100.0), geometry, driftVelocity = 0.15)
+    _, anodeSpectra = purityMonitor.simulateEnergySpectra(nEvents = 20000, nBins = 50, maxEnergy = 10.0, seed = 1)
+    assert purityMonitor.pulseAnodes.min() >= 0
+    assert purityMonitor.pulseAnodes.max() > 127
+    inRange = (purityMonitor.pulseEnergies >= 0.0) & (purityMonitor.pulseEnergies < 10.0)
+    np.testing.assert_array_equal(
+        np.bincount(purityMonitor.pulseAnodes[inRange], minlength = 256),
+        np.sum(anodeSpectra, axis = 1)
+    )
@@ -0,0 +1,48 @@
+import os
+import sys
+import subprocess
+import numpy as np
+from puritymonitor import Bi207, CylinderConcentricTwoPartAnode, LAr, PurityMonitorInitDecay
+from puritymonitor.PurityMonitor import SimulationCache
+
+KEY_SCRIPT = """
+import numpy as np
+from puritymonitor import Bi207, CylinderConcentricTwoPartAnode, LAr, PurityMonitorInitDecay
+from puritymonitor.PurityMonitor import SimulationCache
+
+def mobility(temperature, electricField):
+    return 0.0004 * (89.0 / np.asarray(temperature)) + 0.0 * np.asarray(electricField)
+
+medium = LAr(temperature = 87.0, electricField = 500.0, lifetime = 1000.0, mobility = mobility)
+purityMonitor = PurityMonitorInitDecay(Bi207(), CylinderConcentricTwoPartAnode(15.0, 30.0, 65.0), medium = medium)
+print(SimulationCache("unused").key(purityMonitor.configuration()))
+"""
+
+####################################################################################################
+
+def test_cache_key_custom_mobility_across_processes():
+    environment = {**os.environ, "PYTHONPATH": os.path.dirname(os.path.dirname(os.path.abspath(__file__)))}
+    keys = {
+        subprocess.run([sys.executable, "-c", KEY_SCRIPT], env = environment, capture_output = True, text = True, check = True).stdout
+        for _ in range(2)
+    }
+    assert len(keys) == 1
+
+####################################################################################################
+
+def test_no_cache_for_unidentified_mobility(tmp_path):
+    def mobility(temperature, electricField):
+        if np.any(np.abs(np.asarray(temperature) - 87.0) > 0.5):
+            raise ValueError("Mobility model only valid at 87 K")
+        return 0.0004 + 0.0 * np.asarray(electricField)
+
+    medium = LAr(temperature = 87.0, electricField = 500.0, lifetime = 1000.0, mobility = mobility)
+    purityMonitor = PurityMonitorInitDecay(Bi207(), CylinderConcentricTwoPartAnode(15.0, 30.0, 65.0), medium = medium)
+    cache = SimulationCache(str(tmp_path), enabled = True)
+    purityMonitor.simulateEnergySpectra(nEvents = 1000, seed = 1, cache = cache)
+    assert not any(name.endswith(".npz") for name in os.listdir(tmp_path))
+
+    # Identified mobility: cached
+    purityMonitor.medium = LAr(temperature = 87.0, electricField = 500.0, lifetime = 1000.0)
+    purityMonitor.simulateEnergySpectra(nEvents = 1000, seed = 1, cache = cache)
+    assert any(name.endswith(".npz") for name in os.listdir(tmp_path))
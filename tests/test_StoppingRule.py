@@ -0,0 +1,19 @@
+import numpy as np
+from puritymonitor import EnergyBins, PeakMeanPrecision
+
+####################################################################################################
+
+def test_peak_mean_precision_tracks_ic_peak():
+    energyBins = EnergyBins.fromRange(minEnergy = 0.0, maxEnergy = 2.0, nBins = 100)
+    energy = (np.asarray(energyBins.lower) + np.asarray(energyBins.upper)) / 2
+    compton = 50000.0 * np.exp(-0.5 * ((energy - 0.25) / 0.1)**2) # Highest bins
+    icPeak = 20000.0 * np.exp(-0.5 * ((energy - 0.85) / 0.067)**2)
+    spectrum = np.round(compton + icPeak + 10.0)
+
+    rule = PeakMeanPrecision(energyStdDev = 0.067)
+    assert abs(energy[rule.peakIndex(energy, spectrum)] - 0.85) <= 0.02
+    assert np.isfinite(rule.peakMeanPrecision(energyBins, spectrum))
+
+    # Without IC peak, the rule never stops
+    assert rule.peakIndex(energy, np.round(compton + 10.0)) is None
+    assert not rule.converged(energyBins, np.round(compton + 10.0)[np.newaxis])